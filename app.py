@@ -39,6 +39,13 @@ try:
     from src.data.bengali_manager import BengaliDataManager
     from src.utils.phone_utils import create_pasha_whatsapp_excel, format_phone_number, save_to_local_desktop, render_pasha_export_button, is_local_windows_pc
     from src.core.matcher import CandidateMatcher, format_match_result, _find_city_region, _fuzzy_match, REGION_PROXIMITY, REGION_MAP
+    from src.core.geo import proximity_tier
+    from src.core.categorical import map_categories, column_digest
+    from src.core.order_matcher import OrderMatcher
+    from src.core.match_table import get_match_table
+    from src.core.dates import parse_dates, format_dates
+    from src.utils.table_style import styled_table, column_formats
+    from src.ui.streamlit_components import paginate_table
     print(">>> DEBUG: Project modules (src.*) imported successfully")
 except ImportError:
     # Fallback for different environment path configurations
@@ -46,6 +53,13 @@ except ImportError:
     from data.bengali_manager import BengaliDataManager
     from utils.phone_utils import create_pasha_whatsapp_excel, format_phone_number, save_to_local_desktop, render_pasha_export_button, is_local_windows_pc
     from core.matcher import CandidateMatcher, format_match_result, _find_city_region, _fuzzy_match, REGION_PROXIMITY, REGION_MAP
+    from core.geo import proximity_tier
+    from core.categorical import map_categories, column_digest
+    from core.order_matcher import OrderMatcher
+    from core.match_table import get_match_table
+    from core.dates import parse_dates, format_dates
+    from utils.table_style import styled_table, column_formats
+    from ui.streamlit_components import paginate_table
     print(">>> DEBUG: Project modules (core.*) imported successfully via fallback")
 
 # 2. Local Auth Class to prevent Import/Sync Errors
@@ -1336,8 +1350,35 @@ GENDER_MAP = {
     "أنثى": "🚺", "female": "🚺"
 }
 
-@st.cache_data(ttl=600, show_spinner=False)
+_FLAG_URL_MEMO = {}  # nationality cell -> flag URL (None when unknown)
+MAX_FLAG_URL_MEMO = 20000
+
 def _get_flag_url_cached(val):
+    """Flag URL of one nationality cell, memoized in-process."""
+    try:
+        return _FLAG_URL_MEMO[val]
+    except (KeyError, TypeError):
+        pass
+    url = _get_flag_url(val)
+    if len(_FLAG_URL_MEMO) >= MAX_FLAG_URL_MEMO:
+        _FLAG_URL_MEMO.clear()
+    try:
+        _FLAG_URL_MEMO[val] = url
+    except TypeError:  # Unhashable cell
+        pass
+    return url
+
+@st.cache_data(ttl=600, show_spinner=False, max_entries=64)
+def _flag_url_column(column_hash, data_version, _values):
+    codes, uniques = pd.factorize(_values, use_na_sentinel=False)
+    urls = [_get_flag_url_cached(v) for v in uniques]
+    return [urls[c] for c in codes]
+
+def flag_urls(values, data_version=None):
+    """Flag URL per row of a nationality column; one st.cache_data lookup per (column hash, data version)."""
+    return _flag_url_column(column_digest(values), data_version, values)
+
+def _get_flag_url(val):
     if not val: return None
     
     # 1. Basic Cleaning
@@ -1480,7 +1521,7 @@ def get_filtered_df_by_nationality(df, key_prefix):
             break
             
     if nat_col is not None and not df.empty:
-        df_nat_codes = df[nat_col].apply(_get_nationality_code)
+        df_nat_codes = map_categories(df, nat_col, _get_nationality_code)
         filtered = df[df_nat_codes == active_code.lower()]
         if not filtered.empty:
             return filtered
@@ -1488,102 +1529,29 @@ def get_filtered_df_by_nationality(df, key_prefix):
 
 
 
-def style_df(df):
+def style_df(df, view=None):
     """
     Applies custom styling to DataFrames (Optimized for 2026 Speed).
+    Column-level pipeline (src.utils.table_style), cached per (view, lang, data version).
     """
     if not isinstance(df, pd.DataFrame) or df.empty:
         return df
 
-    styled_df = df.copy()
     lang = st.session_state.lang
-    
-    # 0. Selective Auto-Translation for English UI
-    if lang == 'en':
-        # Only translate columns likely to have Arabic content
-        trans_keywords = ["job", "skill", "city", "location", "profession", "الوظيفة", "مهارات", "المدينة", "المهنة"]
-        for col in styled_df.columns:
-            col_lower = str(col).lower()
-            if any(kw in col_lower for kw in trans_keywords):
-                if styled_df[col].dtype == 'object':
-                    styled_df[col] = styled_df[col].apply(lambda x: auto_translate(x, target_lang='en'))
-
-    # 1. Flag Image Injection (Optimized) - Insert BEFORE nationality column
-    nat_cols = [c for c in styled_df.columns if any(kw in str(c).lower() for kw in ["nationality", "الجنسية"])]
-    for col in nat_cols:
-        flag_col = f"🚩_{col}"
-        if flag_col not in styled_df.columns:
-            # Get current index of nationality column
-            idx = list(styled_df.columns).index(col)
-            # Insert flag column at the same position (shifts nationality to right)
-            styled_df.insert(idx, flag_col, styled_df[col].apply(_get_flag_url_cached))
-        else:
-            # Ensure it's in the correct position if it already exists
-            cols = list(styled_df.columns)
-            flag_idx = cols.index(flag_col)
-            nat_idx = cols.index(col)
-            if flag_idx != nat_idx - 1:
-                cols.remove(flag_col)
-                # Re-calculate index after removal
-                new_nat_idx = cols.index(col)
-                cols.insert(new_nat_idx, flag_col)
-                styled_df = styled_df[cols]
-        
-
-        # Fast cleanup - remove emoji flags from text (Safe conversion for Arrow)
-        import re
-        styled_df[col] = styled_df[col].astype(str).apply(lambda x: re.sub(r'[\U0001F1E6-\U0001F1FF]{2}\s*', '', x))
-
-
-    # 2. Gender Icon Injection (Fast Vectorized replacement)
-    gen_cols = [c for c in styled_df.columns if any(kw in str(c).lower() for kw in ["gender", "الجنس"]) and str(c).lower() != "الجنسية"]
-    for col in gen_cols:
-        for key, icon in GENDER_MAP.items():
-            mask = styled_df[col].astype(str).str.strip().str.lower() == key
-            styled_df.loc[mask, col] = icon + " " + styled_df.loc[mask, col].astype(str)
-
-    # 3. Apply Dynamic Styling (Optimized Styler)
-    def apply_colors(val):
-        s_val = str(val).lower()
-        if '🚺' in s_val or 'أنثى' in s_val or 'female' in s_val:
-            return "color: #e91e63; font-weight: bold;"
-        if '🚹' in s_val or 'ذكر' in s_val or 'male' in s_val:
-            return "color: #3498db; font-weight: bold;" 
-        return "color: #4CAF50;"
-
-    # 4. Final Styling and Numeric Formatting
-    # This ensures large numbers (IDs/Phones) don't use scientific notation (1.2E+10)
-    return styled_df.style.format(
-        precision=2, 
-        thousands="", 
-        na_rep="",
-        subset=[c for c in styled_df.columns if styled_df[c].dtype in ['float64', 'int64']]
-    ).map(
-        apply_colors, 
-        subset=[c for c in styled_df.columns if not str(c).startswith("🚩_")]
+    # Selective Auto-Translation for English UI: only columns likely to have Arabic content
+    trans_keywords = ["job", "skill", "city", "location", "profession", "الوظيفة", "مهارات", "المدينة", "المهنة"]
+    return styled_table(
+        df, view=view, lang=lang,
+        translate=(lambda x: auto_translate(x, target_lang='en')) if lang == 'en' else None,
+        translate_col=lambda col: any(kw in str(col).lower() for kw in trans_keywords),
+        flag_url=_get_flag_url_cached,
+        gender_map=GENDER_MAP,
     )
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def _parse_to_date_str_cached(val):
-    if val is None or str(val).strip() == '': return ""
-    try:
-        from dateutil import parser as dateutil_parser
-        val_str = str(val).strip()
-        # Arabic to Western Numerals
-        a_to_w = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
-        val_str = val_str.translate(a_to_w)
-        # Remove Arabic AM/PM
-        clean_s = re.sub(r'[صم]', '', val_str).strip()
-        dt = dateutil_parser.parse(clean_s, dayfirst=False)
-        return dt.strftime('%Y-%m-%d')
-    except:
-        # Fallback to pandas
-        try:
-            dt = pd.to_datetime(val, errors='coerce')
-            if pd.isna(dt): return str(val)
-            return dt.strftime('%Y-%m-%d')
-        except:
-            return str(val)
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=64)
+def _date_str_column(column_hash, data_version, _values):
+    # Shared sheet date parser (Eastern digits, ص/م markers), memoized per distinct string
+    return format_dates(_values)
 
 def clean_date_display(df):
     """
@@ -1596,21 +1564,13 @@ def clean_date_display(df):
     for col in df.columns:
         col_lower = str(col).lower()
         if any(kw in col_lower for kw in date_keywords):
-            df[col] = df[col].apply(_parse_to_date_str_cached)
+            df[col] = _date_str_column(column_digest(df[col]), df.attrs.get('data_version'), df[col])
             
     return df
 
 # 2.4 Global Premium Popup Helper
 
-def render_table_translator(df, key_prefix="table"):
-    """
-    Renders side-by-side translation buttons (Arabic and Tagalog) above tables.
-    Translates Requested Job, Other Skills, and Iqama Profession columns.
-    Also shows interactive nationality flag badges to filter the table.
-    """
-    if df is None or df.empty:
-        return df
-
+def _table_translate_columns(df):
     # Expanded Keywords to catch all relevant columns in any language
     target_keywords = [
         "وظيفة", "الوظيفة", "مهنة", "المهنة", "مهارة", "مهارات", "خبرة", "الخبرة",
@@ -1618,14 +1578,17 @@ def render_table_translator(df, key_prefix="table"):
         "job", "profession", "skill", "experience", "occupation",
         "nationality", "gender", "status", "requested", "ready", "escape", "abscond"
     ]
-    cols_to_translate = [c for c in df.columns if any(kw.lower() in str(c).lower() for kw in target_keywords)]
+    return [c for c in df.columns if any(kw.lower() in str(c).lower() for kw in target_keywords)]
 
-    if not cols_to_translate:
+def render_nationality_filter(df, key_prefix="table"):
+    """
+    Shows interactive nationality flag badges and the total count banner for a
+    table, and returns df filtered by the selected badge. Pass the full result
+    (before paginate_table), so counts, filter and export cover every row.
+    """
+    if df is None or df.empty or not _table_translate_columns(df):
         return df
 
-    from src.core.translation import TranslationManager
-    tm = TranslationManager()
-
     # --- Record Count Header & Nationality Stats ---
     lang = st.session_state.get('lang', 'ar')
     active_code = st.session_state.get(f"selected_nat_{key_prefix}")
@@ -1639,7 +1602,7 @@ def render_table_translator(df, key_prefix="table"):
             break
 
     if nat_col is not None and not df.empty:
-        df_nat_codes = df[nat_col].apply(_get_nationality_code)
+        df_nat_codes = pd.Series(map_categories(df, nat_col, _get_nationality_code), index=df.index)
         code_counts  = df_nat_codes.value_counts()
         valid_items  = [(code, int(cnt)) for code, cnt in code_counts.items() if code]
 
@@ -1851,6 +1814,23 @@ div[data-testid="stHorizontalBlock"]:has(.nat-flag-badge) .nat-clear-badge .stBu
         </div>
     </div>
 </div>""", unsafe_allow_html=True)
+    return df
+
+def render_table_translator(df, key_prefix="table"):
+    """
+    Renders side-by-side translation buttons (Arabic and Tagalog) above tables.
+    Translates Requested Job, Other Skills, and Iqama Profession columns of the
+    rows shown (the current page).
+    """
+    if df is None or df.empty:
+        return df
+
+    cols_to_translate = _table_translate_columns(df)
+    if not cols_to_translate:
+        return df
+
+    from src.core.translation import TranslationManager
+    tm = TranslationManager()
 
     st.markdown('<div class="table-translator-container">', unsafe_allow_html=True)
     ct1, ct2 = st.columns(2)
@@ -1879,10 +1859,12 @@ div[data-testid="stHorizontalBlock"]:has(.nat-flag-badge) .nat-clear-badge .stBu
     if target_lang in ['ar', 'tl']:
         spinner_msg = "جارِ الترجمة..." if target_lang == 'ar' else "Isinasalin sa Tagalog..."
         with st.spinner(spinner_msg):
-            for col in cols_to_translate:
-                unique_vals = [v for v in df[col].unique() if v and isinstance(v, str) and len(str(v).strip()) > 0]
-                if unique_vals:
-                    translations = {val: tm.translate_full_text(val, target_lang=target_lang) for val in unique_vals}
+            # Distinct values of every column translated in one bulk call, then one map per column
+            unique_vals = [v for col in cols_to_translate for v in df[col].unique()
+                           if v and isinstance(v, str) and len(str(v).strip()) > 0]
+            translations = tm.translate_many(unique_vals, target_lang=target_lang)
+            if translations:
+                for col in cols_to_translate:
                     df[col] = df[col].map(translations).fillna(df[col])
             
             # Show toast only upon completion to confirm it worked
@@ -1893,12 +1875,14 @@ div[data-testid="stHorizontalBlock"]:has(.nat-flag-badge) .nat-clear-badge .stBu
     
     return df
 
-@st.cache_data(ttl=3600, show_spinner=False)
 def get_cached_translation(val, target_lang):
+    """Full-text translation through the shared translation store (memory LRU + SQLite)."""
     try:
         if not val: return val
-        from src.core.translation import TranslationManager
-        tm = TranslationManager()
+        tm = st.session_state.get('tm')
+        if not tm:
+            from src.core.translation import TranslationManager
+            tm = st.session_state.tm = TranslationManager()
         return tm.translate_full_text(val, target_lang=target_lang)
     except:
         return val
@@ -2069,6 +2053,7 @@ try:
     from src.core.search import SmartSearchEngine
     from src.core.contracts import ContractManager
     from src.core.translation import TranslationManager
+    from src.core.schema import get_schema
     from src.data.db_client import DBClient
     from src.config import USERS_FILE, ASSETS_DIR
     from src.core.i18n import t, t_col # Added t_col
@@ -3518,6 +3503,11 @@ def dashboard():
                 time.sleep(1)
                 st.rerun()
 
+    # --- Sheet edits that failed to reach Google Sheets (still queued, retried) ---
+    write_error = st.session_state.db.write_error()
+    if write_error:
+        st.warning("⚠️ " + ("لم يتم حفظ بعض التعديلات في Google Sheets بعد، ستتم إعادة المحاولة تلقائياً: " if lang == 'ar' else "Some changes are not saved to Google Sheets yet and will be retried: ") + write_error)
+
     # --- Background Notifications (Handled by Fragment) ---
     silent_notification_monitor()
 
@@ -3571,12 +3561,15 @@ def __apply_pinned_columns(df_or_style, cfg=None):
     
     # Handle both DataFrame and Styler
     df_temp = None
+    number_formats = {}
     if hasattr(df_or_style, 'data'):
         df_temp = df_or_style.data
         cols = df_temp.columns
     elif hasattr(df_or_style, 'columns'):
         df_temp = df_or_style
         cols = df_temp.columns
+        # Plain frames (large tables skip the Styler): number formatting via column_config
+        number_formats = column_formats(df_temp)
     else:
         return cfg
         
@@ -3603,7 +3596,7 @@ def __apply_pinned_columns(df_or_style, cfg=None):
         if df_temp is not None and col in df_temp.columns:
             try:
                 # Find maximum pixel width among all items in the column efficiently
-                data_px = df_temp[col].astype(str).apply(estimate_px).max()
+                data_px = df_temp[col].astype(str).drop_duplicates().map(estimate_px).max()
                 if pd.notna(data_px):
                     max_px = max(max_px, data_px + 20) # +20px safety margin for the cell padding
             except:
@@ -3625,7 +3618,10 @@ def __apply_pinned_columns(df_or_style, cfg=None):
         
         if col not in cfg:
             # Create new column config with padded width logic
-            cfg[col] = st.column_config.Column(pinned=should_pin, label=padded_label)
+            if col in number_formats:
+                cfg[col] = st.column_config.NumberColumn(pinned=should_pin, label=padded_label, format=number_formats[col])
+            else:
+                cfg[col] = st.column_config.Column(pinned=should_pin, label=padded_label)
         else:
             # Update dictionary if passed as one
             if isinstance(cfg[col], dict):
@@ -3662,43 +3658,31 @@ def render_dashboard_content():
     # Don't rename yet, logic needs English/Original headers
     cols = df.columns.tolist()
     
-    # Robust column detection with space normalization
-    def clean_col(c): return " ".join(str(c).lower().split())
-    
-    date_col = next((c for c in cols if any(kw in clean_col(c) for kw in ["contract end", "انتهاء العقد", "contract expiry"])), None)
+    # Column detection comes from the schema resolved at fetch time
+    schema = get_schema(df)
+    date_col = schema['contract_end']
     if not date_col:
         loading_placeholder.empty() # CLEAR LOADER BEFORE RETURN!
         visible_cols = [c for c in cols if not str(c).startswith('__')]
         st.error(f"⚠️ Error: Could not find the 'Contract End' column. Please check your spreadsheet headers. Available columns: {visible_cols}")
         return
 
-    stats = {'urgent': [], 'expired': [], 'active': []}
-    for _, row in df.iterrows():
-        try:
-            status = ContractManager.calculate_status(row[date_col])
-            r = row.to_dict()
-            global_status = status['status']
-            days = status.get('days', 0)
-            if days is None: days = 9999
-            
-            # Numeric Days for sorting
-            r['__days_sort'] = days
-            
-            if lang == 'ar':
-                if global_status == 'expired':
-                    r['حالة العقد'] = f"❌ منتهي (منذ {abs(days)} يوم)"
-                elif global_status in ['urgent', 'warning']:
-                    r['حالة العقد'] = f"⚠️ عاجل (متبقى {days} يوم)"
-                else: # active
-                    r['حالة العقد'] = f"✅ ساري (متبقى {days} يوم)"
-            else:
-                r['Contract Status'] = f"{status['label_en']} ({abs(days)} Days)"
-
-            if global_status == 'urgent' or global_status == 'warning': stats['urgent'].append(r)
-            elif global_status == 'expired': stats['expired'].append(r)
-            elif global_status == 'active': stats['active'].append(r)
-        except Exception:
-            continue
+    # Tab frames are rebuilt on every rerun; a derived version lets search cache their results
+    dash_version = None
+    if df.attrs.get('data_version'):
+        dash_version = hashlib.md5(f"{df.attrs['data_version']}|{lang}|{datetime.now().date()}".encode()).hexdigest()[:16]
+
+    # Contract status for every row at once, then one boolean mask per tab
+    status = ContractManager.classify_column(df[date_col], df.attrs.get('data_version'))
+    days_sort, status_labels = ContractManager.status_display(status, lang)
+    status_key = 'حالة العقد' if lang == 'ar' else 'Contract Status'
+    tagged = df.assign(**{'__days_sort': days_sort, status_key: status_labels})
+    tagged.attrs = {'schema': df.attrs.get('schema')}
+    stats = {
+        'urgent': tagged[status['status'].isin(['urgent', 'warning']).to_numpy()].reset_index(drop=True),
+        'expired': tagged[(status['status'] == 'expired').to_numpy()].reset_index(drop=True),
+        'active': tagged[(status['status'] == 'active').to_numpy()].reset_index(drop=True),
+    }
 
     # Clear loader once stats are ready
     # Ensure at least 0.5s of visibility for the premium feel
@@ -3816,7 +3800,7 @@ def render_dashboard_content():
     st.markdown("---")
     # --- END SMART SEARCH UI ---
 
-    cv_col = next((c for c in cols if any(kw in clean_col(c) for kw in ["cv", "سيرة", "download"])), None)
+    cv_col = schema['cv']
     
     # Configuration for LinkColumn needs the TRANSLATED column name if we rename it!
     # But Streamlit LinkColumn config keys must match the dataframe columns.
@@ -3837,13 +3821,17 @@ def render_dashboard_content():
             d = d.drop(columns=['__abs_days'])
         else:
             d = d.sort_values(by='__days_sort', ascending=True)
-        
+
         # Select columns: 'حالة العقد' then the rest (EXCLUDING ANY __ COLS)
         status_key = 'حالة العقد' if lang == 'ar' else 'Contract Status'
         show_cols = [status_key] + [c for c in cols if c in d.columns and not str(c).startswith('__')]
-        d_final = d[show_cols].copy()
-        
-        # --- Step 1: Render Table Translator FIRST (so it can find original column names like 'nationality') ---
+
+        # --- Step 1: Nationality badges and filter on the whole tab (original column names like 'nationality') ---
+        d_shown = render_nationality_filter(d[show_cols], key_prefix=f"dash_{tab_id}")
+
+        # Only the current page goes through translation, styling and the browser
+        d_final = paginate_table(d_shown, f"dash_{tab_id}", lang,
+                                 version=(dash_version, dash_query, dash_filters)).copy()
         d_final = render_table_translator(d_final, key_prefix=f"dash_{tab_id}")
         
         # Rename Columns Mechanism (Safe to prevent duplicates)
@@ -3887,7 +3875,7 @@ def render_dashboard_content():
                 final_cfg[flag_col] = st.column_config.ImageColumn(t("country_label", lang), width="small", pinned=True)
         
         # Apply Green Text Styling
-        styled_final = style_df(d_final)
+        styled_final = style_df(d_final, view=f"dash_{tab_id}")
         
         event = st.dataframe(
             styled_final, 
@@ -3908,7 +3896,8 @@ def render_dashboard_content():
 
     with t1: 
         # 1. Filter Data for this tab first
-        d_urgent = pd.DataFrame(stats['urgent'])
+        d_urgent = stats['urgent'].copy()
+        d_urgent.attrs['data_version'] = f"{dash_version}:urgent" if dash_version else None
         if not d_urgent.empty and (dash_query or dash_filters):
             eng_u = SmartSearchEngine(d_urgent)
             d_urgent = eng_u.search(dash_query, filters=dash_filters)
@@ -3928,7 +3917,8 @@ def render_dashboard_content():
         
     with t2: 
         # 1. Filter Data for this tab first
-        d_expired = pd.DataFrame(stats['expired'])
+        d_expired = stats['expired'].copy()
+        d_expired.attrs['data_version'] = f"{dash_version}:expired" if dash_version else None
         if not d_expired.empty and (dash_query or dash_filters):
             eng_e = SmartSearchEngine(d_expired)
             d_expired = eng_e.search(dash_query, filters=dash_filters)
@@ -3948,7 +3938,8 @@ def render_dashboard_content():
         
     with t3: 
         # 1. Filter Data for this tab first
-        d_active = pd.DataFrame(stats['active'])
+        d_active = stats['active'].copy()
+        d_active.attrs['data_version'] = f"{dash_version}:active" if dash_version else None
         if not d_active.empty and (dash_query or dash_filters):
             eng_a = SmartSearchEngine(d_active)
             d_active = eng_a.search(dash_query, filters=dash_filters)
@@ -4145,29 +4136,12 @@ def render_search_content():
             # --- CUSTOM STATUS LOGIC FOR SEARCH RESULTS ---
             # Try to find date column in results
             res_cols = res.columns.tolist()
-            def clean_col(c): return " ".join(str(c).lower().split())
-            date_col_search = next((c for c in res_cols if any(kw in clean_col(c) for kw in ["contract end", "انتهاء العقد", "contract expiry"])), None)
+            res_schema = get_schema(res)
+            date_col_search = res_schema['contract_end']
             
             if date_col_search:
-                status_list = []
-                rem_list = []
-                sort_list = []
-                for _, row in res.iterrows():
-                    s = ContractManager.calculate_status(row[date_col_search])
-                    gs = s['status']
-                    ds = s.get('days', 0)
-                    if ds is None: ds = 9999
-                    sort_list.append(ds)
-                    if lang == 'ar':
-                        if gs == 'expired':
-                            status_list.append(f"❌ منتهي (منذ {abs(ds)} يوم)")
-                        elif gs in ['urgent', 'warning']:
-                            status_list.append(f"⚠️ عاجل (متبقى {ds} يوم)")
-                        else:
-                            status_list.append(f"✅ ساري (متبقى {ds} يوم)")
-                    else:
-                        status_list.append(f"{s['label_en']} ({abs(ds)} Days)")
-                
+                sort_list, status_list = ContractManager.status_display(
+                    ContractManager.classify_column(res[date_col_search], res.attrs.get('data_version')), lang)
                 status_key = 'حالة العقد' if lang == 'ar' else 'Contract Status'
                 res[status_key] = status_list
                 res['__days_sort'] = sort_list
@@ -4179,7 +4153,7 @@ def render_search_content():
                 res = res.sort_values(by=sort_cols, ascending=True)
             else:
                 # FALLBACK SORT BY TIMESTAMP (REGISTRATION DATE)
-                ts_col = next((c for c in res_cols if any(kw in clean_col(c) for kw in ["timestamp", "طابع", "تاريخ التسجيل"])), None)
+                ts_col = res_schema['timestamp']
                 if ts_col:
                     try:
                         # Temporary numeric sort
@@ -4236,8 +4210,12 @@ def render_search_content():
                     render_pasha_export_button(xl_df_search, btn_text, f"Search_WhatsApp_{datetime.now().strftime('%M%S')}.xlsx", "البحث_الذكي_واتساب", key="btn_exp_search")
 
             # --- 2. PREPARE DISPLAY DATAFRAME (Copy and Transform) ---
-            # Create a separate display dataframe to avoid modifying the logic dataframe 'res'
-            res_display = res.copy()
+            # Create a separate display dataframe to avoid modifying the logic dataframe 'res'.
+            # Nationality badges filter the whole result (same rows as the export above);
+            # only the current page is renamed, translated, styled and sent to the browser
+            res_shown = render_nationality_filter(res, key_prefix="search_res")
+            res_display = paginate_table(res_shown, "search_res", lang,
+                                         version=(original_data.attrs.get('data_version'), query, filters)).copy()
 
             # Rename columns before showing (Safe Rename)
             new_names = {}
@@ -4301,13 +4279,14 @@ def render_search_content():
             
             # Use on_select to capture row selection
             df_height = min((len(res_display) + 1) * 35 + 40, 600)
+            res_styled = style_df(res_display, view="search")
             event = st.dataframe(
-                style_df(res_display), 
+                res_styled, 
                 width='content',
                 on_select="rerun",
                 selection_mode="single-row",
                 hide_index=True,
-                column_config=__apply_pinned_columns(style_df(res_display), column_config),
+                column_config=__apply_pinned_columns(res_styled, column_config),
                 key=f"search_results_table_{st.session_state.get('search_entry_count', 0)}",
                 height=df_height
             )
@@ -4860,7 +4839,8 @@ def render_permissions_content():
     
     # Stylized DataFrame
     df_users = pd.DataFrame(table_data)
-    st.dataframe(style_df(df_users), width='content', column_config=__apply_pinned_columns(style_df(df_users)))
+    users_styled = style_df(df_users, view="users")
+    st.dataframe(users_styled, width='content', column_config=__apply_pinned_columns(users_styled))
 
 def render_order_processing_content():
     """Order Processing: Matches Customer Requests with available Workers."""
@@ -4894,6 +4874,8 @@ def render_order_processing_content():
         st.warning("لا توجد بيانات عمال" if lang == 'ar' else "No worker data available")
         return
 
+    all_workers_df = workers_df  # Unfiltered sheet for the precomputed match table
+
     # --- NEW: Advanced Filtering Panel (Matching Image) ---
     ai_title = "(AI) البحث الذكي" if lang == 'ar' else "Smart Search (AI)"
     st.markdown(f'<div class="mobile-neon-text" style="color: #D4AF37; font-weight: 600; margin-bottom: 5px; font-family: \'Cairo\', sans-serif;">{ai_title}</div>', unsafe_allow_html=True)
@@ -5001,13 +4983,8 @@ def render_order_processing_content():
             
     if ts_sort_col:
         try:
-            # Robust parsing for Arabic AM/PM markers
-            def robust_parse(v):
-                if not v: return pd.NaT
-                s = str(v).replace('م', 'PM').replace('ص', 'AM')
-                return pd.to_datetime(s, errors='coerce')
-                
-            customers_df['__temp_sort'] = customers_df[ts_sort_col].apply(robust_parse)
+            # Shared sheet date parser (handles Arabic AM/PM markers), one pass per distinct value
+            customers_df['__temp_sort'] = parse_dates(customers_df[ts_sort_col])
             # Sort newest first
             customers_df = customers_df.sort_values(by='__temp_sort', ascending=False)
             customers_df = customers_df.drop(columns=['__temp_sort'])
@@ -5035,265 +5012,35 @@ def render_order_processing_content():
             break
     
     # --- Worker Column Names ---
-    w_name_col = next((c for c in workers_df.columns if "full name" in c.lower()), None)
-    w_nationality_col = next((c for c in workers_df.columns if c.strip().lower() == "nationality"), None)
-    w_gender_col = next((c for c in workers_df.columns if c.strip().lower() == "gender"), None)
-    w_job_col = next((c for c in workers_df.columns if "job" in c.lower() and "looking" in c.lower()), None)
-    w_other_job_col = next((c for c in workers_df.columns if "other jobs" in c.lower()), None)
-    w_city_col = next((c for c in workers_df.columns if "city" in c.lower() and "saudi" in c.lower()), None)
-    w_phone_col = next((c for c in workers_df.columns if "phone" in c.lower()), None)
-    w_age_col = next((c for c in workers_df.columns if "age" in c.lower()), None)
-    w_timestamp_col = next((c for c in workers_df.columns if any(kw in str(c).lower() for kw in ["timestamp", "طابع", "تاريخ التسجيل"])), None)
-    w_contract_end_col = next((c for c in workers_df.columns if any(kw in str(c).lower() for kw in ["contract end", "انتهاء العقد"])), None)
-
-    import re
-    
-    def normalize(text):
-        if not text: return ""
-        s = str(text).strip().lower()
-        s = re.sub(r'[^\w\s\-]', ' ', s, flags=re.UNICODE)
-        return ' '.join(s.split()).strip()
-    
-    def match_gender(customer_category, worker_gender):
-        cat = normalize(customer_category)
-        gen = normalize(worker_gender)
-        if not cat or not gen: return True
-        is_male_request = ("رجال" in cat) or (re.search(r'\bmale\b', cat) and "female" not in cat)
-        is_female_request = ("نساء" in cat) or ("female" in cat)
-        if is_male_request:
-            return re.search(r'\bmale\b', gen) is not None and "female" not in gen
-        elif is_female_request:
-            return "female" in gen
-        return True
-    
-    def match_nationality(customer_nat, worker_nat):
-        c_raw = str(customer_nat).strip()
-        w_raw = str(worker_nat).strip()
-        if not c_raw or not w_raw: return True
-
-        # Helper to clean and split a string by common separators and remove emojis
-        def get_clean_parts(text):
-            # Remove emojis (common flags, etc.)
-            clean = re.sub(r'[^\w\s\-–|/]', ' ', text)
-            # Split by separators
-            parts = [p.strip() for p in re.split(r'[\-–|/]', clean) if p.strip()]
-            return parts
-
-        # 1. Extract Master Search Terms from Customer Request
-        c_parts = get_clean_parts(c_raw)
-        master_search_terms = set()
-        tm = st.session_state.get('tm')
-
-        for cp in c_parts:
-            # Add normalized part
-            master_search_terms.add(normalize(cp))
-            # Add translations if available
-            if tm:
-                bundles = tm.analyze_query(cp)
-                for b in bundles:
-                    for s in b:
-                        master_search_terms.add(normalize(s))
-
-        # 2. Extract Worker Nationality Parts
-        w_parts = [normalize(wp) for wp in get_clean_parts(w_raw)]
-        
-        # 3. Precise Matching
-        for term in master_search_terms:
-            if not term: continue
-            for wp in w_parts:
-                if not wp: continue
-                # Strict or high-confidence match
-                if term == wp or (len(term) > 3 and (term in wp or wp in term)):
-                    return True
-        return False
-    
-    def match_job(customer_job, worker_job):
-        c_job = str(customer_job).strip()
-        w_job_raw = str(worker_job).strip()
-        if not c_job or not w_job_raw: return True
-        
-        c_norm = normalize(c_job)
-        w_norm = normalize(w_job_raw)
-        if not c_norm or not w_norm: return True
-        
-        # 1. Direct full phrase match (normalized)
-        if c_norm in w_norm or w_norm in c_norm:
-            return True
-        
-        # 2. Bilingual full phrase match (uses Arabic↔English translation)
-        if _fuzzy_match(w_job_raw, c_job):
-            return True
-        
-        # 3. Word-level bilingual matching (skip generic title words)
-        generic_words = {"coordinator", "supervisor", "worker", "employee", "manager",
-                         "منسق", "عامل", "موظف", "بائع", "صانع", "مقدم", "مشرف",
-                         "sales", "driver", "and", "the", "a", "an", "or", "in", "of"}
-        
-        c_words = re.split(r'[\s,،/\-–]+', c_job)
-        for cw in c_words:
-            cw = cw.strip()
-            if not cw or len(cw) < 3 or cw.lower() in generic_words:
-                continue
-            # Bilingual match for this meaningful keyword
-            if _fuzzy_match(w_job_raw, cw):
-                return True
-        
-        # 4. Domain synonym groups (cross-language matching for common professions)
-        synonym_groups = [
-            {"flower", "flowers", "florist", "floral", "زهور", "ورد", "floriculture"},
-            {"coffee", "barista", "باريستا", "قهوة", "مقهى", "كوفي", "cafe"},
-            {"cook", "cooking", "chef", "طباخ", "طبخ", "شيف", "cuisine"},
-            {"clean", "cleaner", "cleaning", "نظافة", "تنظيف", "نظافه"},
-            {"hair", "hairdresser", "stylist", "حلاق", "كوافير", "مصفف", "شعر", "coiffeur"},
-            {"nail", "manicure", "pedicure", "بدكير", "منكير", "اظافر"},
-            {"massage", "مساج", "spa"},
-            {"pastry", "dessert", "sweets", "حلا", "حلويات", "معجنات"},
-            {"nurse", "nursing", "ممرض", "ممرضة", "تمريض"},
-            {"driver", "driving", "سائق", "قيادة"},
-            {"butcher", "جزار", "لحام", "لحوم", "meat", "مجزر"},
-            {"waiter", "waitress", "نادل", "نادلة", "garson"},
-            {"secretary", "سكرتيرة", "سكرتير", "admin", "اداري", "ادارية"},
-            {"guard", "security", "حارس", "أمن", "امن", "حراسة"},
-            {"carpenter", "نجار", "نجارة", "woodwork"},
-            {"plumber", "سباك", "سباكة", "plumbing"},
-            {"electrician", "كهربائي", "كهرباء", "electrical"},
-            {"painter", "دهان", "طلاء", "painting"},
-            {"tailor", "خياط", "خياطة", "sewing"},
-            {"mechanic", "ميكانيكي", "صيانة", "maintenance"},
-            {"welder", "لحام", "welding"},
-            {"farmer", "مزارع", "فلاح", "farm", "زراعة", "agriculture"},
-            {"baker", "خباز", "مخبز", "bakery"},
-            {"cashier", "كاشير", "محاسب", "صراف"},
-            {"salesman", "مندوب", "مبيعات", "sales representative"},
-            {"teacher", "مدرس", "معلم", "تعليم", "teaching"},
-            {"accountant", "محاسب", "حسابات", "accounting"},
-            {"warehouse", "مستودع", "مخزن", "storekeeper"},
-            {"delivery", "توصيل", "مندوب توصيل"},
-            {"housemaid", "خادمة", "شغالة", "عاملة منزلية", "domestic"},
-        ]
-        
-        c_lower = c_job.lower()
-        w_lower = w_job_raw.lower()
-        
-        for group in synonym_groups:
-            c_has = any(syn in c_lower for syn in group)
-            w_has = any(syn in w_lower for syn in group)
-            if c_has and w_has:
-                return True
-
-        return False
-    
-    def find_matching_workers(customer_row):
+    w_schema = get_schema(workers_df)
+    w_name_col = w_schema['full_name']
+    w_nationality_col = w_schema['nationality']
+    w_gender_col = w_schema['gender']
+    w_job_col = w_schema['job_wanted']
+    w_other_job_col = w_schema['other_jobs']
+    w_city_col = w_schema['saudi_city']
+    w_phone_col = w_schema['phone']
+    w_age_col = w_schema['age']
+    w_timestamp_col = w_schema['timestamp']
+    w_contract_end_col = w_schema['contract_end']
+
+    # Worker features are compiled once per data version; each request is ranked with array masks
+    order_matcher = OrderMatcher(workers_df, {
+        'category': c_category,
+        'nationality': c_nationality,
+        'work_nature': c_work_nature,
+        'location': c_location,
+    }, tm=st.session_state.get('tm'))
+
+    # Precomputed request -> worker matches, updated in the background when either sheet changes
+    match_table = get_match_table()
+    match_table.schedule(all_workers_df, customers_df, order_matcher.customer_cols, tm=order_matcher.tm)
+
+    def find_matching_workers(customer_row, ranked=None):
         """Find workers. Returns (all_matches, all_scores, city_count, region_count)."""
-        city_matches, city_scores = [], []
-        region_matches, region_scores = [], []
-        other_matches, other_scores = [], []
-        
-        for _, worker in workers_df.iterrows():
-            score = 0
-            total_criteria = 0
-            geo_tier = 99 # 0=City, 1=Region, 2+=Proximity Regions, 99=Other
-            
-            if c_category and w_gender_col:
-                cv = str(customer_row.get(c_category, ""))
-                wv = str(worker.get(w_gender_col, ""))
-                if cv.strip():
-                    if not match_gender(cv, wv):
-                        continue # Hard Filter: Skip if gender mismatch
-                    total_criteria += 1
-                    score += 1
-            
-            if c_nationality and w_nationality_col:
-                cv = str(customer_row.get(c_nationality, ""))
-                wv = str(worker.get(w_nationality_col, ""))
-                if cv.strip():
-                    if not match_nationality(cv, wv):
-                        continue # Hard Filter: Skip if nationality mismatch
-                    total_criteria += 1
-                    score += 1
-            
-            if c_work_nature and (w_job_col or w_other_job_col):
-                cv = str(customer_row.get(c_work_nature, ""))
-                
-                job_val = str(worker.get(w_job_col, "")) if w_job_col else ""
-                other_val = str(worker.get(w_other_job_col, "")) if w_other_job_col else ""
-                
-                if job_val and other_val:
-                    wv = f"{job_val} / {other_val}"
-                elif job_val:
-                    wv = job_val
-                elif other_val:
-                    wv = other_val
-                else:
-                    wv = ""
-
-                if cv.strip():
-                    if not wv or not match_job(cv, wv):
-                        continue # Hard Filter: Skip if job mismatch completely
-                    total_criteria += 1
-                    score += 1
-            
-            if c_location and w_city_col:
-                cv = str(customer_row.get(c_location, ""))
-                wv = str(worker.get(w_city_col, ""))
-                if cv.strip():
-                    total_criteria += 1
-                    
-                    # Hierarchical Geographic Matching
-                    if _fuzzy_match(wv, cv):
-                        geo_tier = 0
-                    else:
-                        target_reg = _find_city_region(cv)
-                        worker_reg = _find_city_region(wv)
-                        if target_reg and worker_reg and target_reg == worker_reg:
-                            geo_tier = 1
-                        elif target_reg and target_reg in REGION_PROXIMITY:
-                            ordered = REGION_PROXIMITY[target_reg]
-                            if worker_reg in ordered:
-                                geo_tier = 2 + ordered.index(worker_reg)
-                    
-                    if geo_tier < 99:
-                        score += 1
-            
-            if total_criteria > 0 and score >= 1:
-                pct = int((score / total_criteria) * 100)
-                if geo_tier == 0:
-                    city_matches.append(worker)
-                    city_scores.append(pct)
-                elif geo_tier == 1:
-                    region_matches.append(worker)
-                    region_scores.append(pct)
-                else:
-                    # Store geo_tier temporarily for sorting
-                    worker_copy = worker.copy()
-                    worker_copy['__geo_tier'] = geo_tier
-                    other_matches.append(worker_copy)
-                    other_scores.append(pct)
-        
-        # Sort each group by: 1. Score (desc), 2. Geo Tier (for others), 3. Timestamp (desc)
-        def get_sort_key(score, worker):
-            ts_val = pd.NaT
-            if w_timestamp_col:
-                raw_ts = str(worker.get(w_timestamp_col, ""))
-                clean_ts = raw_ts.replace('م', 'PM').replace('ص', 'AM')
-                ts_val = pd.to_datetime(clean_ts, errors='coerce')
-            
-            gt = worker.get('__geo_tier', 0)
-            return (-score, gt, -ts_val.timestamp() if pd.notnull(ts_val) else 0)
-
-        sorted_results = []
-        for matches, scores in [(city_matches, city_scores), (region_matches, region_scores), (other_matches, other_scores)]:
-            if matches:
-                 items = sorted(zip(scores, matches), key=lambda x: get_sort_key(x[0], x[1]))
-                 sorted_results.append(([it[1] for it in items], [it[0] for it in items]))
-            else:
-                 sorted_results.append(([], []))
-        
-        f_city, f_city_scores = sorted_results[0]
-        f_region, f_region_scores = sorted_results[1]
-        f_other, f_other_scores = sorted_results[2]
-        
-        return f_city + f_region + f_other, f_city_scores + f_region_scores + f_other_scores, len(f_city), len(f_region)
+        if ranked is None:
+            ranked = order_matcher.rank(customer_row)
+        return order_matcher.materialize(ranked)
 
 
     # --- Initialize session state ---
@@ -5496,10 +5243,18 @@ def render_order_processing_content():
     tm_op = st.session_state.get('tm')
     query_bundles = []
     is_phone_search = False
+    phone_hits = None
     if cust_search_q:
         is_phone_search = _is_phone_query_op(cust_search_q)
         if not is_phone_search:
             query_bundles = tm_op.analyze_query(cust_search_q) if tm_op else [[cust_search_q.lower()]]
+        elif c_mobile:
+            # Indexed lookup over the mobile column (None = query too short, scan below)
+            from src.core.phone_index import phone_matches
+            q_phone = _normalize_phone_op(cust_search_q)
+            hit_mask = phone_matches(customers_df, q_phone, column=c_mobile) if q_phone else None
+            if hit_mask is not None:
+                phone_hits = set(customers_df.index[hit_mask.values])
 
     # ---------------- 🚀 PRE-FILTERING FOR PAGINATION ----------------
     filtered_indices = []
@@ -5521,10 +5276,14 @@ def render_order_processing_content():
         if cust_search_q:
             if is_phone_search:
                 # Smart phone search
-                q_phone = _normalize_phone_op(cust_search_q)
-                m_phone = _normalize_phone_op(mobile_val)
-                if not (q_phone and q_phone in m_phone):
-                    continue
+                if phone_hits is not None:
+                    if idx not in phone_hits:
+                        continue
+                else:
+                    q_phone = _normalize_phone_op(cust_search_q)
+                    m_phone = _normalize_phone_op(mobile_val)
+                    if not (q_phone and q_phone in m_phone):
+                        continue
             else:
                 # Advanced Bilingual Text Search
                 search_text = " ".join([responsible_val, location_val, company_val, nationality_val, category_val, nature_val, notes_val]).lower()
@@ -5612,6 +5371,9 @@ def render_order_processing_content():
                 
     st.markdown("<hr style='border-color: rgba(255,255,255,0.1); margin: 20px 0;'>", unsafe_allow_html=True)
 
+    # Rank workers for every customer on this page in one pass (precomputed matches first)
+    page_rankings = order_matcher.rank_all(customers_df.loc[current_page_indices], table=match_table)
+
     # Loop over current page customers
     for idx in current_page_indices:
         customer_row = customers_df.loc[idx]
@@ -5805,7 +5567,7 @@ def render_order_processing_content():
                         st.rerun()
 
             # --- Workers ---
-            matches, scores, city_count, region_count = find_matching_workers(customer_row)
+            matches, scores, city_count, region_count = find_matching_workers(customer_row, page_rankings.get(idx))
             
             if not matches:
                 st.warning("⚠️ " + t('no_matching_workers', lang))
@@ -5851,9 +5613,10 @@ def render_order_processing_content():
                                 col_cfg_city[f"🚩_{col}"] = st.column_config.ImageColumn(t("country_label", lang), width="small", pinned=True)
 
                         st.markdown("<br>", unsafe_allow_html=True)
+                        city_df = render_nationality_filter(city_df, key_prefix=f"op_city_{idx}")
                         city_df = render_table_translator(city_df, key_prefix=f"op_city_{idx}")
                         
-                        city_styled = style_df(city_df.drop(columns=["__uid"]))
+                        city_styled = style_df(city_df.drop(columns=["__uid"]), view=f"op_city_{idx}")
                         
                         df_city_height = min((len(city_df) + 1) * 35 + 40, 500)
                         event_city = st.dataframe(
@@ -5897,6 +5660,7 @@ def render_order_processing_content():
                         render_segment_header(label, len(reg_df), color="#D4AF37", explainer=explainer)
 
                         st.markdown("<br>", unsafe_allow_html=True)
+                        reg_df = render_nationality_filter(reg_df, key_prefix=f"op_reg_{idx}")
                         reg_df = render_table_translator(reg_df, key_prefix=f"op_reg_{idx}")
                         
                         col_cfg_reg = {}
@@ -5906,7 +5670,7 @@ def render_order_processing_content():
                                 nat_col_reg = col
                                 col_cfg_reg[f"🚩_{col}"] = st.column_config.ImageColumn(t("country_label", lang), width="small", pinned=True)
 
-                        reg_styled = style_df(reg_df.drop(columns=["__uid"]))
+                        reg_styled = style_df(reg_df.drop(columns=["__uid"]), view=f"op_reg_{idx}")
                         
                         df_reg_h = min((len(reg_df) + 1) * 35 + 40, 400)
                         ev_reg = st.dataframe(
@@ -5947,8 +5711,9 @@ def render_order_processing_content():
                             if any(kw in str(col).lower() for kw in ["nationality", "الجنسية"]):
                                 col_cfg_other[f"🚩_{col}"] = st.column_config.ImageColumn(t("country_label", lang), width="small", pinned=True)
 
+                        other_df = render_nationality_filter(other_df, key_prefix=f"op_other_{idx}")
                         other_df = render_table_translator(other_df, key_prefix=f"op_other_{idx}")
-                        other_styled = style_df(other_df.drop(columns=["__uid"]))
+                        other_styled = style_df(other_df.drop(columns=["__uid"]), view=f"op_other_{idx}")
                         
                         df_oth_h = min((len(other_df) + 1) * 35 + 40, 400)
                         ev_oth = st.dataframe(
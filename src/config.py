@@ -9,6 +9,8 @@ WA_HISTORY_FILE = os.path.join(BASE_DIR, "whatsapp_history.json")
 WA_TEMPLATES_FILE = os.path.join(BASE_DIR, "whatsapp_templates.json")
 IGNORED_FILE = os.path.join(BASE_DIR, "ignored_rows.json")
 BENGALI_DATA_FILE = os.path.join(BASE_DIR, "bengali_data.json")
+SHEET_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "sheets")
+TRANSLATION_CACHE_FILE = os.path.join(BASE_DIR, ".cache", "translations.sqlite3")
 
 # Branding
 PROGRAMMER_NAME_AR = "برمجة: السعيد الوزان"
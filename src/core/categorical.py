@@ -0,0 +1,78 @@
+"""
+Distinct-Value Column Evaluation
+Categorical sheet columns (nationality, gender, city, job, ...) hold a few
+hundred distinct values across thousands of rows. This module factorizes a
+column once per data version and evaluates Python predicates / mappers once
+per distinct value, broadcasting the results back to the rows via the codes.
+"""
+from collections import OrderedDict
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+MAX_CACHED_VERSIONS = 5
+_FACTORS = OrderedDict()  # data_version -> {column: (labels, codes, uniques)}
+_lock = threading.Lock()
+
+
+def _factorize(s):
+    codes, uniques = pd.factorize(s, use_na_sentinel=False)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def factorize(df, column):
+    """
+    (codes, uniques) of df[column], aligned with df's rows. Versioned frames
+    (and their filtered copies) factorize each column once per data version.
+    """
+    version = df.attrs.get('data_version')
+    if not version or not df.index.is_unique:
+        return _factorize(df[column])
+
+    with _lock:
+        entry = _FACTORS.get(version)
+        if entry is None:
+            entry = _FACTORS[version] = {}
+            while len(_FACTORS) > MAX_CACHED_VERSIONS:
+                _FACTORS.popitem(last=False)
+        else:
+            _FACTORS.move_to_end(version)
+        cached = entry.get(column)
+
+    if cached is not None:
+        labels, codes, uniques = cached
+        if labels.equals(df.index):
+            return codes, uniques
+        positions = labels.get_indexer(df.index)
+        if (positions >= 0).all():
+            return codes[positions], uniques
+
+    # First use for this version, or the cached entry came from a smaller subset
+    codes, uniques = _factorize(df[column])
+    if cached is None or len(df) > len(cached[0]):
+        with _lock:
+            entry[column] = (df.index, codes, uniques)
+    return codes, uniques
+
+
+def map_categories(df, column, func):
+    """Object array of func(value) per row of df[column], calling func once per distinct value."""
+    codes, uniques = factorize(df, column)
+    results = np.empty(len(uniques), dtype=object)
+    for i, value in enumerate(uniques):
+        results[i] = func(value)
+    return results[codes]
+
+
+def category_mask(df, column, predicate):
+    """Boolean array: predicate(value) per row of df[column], evaluated once per distinct value."""
+    codes, uniques = factorize(df, column)
+    verdicts = np.fromiter((bool(predicate(v)) for v in uniques), dtype=bool, count=len(uniques))
+    return verdicts[codes]
+
+
+def column_digest(s):
+    """md5 of a column's values and index; the st.cache_data key of column-level entry points."""
+    hashed = pd.util.hash_pandas_object(s.astype(str), index=True).values
+    return hashlib.md5(hashed.tobytes()).hexdigest()
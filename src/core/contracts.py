@@ -1,25 +1,50 @@
 from datetime import datetime, date
-from dateutil import parser
+import numpy as np
+import pandas as pd
 import streamlit as st
 
+from .dates import parse_date, parse_dates
+from .categorical import column_digest
+
+_STATUS_MEMO = {}  # (raw contract-end cell, today) -> calculate_status result
+MAX_STATUS_MEMO = 50000
+
+
+def _parse_contract_date(date_str):
+    if not date_str:
+        return None
+    # Shared sheet date parser (Eastern digits, ص/م markers, fuzzy text)
+    ts = parse_date(date_str, fuzzy=True)
+    return None if pd.isna(ts) else ts.date()
+
+
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=32)
+def _classify_cached(column_hash, data_version, today, _series):
+    return ContractManager.classify(_series, today)
+
+
 class ContractManager:
     @staticmethod
-    @st.cache_data(ttl=3600, show_spinner=False)
     def parse_date(date_str):
-        if not date_str:
-            return None
-        try:
-            # Clean text
-            d_clean = str(date_str).strip().replace('ص', 'AM').replace('م', 'PM')
-            # Use fuzzy parsing
-            return parser.parse(d_clean, fuzzy=True).date()
-        except:
-            return None
+        return _parse_contract_date(date_str)
 
     @staticmethod
-    @st.cache_data(ttl=3600, show_spinner=False)
     def calculate_status(expiry_date_str):
+        """Status of one contract-end cell, memoized per (cell, day) in-process."""
         today = date.today()
+        try:
+            status = _STATUS_MEMO.get((expiry_date_str, today))
+        except TypeError:  # Unhashable cell
+            return ContractManager._status(expiry_date_str, today)
+        if status is None:
+            status = ContractManager._status(expiry_date_str, today)
+            if len(_STATUS_MEMO) >= MAX_STATUS_MEMO:
+                _STATUS_MEMO.clear()
+            _STATUS_MEMO[(expiry_date_str, today)] = status
+        return dict(status)
+
+    @staticmethod
+    def _status(expiry_date_str, today):
         expiry = ContractManager.parse_date(expiry_date_str)
         
         if not expiry:
@@ -73,3 +98,62 @@ class ContractManager:
                 'label_en': 'Active',
                 'color': 'green'
             }
+
+    @staticmethod
+    def contract_days(series):
+        """Contract-end column as datetime64[D] (NaT when unreadable), parsing each distinct value once."""
+        return parse_dates(pd.Series(series), fuzzy=True).to_numpy().astype('datetime64[D]')
+
+    @staticmethod
+    def classify(series, today=None):
+        """
+        Vectorized calculate_status over a contract-end column. Returns a
+        DataFrame aligned with series: status, days (Int64, <NA> when
+        unknown), label_ar, label_en and color.
+        """
+        series = pd.Series(series)
+        ends = ContractManager.contract_days(series)
+        known = ~np.isnat(ends)
+        diff = np.where(known, (ends - np.datetime64(today or date.today(), 'D')).astype(np.int64), 0)
+
+        # Same buckets as calculate_status, first match wins
+        conditions = [~known, diff < 0, diff == 0, diff <= 7, diff <= 30]
+        abs_txt = np.abs(diff).astype(str).astype(object)
+        left_ar = 'متبقي ' + abs_txt + ' يوم'
+        left_en = abs_txt + ' Days Left'
+
+        return pd.DataFrame({
+            'status': np.select(conditions, ['unknown', 'expired', 'urgent', 'urgent', 'warning'], 'active'),
+            'days': pd.Series(diff, index=series.index).where(known).astype('Int64'),
+            'label_ar': np.select(conditions, ['غير معروف', 'منتهي منذ ' + abs_txt + ' يوم', 'ينتهي اليوم', left_ar, left_ar], 'ساري'),
+            'label_en': np.select(conditions, ['Unknown', 'Expired ' + abs_txt + ' days ago', 'Expires Today', left_en, left_en], 'Active'),
+            'color': np.select(conditions, ['grey', 'red', 'red', 'orange', 'yellow'], 'green'),
+        }, index=series.index)
+
+    @staticmethod
+    def classify_column(series, data_version=None):
+        """
+        classify() for a whole sheet column, cached with st.cache_data once
+        per (column hash, data version, day) instead of once per cell.
+        """
+        series = pd.Series(series)
+        return _classify_cached(column_digest(series), data_version, date.today(), series)
+
+    @staticmethod
+    def status_display(classified, lang):
+        """
+        (days sort key, localized 'Contract Status' label) arrays for the
+        dashboard and search tables; unknown dates sort last as 9999 days.
+        """
+        status = classified['status'].to_numpy()
+        days = classified['days'].fillna(9999).to_numpy(dtype=np.int64)
+        days_txt = days.astype(str).astype(object)
+        abs_txt = np.abs(days).astype(str).astype(object)
+        if lang == 'ar':
+            labels = np.select(
+                [status == 'expired', np.isin(status, ['urgent', 'warning'])],
+                ["❌ منتهي (منذ " + abs_txt + " يوم)", "⚠️ عاجل (متبقى " + days_txt + " يوم)"],
+                "✅ ساري (متبقى " + days_txt + " يوم)")
+        else:
+            labels = classified['label_en'].to_numpy(dtype=object) + " (" + abs_txt + " Days)"
+        return days, labels
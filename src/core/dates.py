@@ -0,0 +1,237 @@
+"""
+Sheet Date Parsing
+One parser for every date / timestamp column of the sheets (contract end,
+registration timestamps, customer request times). A column is parsed per
+distinct string: the strings are normalized in one vectorized step (Eastern
+Arabic digits, ص/م markers), the dominant formats are inferred from a sample
+and parsed with pd.to_datetime(format=...), and only the leftovers go through
+dateutil one by one. Results are memoized per distinct string, so later
+columns / versions of the same sheet mostly hit the memo.
+
+Formats are tried in dateutil's own precedence (month before day), so the
+vectorized passes agree with dateutil.parser.parse(dayfirst=False).
+
+    python -m src.core.dates    # benchmark against the per-cell path
+"""
+import re
+import numpy as np
+import pandas as pd
+from dateutil import parser as dateutil_parser
+
+MAX_MEMO = 100000
+_MEMO = {}  # (raw string, fuzzy) -> numpy datetime64[us] (NaT when unreadable)
+NAT = np.datetime64('NaT', 'us')
+
+SAMPLE_SIZE = 256
+_DIGITS_TABLE = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
+_MARKERS = re.compile(r'[صم]')
+
+# Candidate formats, in the order dateutil resolves ambiguous dates
+CANDIDATE_FORMATS = (
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %I:%M:%S %p', '%Y-%m-%d %I:%M %p',
+    '%Y/%m/%d', '%Y/%m/%d %H:%M:%S', '%Y/%m/%d %H:%M',
+    '%Y/%m/%d %I:%M:%S %p', '%Y/%m/%d %I:%M %p',
+    '%m/%d/%Y', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M',
+    '%m/%d/%Y %I:%M:%S %p', '%m/%d/%Y %I:%M %p',
+    '%d/%m/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M',
+    '%d/%m/%Y %I:%M:%S %p', '%d/%m/%Y %I:%M %p',
+    '%m-%d-%Y', '%d-%m-%Y', '%m.%d.%Y', '%d.%m.%Y',
+)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Normalization
+# ═══════════════════════════════════════════════════════════════
+
+def normalize_text(text):
+    """Western digits, ص/م markers moved to a trailing AM / PM."""
+    text = str(text).strip().translate(_DIGITS_TABLE)
+    if 'ص' in text or 'م' in text:
+        marker = 'AM' if 'ص' in text else 'PM'
+        text = _MARKERS.sub('', text).strip() + " " + marker
+    return text
+
+
+def normalize_texts(texts):
+    """normalize_text over a Series of strings in one vectorized pass."""
+    s = texts.str.strip().str.translate(_DIGITS_TABLE)
+    am = s.str.contains('ص', regex=False)
+    pm = s.str.contains('م', regex=False) & ~am
+    marked = am | pm
+    if marked.any():
+        marker = np.where(am[marked], ' AM', ' PM')
+        s = s.copy()
+        s[marked] = s[marked].str.replace(_MARKERS, '', regex=True).str.strip() + marker
+    return s
+
+
+# ═══════════════════════════════════════════════════════════════
+# Parsing
+# ═══════════════════════════════════════════════════════════════
+
+def _dateutil(text, fuzzy):
+    """Per-string fallback on normalized text: dateutil, then pandas' own guesser."""
+    if not text:
+        return NAT
+    try:
+        dt = dateutil_parser.parse(text, dayfirst=False, fuzzy=fuzzy)
+        if dt.tzinfo is not None:
+            dt = dt.replace(tzinfo=None)
+        return np.datetime64(dt, 'us')
+    except Exception:
+        pass
+    try:
+        ts = pd.to_datetime(text, errors='coerce')
+        if pd.isna(ts):
+            return NAT
+        if ts.tzinfo is not None:
+            ts = ts.tz_localize(None)
+        return np.datetime64(ts.to_pydatetime(), 'us')
+    except Exception:
+        return NAT
+
+
+def infer_formats(texts, sample_size=SAMPLE_SIZE):
+    """
+    Candidate formats (in precedence order) that parse part of an evenly
+    spaced sample of texts. A day-first format brings its month-first twin,
+    so ambiguous dates outside the sample still resolve month first.
+    """
+    if len(texts) > sample_size:
+        texts = texts.iloc[::len(texts) // sample_size + 1]
+    found = set()
+    for fmt in CANDIDATE_FORMATS:
+        if pd.to_datetime(texts, format=fmt, errors='coerce').notna().any():
+            found.add(fmt)
+            found.add(fmt.replace('%d', '%_').replace('%m', '%d').replace('%_', '%m'))
+    return [fmt for fmt in CANDIDATE_FORMATS if fmt in found]
+
+
+def _parse_distinct(texts, fuzzy):
+    """datetime64[us] array for a Series of distinct raw strings not yet memoized."""
+    clean = normalize_texts(texts)
+    result = np.full(len(clean), NAT)
+    pending = (clean != '').to_numpy(copy=True)
+    for fmt in infer_formats(clean[pending]) if pending.any() else ():
+        idx = np.flatnonzero(pending)
+        parsed = pd.to_datetime(clean.iloc[idx], format=fmt, errors='coerce')
+        hit = parsed.notna().to_numpy()
+        result[idx[hit]] = parsed[hit].to_numpy().astype('datetime64[us]')
+        pending[idx[hit]] = False
+        if not pending.any():
+            break
+    for i in np.flatnonzero(pending):
+        result[i] = _dateutil(clean.iat[i], fuzzy)
+    return result
+
+
+def parse_dates(values, fuzzy=False):
+    """
+    Series of datetime64[us] (NaT when unreadable) aligned with values (a
+    Series or any sequence of cells). Each distinct string is parsed once per
+    process; fuzzy=True lets dateutil skip surrounding words.
+    """
+    if not isinstance(values, pd.Series):
+        values = pd.Series(list(values), dtype=object)
+    codes, uniques = pd.factorize(values.astype(str), use_na_sentinel=False)
+    # astype(str) keeps missing cells missing on pandas' string dtype
+    uniques = np.array([text if isinstance(text, str) else '' for text in uniques], dtype=object)
+
+    parsed = np.empty(len(uniques), dtype='datetime64[us]')
+    missing = []
+    for i, text in enumerate(uniques):
+        day = _MEMO.get((text, fuzzy))
+        if day is None:
+            missing.append(i)
+        else:
+            parsed[i] = day
+    if missing:
+        fresh = _parse_distinct(pd.Series(uniques[missing], dtype=object), fuzzy)
+        parsed[missing] = fresh
+        if len(_MEMO) + len(missing) > MAX_MEMO:
+            _MEMO.clear()
+        _MEMO.update(zip(((uniques[i], fuzzy) for i in missing), fresh))
+    return pd.Series(parsed[codes], index=values.index)
+
+
+def parse_date(value, fuzzy=False):
+    """Single cell -> pd.Timestamp or NaT (same rules and memo as parse_dates)."""
+    if value is None:
+        return pd.NaT
+    text = str(value)
+    day = _MEMO.get((text, fuzzy))
+    if day is None:
+        day = _dateutil(normalize_text(text), fuzzy)
+        if len(_MEMO) >= MAX_MEMO:
+            _MEMO.clear()
+        _MEMO[(text, fuzzy)] = day
+    return pd.Timestamp(day)
+
+
+def format_dates(values, fmt='%Y-%m-%d'):
+    """
+    Display strings for a date column: the date in fmt, the original text
+    when it cannot be read, '' for blank cells.
+    """
+    values = pd.Series(values)
+    parsed = parse_dates(values)
+    text = values.astype(object).map(str)
+    blank = values.isna().to_numpy() | (text.str.strip() == '').to_numpy()
+    shown = parsed.dt.strftime(fmt).astype(object).where(parsed.notna(), text)
+    return shown.where(~blank, '')
+
+
+# ═══════════════════════════════════════════════════════════════
+# Benchmark
+# ═══════════════════════════════════════════════════════════════
+
+def _benchmark(rows=20000):
+    import random
+    import time
+
+    def per_cell(val):
+        # The previous per-cell path (dateutil on every cell)
+        try:
+            return pd.Timestamp(dateutil_parser.parse(normalize_text(val), dayfirst=False))
+        except Exception:
+            return pd.NaT
+
+    rng = random.Random(7)
+    eastern = str.maketrans('0123456789', '٠١٢٣٤٥٦٧٨٩')
+    cells = []
+    for _ in range(rows):
+        y, m, d = rng.randint(2020, 2027), rng.randint(1, 12), rng.randint(1, 28)
+        h, mi, sec = rng.randint(1, 12), rng.randint(0, 59), rng.randint(0, 59)
+        kind = rng.random()
+        if kind < 0.4:
+            cells.append(f"{m}/{d}/{y} {rng.randint(0, 23)}:{mi:02d}:{sec:02d}")
+        elif kind < 0.7:
+            cells.append(f"{y}-{m:02d}-{d:02d}")
+        elif kind < 0.9:
+            cell = f"{y}/{m:02d}/{d:02d} {h}:{mi:02d}:{sec:02d} {rng.choice('صم')}"
+            cells.append(cell.translate(eastern) if rng.random() < 0.5 else cell)
+        else:
+            cells.append(rng.choice(['', 'N/A', f"{d} March {y}", f"{d}.{m}.{y}"]))
+    column = pd.Series(cells)
+
+    start = time.perf_counter()
+    old = column.map(per_cell)
+    t_cell = time.perf_counter() - start
+
+    _MEMO.clear()
+    start = time.perf_counter()
+    new = parse_dates(column)
+    t_cold = time.perf_counter() - start
+    start = time.perf_counter()
+    parse_dates(column)
+    t_warm = time.perf_counter() - start
+
+    same = (pd.to_datetime(old) == new) | (old.isna() & new.isna())
+    print(f"{rows} cells, {column.nunique()} distinct: per-cell {t_cell * 1000:.0f} ms, "
+          f"parse_dates cold {t_cold * 1000:.0f} ms, warm {t_warm * 1000:.0f} ms, "
+          f"{int((~same).sum())} mismatches")
+
+
+if __name__ == "__main__":
+    _benchmark()
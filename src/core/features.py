@@ -0,0 +1,208 @@
+"""
+Normalized Shadow Columns
+Search and matching used to re-normalize every cell in Python on every query.
+This module materializes the normalized views once per data version
+(df.attrs['data_version'], stamped by DBClient) and keeps them in a side cache,
+extending them incrementally when a delta sync only appended rows.
+
+Columns (indexed like the source DataFrame):
+  text            lower-cased, Arabic-normalized row blob (search content)
+  flex            `text` without spaces/dashes (substring "flex" match)
+  geo_city        raw value of the city column used by search geo tiering
+  region          region key of `geo_city` (REGION_MAP key or None)
+  city_norm       matcher-normalized value of the schema city column
+  city_lower      lower-cased, stripped value of the schema city column
+  canonical_city  canonical Arabic city name of the schema city column
+  phone           normalized digits of every phone column, '|' separated
+  digits          normalized digits (5+ long) of every searchable column, '|' separated
+"""
+from collections import OrderedDict
+import threading
+import pandas as pd
+
+from src.core.matcher import (
+    _normalize, _find_city_region, _get_canonical_city, CITY_KEYWORDS,
+)
+from src.core.schema import schema_col
+
+# Columns never included in the searchable row text
+SEARCH_EXCLUDED_COLS = ["المهنة في الإقامة", "المهنة في الاقامه", "iqama profession", "listed on your iqama"]
+PHONE_COL_KEYWORDS = ['phone', 'جوال', 'هاتف', 'رقم', 'mobile', 'تليفون']
+
+_TEXT_TABLE = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ة": "ه", "ى": "ي"})
+_DIGITS_TABLE = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
+
+MAX_CACHED_VERSIONS = 5
+_FEATURES = OrderedDict()  # data_version -> features DataFrame
+_lock = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════════════════
+# Column selection (depends only on the headers)
+# ═══════════════════════════════════════════════════════════════
+
+def search_columns(df):
+    """Columns that make up the searchable row text (excludes internal and Iqama-profession columns)."""
+    cols = []
+    for col in df.columns:
+        col_lower = str(col).lower()
+        if str(col).startswith('__') or any(exc.lower() in col_lower for exc in SEARCH_EXCLUDED_COLS):
+            continue
+        cols.append(col)
+    return cols
+
+
+def geo_city_column(df):
+    """The city column search uses for geo tiering (last searchable column naming a city)."""
+    found = None
+    for col in search_columns(df):
+        if any(kw.lower() in str(col).lower() for kw in CITY_KEYWORDS):
+            found = col
+    return found
+
+
+def phone_columns(df):
+    return [c for c in df.columns if any(kw in str(c).lower() for kw in PHONE_COL_KEYWORDS)]
+
+
+# ═══════════════════════════════════════════════════════════════
+# Vectorized normalizers
+# ═══════════════════════════════════════════════════════════════
+
+def normalize_text_series(s):
+    """Vectorized equivalent of the search row-text normalization."""
+    return s.astype(str).str.lower().str.translate(_TEXT_TABLE)
+
+
+def flex_series(s):
+    return s.str.replace(r'[\s\-]', '', regex=True)
+
+
+def phone_digits_series(s):
+    """Vectorized SmartSearchEngine.normalize_phone (drops 00 / 966 prefixes and leading zeros)."""
+    digits = s.astype(str).str.translate(_DIGITS_TABLE).str.replace(r'\D', '', regex=True)
+    digits = digits.str.replace(r'^00', '', regex=True).str.replace(r'^966', '', regex=True)
+    return digits.str.lstrip('0')
+
+
+def map_distinct(s, func):
+    """Applies `func` once per distinct value of `s` instead of once per row."""
+    values = s.astype(str)
+    lookup = {v: func(v) for v in pd.unique(values)}
+    return values.map(lookup)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Feature computation
+# ═══════════════════════════════════════════════════════════════
+
+def compute_features(df):
+    """Builds the shadow columns for every row of df."""
+    feats = pd.DataFrame(index=df.index)
+    if '__sheet_row' in df.columns:
+        feats['__sheet_row'] = df['__sheet_row'].values
+
+    cols = search_columns(df)
+    if cols:
+        blob = df[cols[0]].astype(str)
+        for col in cols[1:]:
+            blob = blob + " " + df[col].astype(str)
+        feats['text'] = normalize_text_series(blob)
+    else:
+        feats['text'] = ""
+    feats['flex'] = flex_series(feats['text'])
+
+    geo_col = geo_city_column(df)
+    if geo_col is not None:
+        feats['geo_city'] = df[geo_col].astype(str)
+        feats['region'] = map_distinct(feats['geo_city'], _find_city_region)
+    else:
+        feats['geo_city'] = ""
+        feats['region'] = None
+
+    city_col = schema_col(df, 'city')
+    if city_col is not None:
+        city = df[city_col].astype(str)
+        feats['city_norm'] = map_distinct(city, _normalize)
+        feats['city_lower'] = city.str.lower().str.strip()
+        feats['canonical_city'] = map_distinct(city, _get_canonical_city)
+    else:
+        feats['city_norm'] = ""
+        feats['city_lower'] = ""
+        feats['canonical_city'] = ""
+
+    p_cols = phone_columns(df)
+    if p_cols:
+        phone = phone_digits_series(df[p_cols[0]])
+        for col in p_cols[1:]:
+            phone = phone + "|" + phone_digits_series(df[col])
+        feats['phone'] = phone
+    else:
+        feats['phone'] = ""
+
+    digits = pd.Series("", index=df.index)
+    for col in cols:
+        d = phone_digits_series(df[col])
+        digits = digits + "|" + d.where(d.str.len() >= 5, "")
+    feats['digits'] = digits
+    return feats
+
+
+def _aligned(feats, df):
+    """True when every row of df is covered by feats with the same sheet row."""
+    if not df.index.isin(feats.index).all():
+        return False
+    if '__sheet_row' in df.columns and '__sheet_row' in feats.columns:
+        return (feats['__sheet_row'].reindex(df.index).values == df['__sheet_row'].values).all()
+    return len(df) == len(feats)
+
+
+def row_features(df):
+    """
+    Returns the shadow columns for df (same index), computed at most once per
+    data version. Subsets of a versioned frame (filtered copies) reuse the
+    cached features; unversioned frames are computed on the fly.
+    """
+    version = df.attrs.get('data_version')
+    if not version:
+        return compute_features(df)
+
+    with _lock:
+        feats = _FEATURES.get(version)
+        if feats is not None:
+            _FEATURES.move_to_end(version)
+
+    if feats is None:
+        base = _FEATURES.get(df.attrs.get('base_version'))
+        base_rows = df.attrs.get('base_rows')
+        if base is not None and base_rows is not None and len(base) == base_rows and base_rows <= len(df):
+            # Appended rows / in-place edits: only the tail and the edited rows need computing
+            head = df.iloc[:base_rows]
+            if _aligned(base, head):
+                feats = pd.concat([base, compute_features(df.iloc[base_rows:])])
+                dirty = df.attrs.get('dirty_rows')
+                if dirty:
+                    fresh = compute_features(df.iloc[dirty])
+                    feats.loc[fresh.index, fresh.columns] = fresh
+        if feats is None:
+            feats = compute_features(df)
+        with _lock:
+            _FEATURES[version] = feats
+            while len(_FEATURES) > MAX_CACHED_VERSIONS:
+                _FEATURES.popitem(last=False)
+
+    if _aligned(feats, df):
+        return feats if feats.index.equals(df.index) else feats.loc[df.index]
+
+    # The cached entry came from a subset (or a reordered copy) of this version
+    fresh = compute_features(df)
+    if len(fresh) > len(feats):
+        with _lock:
+            _FEATURES[version] = fresh
+    return fresh
+
+
+def cached_features(version):
+    """The features cached for a data version (may cover only a subset), or None."""
+    with _lock:
+        return _FEATURES.get(version)
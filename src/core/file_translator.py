@@ -64,6 +64,18 @@ class TranslationService:
         self.target_lang = target_lang
         self.logger = logger
         self._translator = GoogleTranslator(source=source_lang, target=target_lang)
+        from src.core.translation_store import get_translation_store
+        self._store = get_translation_store()
+
+    def _translate_cached(self, text: str) -> str:
+        """One translator call, served from / saved to the shared translation store."""
+        cached = self._store.get(text, self.source_lang, self.target_lang)
+        if cached is not None:
+            return cached
+        result = self._translator.translate(text)
+        if result:
+            self._store.put(text, self.source_lang, self.target_lang, result)
+        return result
 
     def translate_text(self, text: str, progress_callback: Optional[Callable] = None) -> str:
         """Translate a single text string, with chunking for large content."""
@@ -73,7 +85,7 @@ class TranslationService:
         # If small enough, translate directly
         if len(text) <= CHUNK_SIZE:
             try:
-                result = self._translator.translate(text)
+                result = self._translate_cached(text)
                 if progress_callback:
                     progress_callback(1.0, "✅")
                 return result if result else text
@@ -88,7 +100,7 @@ class TranslationService:
 
         for i, chunk in enumerate(chunks):
             try:
-                result = self._translator.translate(chunk)
+                result = self._translate_cached(chunk)
                 translated_parts.append(result if result else chunk)
             except Exception as e:
                 logging.warning(f"Chunk {i+1}/{total} failed: {e}")
@@ -110,13 +122,20 @@ class TranslationService:
         indexed_texts = []
         results = [""] * len(texts)
 
+        # Texts already in the shared translation store skip the network
+        cached = self._store.get_many([t for t in texts if t and t.strip()], self.source_lang, self.target_lang)
         for i, txt in enumerate(texts):
             if txt and txt.strip():
-                indexed_texts.append((i, txt))
+                if txt.strip() in cached:
+                    results[i] = cached[txt.strip()]
+                else:
+                    indexed_texts.append((i, txt))
             else:
                 results[i] = txt
 
         if not indexed_texts:
+            if progress_callback:
+                progress_callback(1.0, "✅")
             return results
 
         # Build mega-chunks
@@ -152,9 +171,11 @@ class TranslationService:
             indices, combined = chunk_data
             try:
                 translated = self._translator.translate(combined)
-                if not translated: translated = combined
+                if not translated: return [(idx, texts[idx]) for idx in indices]
                 
                 if len(indices) == 1:
+                    translated = translated.strip()
+                    self._store.put(combined, self.source_lang, self.target_lang, translated)
                     return [(indices[0], translated)]
                 else:
                     parts = self._smart_split(translated, len(indices))
@@ -162,6 +183,9 @@ class TranslationService:
                     for j, part_idx in enumerate(indices):
                         val = parts[j].strip() if j < len(parts) else texts[part_idx]
                         chunk_results.append((part_idx, val))
+                    if len(parts) == len(indices):
+                        # Only cleanly split chunks are worth remembering
+                        self._store.put_many({texts[i]: v for i, v in chunk_results}, self.source_lang, self.target_lang)
                     return chunk_results
             except Exception as e:
                 import logging
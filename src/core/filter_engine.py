@@ -0,0 +1,105 @@
+"""
+Compiled Filter Columns
+SmartSearchEngine filters used to re-parse dates and re-normalize yes/no
+answers cell by cell on every search. This module compiles a source column
+once per data version into a typed array (datetime64 dates, numeric ages,
+stripped lower-case answers) and keeps it in a side cache, so each filter is
+a vectorized mask over the compiled array.
+"""
+from collections import OrderedDict
+import threading
+import pandas as pd
+
+from .dates import parse_dates
+
+MAX_CACHED_VERSIONS = 3
+_COMPILED = OrderedDict()  # data_version -> {(kind, column): Series}
+_lock = threading.Lock()
+
+# Answer vocabularies of the yes/no filters (compared after strip + lower)
+NO_WORKING = {'no', 'لا', 'none', 'false', '0', 'n', 'no tr', 'no-tr'}
+NO_ANSWERS = {'no', 'لا', 'none', 'false', '0', 'n'}
+YES_ANSWERS = {'yes', 'نعم', 'true', '1', 'y', 'ok'}
+
+
+# ═══════════════════════════════════════════════════════════════
+# Column compilers
+# ═══════════════════════════════════════════════════════════════
+
+def _compile_date(s):
+    return parse_dates(s)
+
+
+def _compile_age(s):
+    return pd.to_numeric(s.astype(str).str.extract(r'(\d+)')[0], errors='coerce')
+
+
+def _compile_answer(s):
+    return s.astype(str).str.strip().str.lower()
+
+
+_COMPILERS = {
+    'date': _compile_date,
+    'age': _compile_age,
+    'answer': _compile_answer,
+}
+
+
+def compiled_column(df, column, kind):
+    """
+    Returns `column` of df compiled as `kind` ('date', 'age' or 'answer'),
+    aligned with df. Versioned frames (and their filtered copies) compile each
+    row at most once per data version.
+    """
+    compile_fn = _COMPILERS[kind]
+    version = df.attrs.get('data_version')
+    if not version:
+        return compile_fn(df[column])
+
+    key = (kind, column)
+    with _lock:
+        entry = _COMPILED.get(version)
+        if entry is None:
+            entry = _COMPILED[version] = {}
+            while len(_COMPILED) > MAX_CACHED_VERSIONS:
+                _COMPILED.popitem(last=False)
+        else:
+            _COMPILED.move_to_end(version)
+        cached = entry.get(key)
+
+    if cached is None or not df.index.isin(cached.index).all():
+        missing = df.index if cached is None else df.index.difference(cached.index)
+        fresh = compile_fn(df.loc[missing, column])
+        cached = fresh if cached is None else pd.concat([cached, fresh])
+        with _lock:
+            entry[key] = cached
+    return cached if cached.index.equals(df.index) else cached.loc[df.index]
+
+
+# ═══════════════════════════════════════════════════════════════
+# Masks
+# ═══════════════════════════════════════════════════════════════
+
+def date_range_mask(df, column, start, end):
+    """Rows whose date falls inside [start day 00:00, end day 23:59:59]."""
+    dates = compiled_column(df, column, 'date')
+    s_date = pd.to_datetime(start).normalize()
+    e_date = pd.to_datetime(end).normalize() + pd.Timedelta(hours=23, minutes=59, seconds=59)
+    return (dates.notna() & (dates >= s_date) & (dates <= e_date)).values
+
+
+def answer_mask(df, column, answers):
+    return compiled_column(df, column, 'answer').isin(list(answers)).values
+
+
+def age_mask(df, column, age_min, age_max):
+    ages = compiled_column(df, column, 'age')
+    return (ages.notna() & (ages >= age_min) & (ages <= age_max)).values
+
+
+def contains_mask(df, column, pattern, regex=False):
+    """Case-insensitive substring/regex test evaluated once per distinct value."""
+    values = df[column].astype(str)
+    uniques = pd.Series(pd.unique(values))
+    hits = uniques.str.contains(pattern, case=False, na=False, regex=regex)
+    return values.map(dict(zip(uniques, hits.values))).values.astype(bool)
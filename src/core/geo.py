@@ -0,0 +1,222 @@
+"""
+Geo Resolver
+Compiles REGION_MAP, REGION_PROXIMITY and the city entries of AR_TO_EN
+(src/core/matcher.py) once into lookup tables, replacing the per-call loops
+over every region and alias.
+
+The matcher compares " text " and " alias " (space padded, Arabic side
+normalized, English side lower-cased) in both directions: the alias occurs in
+the text, or the text occurs in the alias. Each alias table answers the first
+direction with an Aho-Corasick automaton and the second with a hash map of
+every space-bounded substring of the aliases, returning the alias that the old
+loop would have reached first. Results are memoized per distinct input string.
+"""
+from collections import deque
+import threading
+import pandas as pd
+
+from src.core.matcher import REGION_MAP, REGION_PROXIMITY, AR_TO_EN, _normalize
+
+NO_TIER = 99
+MAX_MEMO = 20000
+
+
+# ═══════════════════════════════════════════════════════════════
+# Alias tables
+# ═══════════════════════════════════════════════════════════════
+
+class _AhoCorasick:
+    """Finds the lowest-priority pattern occurring in a text in one pass."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.best = [None]
+        for text, priority in patterns:
+            node = 0
+            for ch in text:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.best.append(None)
+                node = nxt
+            self.best[node] = priority if self.best[node] is None else min(self.best[node], priority)
+
+        # Breadth-first failure links; each node inherits the best output of its suffix chain
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0) if node else 0
+                inherited = self.best[self.fail[child]]
+                if inherited is not None:
+                    own = self.best[child]
+                    self.best[child] = inherited if own is None else min(own, inherited)
+                queue.append(child)
+
+    def search(self, text):
+        best = None
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            found = self.best[node]
+            if found is not None and (best is None or found < best):
+                best = found
+        return best
+
+
+class _AliasTable:
+    """
+    Aliases of one side (normalized Arabic or lower-case English), each with a
+    priority (its position in the original loop order).
+    """
+
+    def __init__(self, entries):
+        padded = [(f" {alias} ", priority) for alias, priority in entries]
+        self.contains = _AhoCorasick(padded)
+        # Every " ... " substring of an alias: the text is inside the alias
+        self.within = {}
+        for text, priority in padded:
+            spaces = [i for i, ch in enumerate(text) if ch == " "]
+            for a, i in enumerate(spaces):
+                for j in spaces[a + 1:]:
+                    key = text[i:j + 1]
+                    if priority < self.within.get(key, priority + 1):
+                        self.within[key] = priority
+
+    def first(self, padded_text):
+        """Priority of the first alias that contains or is contained in the text, or None."""
+        hits = [p for p in (self.contains.search(padded_text), self.within.get(padded_text)) if p is not None]
+        return min(hits) if hits else None
+
+
+class _Lookup:
+    """Arabic + English alias tables sharing one priority order and payload list."""
+
+    def __init__(self):
+        self.ar, self.en, self.payloads = [], [], []
+
+    def add(self, payload, ar_aliases, en_aliases):
+        for alias in ar_aliases:
+            self.ar.append((_normalize(alias), len(self.payloads)))
+            self.payloads.append(payload)
+        for alias in en_aliases:
+            self.en.append((alias, len(self.payloads)))
+            self.payloads.append(payload)
+
+    def compile(self):
+        self.ar_table, self.en_table = _AliasTable(self.ar), _AliasTable(self.en)
+        return self
+
+    def resolve(self, text_norm, text_lower):
+        hits = [p for p in (self.ar_table.first(f" {text_norm} "), self.en_table.first(f" {text_lower} "))
+                if p is not None]
+        return self.payloads[min(hits)] if hits else None
+
+
+# ═══════════════════════════════════════════════════════════════
+# Resolver
+# ═══════════════════════════════════════════════════════════════
+
+class GeoResolver:
+    """Compiled region / city lookups with per-string memo tables."""
+
+    def __init__(self):
+        self.regions = _Lookup()
+        self.cities = _Lookup()
+        for region_key, data in REGION_MAP.items():
+            self.regions.add(region_key, data["aliases_ar"], data["aliases_en"])
+            self.cities.add(region_key, data["cities_ar"], data["cities_en"])
+        self.regions.compile()
+        self.cities.compile()
+
+        # Canonical city names: AR_TO_EN keys that are region cities, checked with their English aliases
+        city_names = {c for data in REGION_MAP.values() for c in data["cities_ar"]}
+        self.canonical = _Lookup()
+        for ar_key, en_aliases in AR_TO_EN.items():
+            if ar_key in city_names:
+                self.canonical.add(ar_key, [ar_key], [])
+                self.canonical.add(ar_key, [], [en.lower() for en in en_aliases])
+        self.canonical.compile()
+
+        self.tiers = {}
+        for region_key, ordered in REGION_PROXIMITY.items():
+            for i, other in enumerate(ordered):
+                self.tiers.setdefault((region_key, other), 2 + i)
+
+        self._memo = {'region': {}, 'city': {}, 'canonical': {}}
+
+    def _memoized(self, kind, key, compute):
+        memo = self._memo[kind]
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        except TypeError:  # Unhashable input
+            return compute()
+        value = compute()
+        if len(memo) >= MAX_MEMO:
+            memo.clear()
+        memo[key] = value
+        return value
+
+    def region_of(self, location_text):
+        """Region key when the text names a region (alias), else None."""
+        return self._memoized('region', location_text, lambda: self.regions.resolve(
+            _normalize(location_text), str(location_text).lower().strip()))
+
+    def city_region(self, city_text):
+        """Region key of the city named by the text, else None."""
+        return self._memoized('city', city_text, lambda: self.cities.resolve(
+            _normalize(city_text), str(city_text).lower().strip()))
+
+    def canonical_city(self, val):
+        """Canonical Arabic city name of the text ('riyadh', 'Riyad' -> 'الرياض'), else a cleaned fallback."""
+        if not val or pd.isna(val) or str(val).strip().lower() == "nan":
+            return str(val)
+
+        def compute():
+            found = self.canonical.resolve(_normalize(str(val)), str(val).lower().strip())
+            if found is not None:
+                return found
+            s = str(val).strip()
+            return s.title() if s.isascii() else s
+        return self._memoized('canonical', val, compute)
+
+    def proximity_tier(self, region_a, region_b):
+        """1 = same region, 2+ = proximity rank of region_b seen from region_a, NO_TIER otherwise."""
+        if region_a and region_a == region_b:
+            return 1
+        return self.tiers.get((region_a, region_b), NO_TIER)
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = GeoResolver()
+    return _resolver
+
+
+def city_region(text):
+    return get_resolver().city_region(text)
+
+
+def canonical_city(text):
+    return get_resolver().canonical_city(text)
+
+
+def proximity_tier(region_a, region_b):
+    return get_resolver().proximity_tier(region_a, region_b)
@@ -0,0 +1,174 @@
+"""
+Request -> Candidate Match Table
+Process-wide table of ranked workers (positions, scores, geo tiers) for every
+open customer request, maintained by a background job so the order-processing
+screen reads matches instead of recomputing them on every visit.
+
+Requests are keyed by the criteria the ranking depends on (OrderMatcher
+.request_key). When the customer sheet changes, only requests without an
+entry are ranked against all workers and closed requests are dropped. When
+the worker sheet moves to a version that appended or edited rows of the
+table's version (DBClient._stamp_version), only those rows are scored against
+the open requests and merged into the existing rankings; any other change
+rebuilds the table.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import numpy as np
+
+from .order_matcher import OrderMatcher
+
+
+class MatchTable:
+    _executor = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.worker_version = None
+        self.worker_index = None    # Index of the worker frame the entries are ranked on
+        self.customer_version = None
+        self.entries = {}           # request key -> ranking (see OrderMatcher.order)
+        self._pending = None
+        self._running = False
+
+    # ═══════════════════════════════════════════════════════════════
+    # Background job
+    # ═══════════════════════════════════════════════════════════════
+
+    def schedule(self, workers_df, customers_df, customer_cols, tm=None):
+        """
+        Queues an update for the latest sheets. Only one job runs at a time;
+        calls made while it runs collapse into a single follow-up update.
+        """
+        with self._lock:
+            self._pending = (workers_df, customers_df, customer_cols, tm)
+            if self._running:
+                return
+            self._running = True
+            if MatchTable._executor is None:
+                MatchTable._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="match-table")
+        MatchTable._executor.submit(self._drain)
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                args, self._pending = self._pending, None
+                if args is None:
+                    self._running = False
+                    return
+            try:
+                self.update(*args)
+            except Exception as e:
+                print(f"[ERROR] Match table update failed: {e}")
+
+    # ═══════════════════════════════════════════════════════════════
+    # Updates
+    # ═══════════════════════════════════════════════════════════════
+
+    def _changed_rows(self, workers_df):
+        """Worker positions to rescore when workers_df derives from the table's version, else None."""
+        attrs = workers_df.attrs
+        base_rows = attrs.get('base_rows')
+        if (self.worker_version is None or attrs.get('base_version') != self.worker_version
+                or base_rows != len(self.worker_index) or not workers_df.index.is_unique
+                or not workers_df.index[:base_rows].equals(self.worker_index)):
+            return None
+        appended = np.arange(base_rows, len(workers_df), dtype=np.int64)
+        return np.union1d(appended, np.asarray(attrs.get('dirty_rows') or [], dtype=np.int64))
+
+    @staticmethod
+    def _patch(matcher, customer_row, ranked, rows):
+        """Rescores `rows` for one request and merges them into its ranking."""
+        stale = np.isin(ranked['positions'], rows)
+        keep, pct, geo = matcher.score(customer_row, rows)
+        return matcher.order(
+            np.concatenate([ranked['positions'][~stale], rows[keep]]),
+            np.concatenate([ranked['scores'][~stale], pct[keep]]),
+            np.concatenate([ranked['tiers'][~stale], geo[keep]]))
+
+    def update(self, workers_df, customers_df, customer_cols, tm=None):
+        """Brings the table up to date with the given (unfiltered) worker and customer sheets."""
+        worker_version = workers_df.attrs.get('data_version')
+        customer_version = customers_df.attrs.get('data_version')
+        if not worker_version:
+            return
+        if worker_version == self.worker_version and customer_version and customer_version == self.customer_version:
+            return
+
+        matcher = OrderMatcher(workers_df, customer_cols, tm)
+        requests = {}
+        for _, row in customers_df.iterrows():
+            requests.setdefault(matcher.request_key(row), row)
+
+        entries = dict(self.entries)
+        rescored = 0
+        if worker_version != self.worker_version:
+            rows = self._changed_rows(workers_df)
+            if rows is None:
+                entries = {}
+            elif len(rows):
+                # New / edited workers are scored against the open requests only
+                for key, ranked in entries.items():
+                    if key in requests:
+                        entries[key] = self._patch(matcher, requests[key], ranked, rows)
+                        rescored += 1
+
+        # New requests are ranked against all workers; closed requests are dropped
+        fresh = 0
+        for key, row in requests.items():
+            if key not in entries:
+                entries[key] = matcher.rank(row)
+                fresh += 1
+        entries = {key: entries[key] for key in requests}
+
+        with self._lock:
+            self.entries = entries
+            self.worker_version = worker_version
+            self.worker_index = workers_df.index
+            self.customer_version = customer_version
+        print(f"[DEBUG] Match table: {fresh} new request(s), {rescored} patched, {len(entries)} open")
+
+    # ═══════════════════════════════════════════════════════════════
+    # Reads
+    # ═══════════════════════════════════════════════════════════════
+
+    def lookup(self, workers_df, request_key):
+        """
+        Precomputed ranking of a request for workers_df (the table's worker
+        frame or a filtered subset of it), or None when not available yet.
+        """
+        with self._lock:
+            ranked = self.entries.get(request_key)
+            index = self.worker_index
+            current = workers_df.attrs.get('data_version') == self.worker_version
+        if ranked is None or not current:
+            return None
+        if index.equals(workers_df.index):
+            return ranked
+
+        # Filtered subset: a ranking restricted to some workers keeps its order
+        if not workers_df.index.is_unique:
+            return None
+        positions = workers_df.index.get_indexer(index[ranked['positions']])
+        present = positions >= 0
+        tiers = ranked['tiers'][present]
+        return {
+            'positions': positions[present],
+            'scores': ranked['scores'][present],
+            'tiers': tiers,
+            'city_count': int((tiers == 0).sum()),
+            'region_count': int((tiers == 1).sum()),
+        }
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_match_table():
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = MatchTable()
+    return _table
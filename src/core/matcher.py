@@ -8,8 +8,12 @@ Matches customer requests with available candidates based on:
   5. Geographic expansion fallback
 """
 import re
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 
+from src.core.categorical import category_mask
+
 
 # ═══════════════════════════════════════════════════════════════
 # Geographic Data — Regions → Cities (Arabic + English)
@@ -240,6 +244,24 @@ AR_TO_EN = {
 }
 
 
+_AR_NORM_ENTRIES = None   # [(normalized Arabic key, English values)] in AR_TO_EN order
+_AR_NORM_INDEX = None     # normalized Arabic key -> English values of every key sharing it
+_TRANSLATION_MEMO = {}    # stripped text -> English equivalents
+MAX_TRANSLATION_MEMO = 20000
+
+
+def _ar_norm_tables():
+    """Reverse index of AR_TO_EN by normalized key (built once)."""
+    global _AR_NORM_ENTRIES, _AR_NORM_INDEX
+    if _AR_NORM_INDEX is None:
+        entries = [(_normalize(ar_key), en_vals) for ar_key, en_vals in AR_TO_EN.items()]
+        index = {}
+        for ar_norm, en_vals in entries:
+            index.setdefault(ar_norm, []).extend(en_vals)
+        _AR_NORM_ENTRIES, _AR_NORM_INDEX = entries, index
+    return _AR_NORM_ENTRIES, _AR_NORM_INDEX
+
+
 def _translate_ar_to_en(text):
     """
     Translate Arabic text to all possible English equivalents.
@@ -249,6 +271,11 @@ def _translate_ar_to_en(text):
         return []
 
     text_clean = str(text).strip()
+    cached = _TRANSLATION_MEMO.get(text_clean)
+    if cached is not None:
+        return cached
+
+    entries, index = _ar_norm_tables()
     results = []
 
     # Direct lookup
@@ -257,16 +284,19 @@ def _translate_ar_to_en(text):
 
     # Normalized lookup
     text_norm = _normalize(text_clean)
-    for ar_key, en_vals in AR_TO_EN.items():
-        ar_norm = _normalize(ar_key)
-        if ar_norm == text_norm:
-            results.extend(en_vals)
-        elif len(text_norm) > 3 and text_norm in ar_norm:
-            # Substring match: e.g. "باريستا" in "باريستا فلبيني"
-            results.extend(en_vals)
+    results.extend(index.get(text_norm, []))
+    if len(text_norm) > 3:
+        # Substring match: e.g. "باريستا" in "باريستا فلبيني"
+        for ar_norm, en_vals in entries:
+            if ar_norm != text_norm and text_norm in ar_norm:
+                results.extend(en_vals)
         # REMOVED: ar_norm in text_norm (This was too broad, e.g. "منسق" in "منسق زهور")
 
-    return list(set(results))
+    results = list(set(results))
+    if len(_TRANSLATION_MEMO) >= MAX_TRANSLATION_MEMO:
+        _TRANSLATION_MEMO.clear()
+    _TRANSLATION_MEMO[text_clean] = results
+    return results
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -316,64 +346,117 @@ def _find_col(df, keywords):
     return None
 
 
-def _fuzzy_match(value, target):
+def _schema_col(df, field):
+    """Column for a canonical field from the fetch-time schema (see src/core/schema.py)."""
+    from src.core.schema import schema_col  # Lazy: schema builds on the keyword lists below
+    return schema_col(df, field)
+
+
+def _row_features(df):
+    """Normalized shadow columns of df (see src/core/features.py)."""
+    from src.core.features import row_features  # Lazy: features builds on the helpers below
+    return row_features(df)
+
+
+_BOUNDARY = r'(?:^|[\s,:;.\-/])(?:{})(?:[\s,:;.\-/]|$)'
+
+
+class BilingualMatcher:
     """
-    Bilingual fuzzy match: checks Arabic AND English equivalents.
-    value = what's in the database (could be English)
-    target = what the user searched for (could be Arabic)
+    _fuzzy_match compiled for one target: the target's normalized form, its
+    English translations and their word-boundary patterns are built once, and
+    verdicts are memoized per distinct database value.
     """
-    if not value or not target:
-        return False
+    MAX_MEMO = 20000
+
+    def __init__(self, target):
+        t_str = str(target).strip() if target else ""
+        self.valid = bool(t_str) and t_str.lower() != "nan"
+        self.t_lower = t_str.lower()
+        self.memo = {}
+        if not self.valid:
+            return
+
+        t_norm = _normalize(t_str)
+        # 1. Normalized (Arabic) target as a distinct part of the normalized value
+        self.norm_re = re.compile(_BOUNDARY.format(re.escape(t_norm))) if t_norm else None
+        # 2 + 3. Lower-case target and its English translations inside the lower-case value
+        alternatives = [self.t_lower] + [en.lower() for en in _translate_ar_to_en(t_str)]
+        self.lower_re = re.compile(_BOUNDARY.format("|".join(re.escape(a) for a in alternatives)))
+
+    def matches(self, value):
+        if not self.valid or not value:
+            return False
+        try:
+            return self.memo[value]
+        except KeyError:
+            pass
+        except TypeError:  # Unhashable value
+            return self._evaluate(value)
+        verdict = self._evaluate(value)
+        if len(self.memo) >= self.MAX_MEMO:
+            self.memo.clear()
+        self.memo[value] = verdict
+        return verdict
+
+    def match_series(self, s):
+        """Boolean array over s, evaluating each distinct value once."""
+        codes, uniques = pd.factorize(s, use_na_sentinel=False)
+        verdicts = np.array([self.matches(v) for v in uniques], dtype=bool)
+        return verdicts[codes]
+
+    def _evaluate(self, value):
+        v_str = str(value).strip()
+        if not v_str or v_str.lower() == "nan":
+            return False
+
+        v_lower = v_str.lower()
+        v_norm = _normalize(v_str)
 
-    v_str = str(value).strip()
-    t_str = str(target).strip()
+        if self.norm_re is not None and v_norm and self.norm_re.search(v_norm):
+            return True
+        if self.lower_re.search(v_lower):
+            return True
+
+        # 4. Translate value (Arabic) → English, match against target
+        t_lower = self.t_lower
+        for en in _translate_ar_to_en(v_str):
+            en_lower = en.lower()
+            if t_lower == en_lower or t_lower in en_lower:
+                return True
+            if re.search(_BOUNDARY.format(re.escape(en_lower)), t_lower):
+                return True
 
-    if not v_str or not t_str or v_str.lower() == "nan" or t_str.lower() == "nan":
         return False
 
-    v_lower = v_str.lower()
-    t_lower = t_str.lower()
-    v_norm = _normalize(v_str)
-    t_norm = _normalize(t_str)
 
-    # 1. Direct Arabic/normalized match (More strict)
-    if t_norm and v_norm:
-        if t_norm == v_norm:
-            return True
-        # Check if target is a distinct part of the value (e.g. "باريستا" in "باريستا فلبيني")
-        pattern = r'(?:^|[\s,:;.\-/])' + re.escape(t_norm) + r'(?:[\s,:;.\-/]|$)'
-        if re.search(pattern, v_norm):
-            return True
+_MATCHERS = OrderedDict()  # target -> BilingualMatcher
+MAX_MATCHERS = 256
 
-    # 2. Direct English match (both already in English)
-    if t_lower and v_lower:
-        if t_lower == v_lower:
-            return True
-        pattern_en = r'(?:^|[\s,:;.\-/])' + re.escape(t_lower) + r'(?:[\s,:;.\-/]|$)'
-        if re.search(pattern_en, v_lower):
-            return True
 
-    # 3. Translate target (Arabic) → English, match against value
-    en_translations = _translate_ar_to_en(t_str)
-    for en in en_translations:
-        en_lower = en.lower()
-        if en_lower == v_lower:
-            return True
-        pattern_trans = r'(?:^|[\s,:;.\-/])' + re.escape(en_lower) + r'(?:[\s,:;.\-/]|$)'
-        if re.search(pattern_trans, v_lower):
-            return True
+def bilingual_matcher(target):
+    """Returns the (cached) BilingualMatcher for a search target."""
+    try:
+        matcher = _MATCHERS.get(target)
+    except TypeError:
+        return BilingualMatcher(target)
+    if matcher is None:
+        matcher = BilingualMatcher(target)
+        _MATCHERS[target] = matcher
+        while len(_MATCHERS) > MAX_MATCHERS:
+            _MATCHERS.popitem(last=False)
+    else:
+        _MATCHERS.move_to_end(target)
+    return matcher
 
-    # 4. Translate value (Arabic) → English, match against target
-    en_val_translations = _translate_ar_to_en(v_str)
-    for en in en_val_translations:
-        en_lower = en.lower()
-        if t_lower == en_lower or t_lower in en_lower:
-            return True
-        pattern_trans = r'(?:^|[\s,:;.\-/])' + re.escape(en_lower) + r'(?:[\s,:;.\-/]|$)'
-        if re.search(pattern_trans, t_lower):
-            return True
 
-    return False
+def _fuzzy_match(value, target):
+    """
+    Bilingual fuzzy match: checks Arabic AND English equivalents.
+    value = what's in the database (could be English)
+    target = what the user searched for (could be Arabic)
+    """
+    return bilingual_matcher(target).matches(value)
 
 
 def _resolve_region(location_text):
@@ -381,19 +464,11 @@ def _resolve_region(location_text):
     Determine if the location is a region or a specific city.
     Returns: (is_region: bool, region_key: str or None, target_cities_ar: list, target_cities_en: list)
     """
-    loc_norm = f" {_normalize(location_text)} "
-    loc_lower = f" {str(location_text).lower().strip()} "
-
-    # Check if it matches a region alias
-    for region_key, data in REGION_MAP.items():
-        for alias in data["aliases_ar"]:
-            alias_norm = f" {_normalize(alias)} "
-            if alias_norm == loc_norm or loc_norm in alias_norm or alias_norm in loc_norm:
-                return True, region_key, data["cities_ar"], data["cities_en"]
-        for alias in data["aliases_en"]:
-            alias_lower = f" {alias} "
-            if alias_lower == loc_lower or loc_lower in alias_lower or alias_lower in loc_lower:
-                return True, region_key, data["cities_ar"], data["cities_en"]
+    from src.core.geo import get_resolver  # Lazy: the resolver compiles the tables above
+    region_key = get_resolver().region_of(location_text)
+    if region_key:
+        data = REGION_MAP[region_key]
+        return True, region_key, data["cities_ar"], data["cities_en"]
 
     # Not a region — it's a specific city
     return False, None, [location_text], [location_text]
@@ -401,50 +476,15 @@ def _resolve_region(location_text):
 
 def _find_city_region(city_text):
     """Find which region a city belongs to."""
-    city_norm = f" {_normalize(city_text)} "
-    city_lower = f" {str(city_text).lower().strip()} "
-    for region_key, data in REGION_MAP.items():
-        for c in data["cities_ar"]:
-            c_norm = f" {_normalize(c)} "
-            if c_norm == city_norm or city_norm in c_norm or c_norm in city_norm:
-                return region_key
-        for c in data["cities_en"]:
-            c_lower = f" {c} "
-            if c_lower == city_lower or city_lower in c_lower or c_lower in city_lower:
-                return region_key
-    return None
+    from src.core.geo import city_region
+    return city_region(city_text)
 
 
 # ─────────────────────────────────────────
 def _get_canonical_city(val):
     """Map variations like 'riyadh', 'Riyad', 'Riyadh city' to canonical 'الرياض'."""
-    if not val or pd.isna(val) or str(val).strip().lower() == "nan":
-        return str(val)
-    v_norm = f" {_normalize(str(val))} "
-    v_lower = f" {str(val).lower().strip()} "
-    
-    # Identify canonical city by checking AR_TO_EN aliases
-    for ar_key, en_aliases in AR_TO_EN.items():
-        is_city = False
-        for data in REGION_MAP.values():
-            if ar_key in data["cities_ar"]:
-                is_city = True
-                break
-        if not is_city:
-            continue
-            
-        ar_pad = f" {_normalize(ar_key)} "
-        if ar_pad in v_norm or v_norm in ar_pad:
-            return ar_key
-            
-        for en_t in en_aliases:
-            en_pad = f" {en_t.lower()} "
-            if en_pad in v_lower or v_lower in en_pad:
-                return ar_key
-                
-    # Fallback
-    s = str(val).strip()
-    return s.title() if s.isascii() else s
+    from src.core.geo import canonical_city
+    return canonical_city(val)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -583,67 +623,75 @@ class CandidateMatcher:
 
     # ─────────────────────────────────────────
     # Step 3: Filter by Nationality + Gender + Location
+    # Filters narrow an Index of candidate labels; rows are only taken
+    # from self.candidates once, for the returned groups.
     # ─────────────────────────────────────────
+    def _take(self, rows):
+        return self.candidates.loc[rows]
+
+    def _column_text(self, rows, col):
+        """Cell text of `col` for `rows` ('' for missing / 'nan' cells)."""
+        if not col:
+            return pd.Series("", index=rows)
+        values = self.candidates.loc[rows, col]
+        text = values.astype(str)
+        return text.where(values.notna() & (text.str.strip() != "nan"), "")
+
     def _filter_basic(self, nationality, gender):
-        """Filter candidates by nationality AND gender (mandatory)."""
-        df = self.candidates.copy()
+        """Labels of candidates matching nationality AND gender (mandatory)."""
+        df = self.candidates
+        rows = df.index
         if df.empty:
-            return df
+            return rows
 
         # Find columns
-        nat_col = _find_col(df, NATIONALITY_KEYWORDS)
-        gen_col = _find_col(df, GENDER_KEYWORDS)
+        nat_col = _schema_col(df, 'nationality')
+        gen_col = _schema_col(df, 'gender')
 
         self.debug_info["nat_col"] = nat_col
         self.debug_info["gen_col"] = gen_col
 
+        # Predicates run once per distinct nationality / gender value
+        mask = np.ones(len(df), dtype=bool)
         if nat_col and nationality:
-            mask = df[nat_col].apply(lambda v: _fuzzy_match(v, nationality))
-            df = df[mask]
+            mask &= category_mask(df, nat_col, bilingual_matcher(nationality).matches)
 
         if gen_col and gender:
-            mask = df[gen_col].apply(lambda v: _fuzzy_match(v, gender))
-            df = df[mask]
+            mask &= category_mask(df, gen_col, bilingual_matcher(gender).matches)
 
-        return df
+        return rows[mask]
 
-    def _filter_by_location(self, df, cities_ar, cities_en):
-        """Filter candidates by city within the target cities list."""
-        if df.empty:
-            return df
+    def _filter_by_location(self, rows, cities_ar, cities_en):
+        """Labels of `rows` whose city is within the target cities list."""
+        if rows.empty:
+            return rows
 
-        city_col = _find_col(df, CITY_KEYWORDS)
+        city_col = _schema_col(self.candidates, 'city')
         if not city_col:
-            return df
+            return rows
 
         self.debug_info["city_col"] = city_col
 
-        all_targets = [_normalize(c) for c in cities_ar] + [c.lower() for c in cities_en]
+        all_targets = set([_normalize(c) for c in cities_ar] + [c.lower() for c in cities_en])
 
-        def city_match(val):
-            if not val or str(val).strip() == "" or str(val).strip().lower() == "nan":
-                return False
-            v_norm = f" {_normalize(str(val))} "
-            v_lower = f" {str(val).lower().strip()} "
-            for t in all_targets:
-                t_padded = f" {t} "
-                # STRICT EQUALITY MATCH ONLY (to avoid Riyadh matching Riyadh Al Khabra)
-                if t_padded == v_norm or t_padded == v_lower:
-                    return True
-            return False
+        # STRICT EQUALITY MATCH ONLY (to avoid Riyadh matching Riyadh Al Khabra)
+        feats = _row_features(self.candidates)
+        city_norm = feats['city_norm'].loc[rows]
+        city_lower = feats['city_lower'].loc[rows]
+        has_city = ~city_lower.isin(["", "nan"])
+        mask = has_city & (city_norm.isin(all_targets) | city_lower.isin(all_targets))
+        return rows[mask.values]
 
-        return df[df[city_col].apply(city_match)]
-
-    def _filter_by_job(self, df, job_text):
+    def _filter_by_job(self, rows, job_text):
         """
         Phase A: Create a combined text of 'job' and 'skills' (as requested by user).
                  Search exactly across this combined 'Nature of the worker's work'.
         """
-        if df.empty or not job_text:
-            return df, "none"
+        if rows.empty or not job_text:
+            return rows, "none"
 
-        job_col = _find_col(df, JOB_KEYWORDS)
-        skills_col = _find_col(df, SKILLS_KEYWORDS)
+        job_col = _schema_col(self.candidates, 'job')
+        skills_col = _schema_col(self.candidates, 'skills')
 
         self.debug_info["job_col"] = job_col
         self.debug_info["skills_col"] = skills_col
@@ -653,19 +701,12 @@ class CandidateMatcher:
         critical_kws = ["زهور", "ورد", "flower", "flowers", "قهوة", "مقهى", "coffee", "طبخ", "طباخ", "cook", "chef", "باريستا", "barista", "بدكير", "منكير", "pedicure", "manicure", "nail"]
         required_kws = [kw for kw in critical_kws if kw in job_text]
 
-        def exact_combine_and_match(row):
-            j = str(row[job_col]) if job_col and pd.notna(row[job_col]) and str(row[job_col]).strip() != "nan" else ""
-            s = str(row[skills_col]) if skills_col and pd.notna(row[skills_col]) and str(row[skills_col]).strip() != "nan" else ""
-            
-            if j and s:
-                nature = f"{j} / {s}"
-            elif j:
-                nature = j
-            elif s:
-                nature = s
-            else:
-                nature = ""
-                
+        # "job / skills", or whichever of the two is present
+        j = self._column_text(rows, job_col)
+        s = self._column_text(rows, skills_col)
+        nature = j.where(s == "", j + " / " + s).where(j != "", s)
+
+        def nature_matches(nature):
             if not nature:
                 return False
                 
@@ -677,13 +718,19 @@ class CandidateMatcher:
 
             return _fuzzy_match(nature, job_text)
 
-        mask = df.apply(exact_combine_and_match, axis=1)
-        job_results = df[mask]
+        # Evaluated once per distinct job/skills text
+        verdicts = {v: nature_matches(v) for v in pd.unique(nature)}
+        job_rows = rows[nature.map(verdicts).values.astype(bool)]
         
-        if not job_results.empty:
-            return job_results, "job"
+        if not job_rows.empty:
+            return job_rows, "job"
+
+        return rows[:0], "none"
 
-        return pd.DataFrame(), "none"
+    def _group_by_city(self, rows):
+        """Splits `rows` by canonical city: [(city, labels), ...] in first-seen order."""
+        canon = _row_features(self.candidates)['canonical_city'].loc[rows]
+        return [(city, rows[(canon == city).values]) for city in canon.unique()]
 
     # ─────────────────────────────────────────
     # Step 4: Geographic Expansion
@@ -694,16 +741,16 @@ class CandidateMatcher:
         sorted by proximity to the original location.
         Returns list of dicts: [{"city": ..., "region": ..., "candidates": df}, ...]
         """
-        base_df = self._filter_basic(nationality, gender)
-        if base_df.empty:
+        base_rows = self._filter_basic(nationality, gender)
+        if base_rows.empty:
             return []
 
         # Filter by job/skills
-        base_df, _ = self._filter_by_job(base_df, job_text)
-        if base_df.empty:
+        base_rows, _ = self._filter_by_job(base_rows, job_text)
+        if base_rows.empty:
             return []
 
-        city_col = _find_col(base_df, CITY_KEYWORDS)
+        city_col = _schema_col(self.candidates, 'city')
         if not city_col:
             return []
 
@@ -718,44 +765,28 @@ class CandidateMatcher:
             else:
                 ordered_regions = list(REGION_MAP.keys())
 
-        raw_results = []
-        for region_key in ordered_regions:
-            region_data = REGION_MAP[region_key]
-            region_cities_ar = region_data["cities_ar"]
-            region_cities_en = region_data["cities_en"]
-
-            region_df = self._filter_by_location(base_df, region_cities_ar, region_cities_en)
-            if not region_df.empty:
-                # Group by canonical city
-                df_temp = region_df.copy()
-                df_temp['__canon_city'] = df_temp[city_col].apply(_get_canonical_city)
-                
-                for canon_city in df_temp['__canon_city'].unique():
-                    city_candidates = df_temp[df_temp['__canon_city'] == canon_city].drop(columns=['__canon_city'])
-                    raw_results.append({
-                        "city": str(canon_city),
-                        "region": region_key,
-                        "count": len(city_candidates),
-                        "candidates": city_candidates,
-                    })
-
-        # --- POST-PROCESSING: CONSOLDATE AND SUM EQUAL CITIES ---
+        # --- CONSOLIDATE EQUAL CITIES ---
         # If the same city appeared in multiple regions (unlikely with strict match, but good for safety)
         # or if multiple variations mapped to same canon city.
         consolidated = {}
-        for item in raw_results:
-            city_key = item["city"]
-            if city_key in consolidated:
-                # Sum the counts and merge candidates
-                consolidated[city_key]["count"] += item["count"]
-                consolidated[city_key]["candidates"] = pd.concat(
-                    [consolidated[city_key]["candidates"], item["candidates"]], 
-                    ignore_index=True
-                )
-            else:
-                consolidated[city_key] = item
+        for region_key in ordered_regions:
+            region_data = REGION_MAP[region_key]
+            region_rows = self._filter_by_location(base_rows, region_data["cities_ar"], region_data["cities_en"])
+            for canon_city, city_rows in self._group_by_city(region_rows):
+                city_key = str(canon_city)
+                if city_key in consolidated:
+                    consolidated[city_key]["rows"].append(city_rows)
+                else:
+                    consolidated[city_key] = {"city": city_key, "region": region_key, "rows": [city_rows]}
 
-        return list(consolidated.values())
+        results = []
+        for item in consolidated.values():
+            parts = item.pop("rows")
+            candidates = self._take(parts[0].append(parts[1:]) if len(parts) > 1 else parts[0])
+            if len(parts) > 1:
+                candidates = candidates.reset_index(drop=True)
+            results.append(dict(item, count=len(candidates), candidates=candidates))
+        return results
 
     # ─────────────────────────────────────────
     # Main Match Function (All 5 Steps)
@@ -777,10 +808,10 @@ class CandidateMatcher:
         job = criteria["job"]
 
         # Step 2: Base Filter (Nationality + Gender + Job)
-        base_df = self._filter_basic(nationality, gender)
-        base_df, local_source = self._filter_by_job(base_df, job)
+        base_rows = self._filter_basic(nationality, gender)
+        base_rows, local_source = self._filter_by_job(base_rows, job)
         
-        if base_df.empty:
+        if base_rows.empty:
             return {
                 "criteria": criteria,
                 "local_results": pd.DataFrame(),
@@ -797,32 +828,28 @@ class CandidateMatcher:
             region_key = _find_city_region(location)
 
         # A. Local matches (Target City or Target Region)
-        local_df = self._filter_by_location(base_df, geo["target_cities_ar"], geo["target_cities_en"])
+        local_rows = self._filter_by_location(base_rows, geo["target_cities_ar"], geo["target_cities_en"])
         
         # B. Expansion (Find everything else and rank it)
-        remaining_pool = base_df[~base_df.index.isin(local_df.index)]
+        remaining_pool = base_rows[~base_rows.isin(local_rows)]
         expanded_results = []
         
         if not remaining_pool.empty:
-            city_col = _find_col(remaining_pool, CITY_KEYWORDS)
+            city_col = _schema_col(self.candidates, 'city')
             if city_col:
                 # 1. Same Region (if a specific city was searched)
                 if not is_region and region_key:
                     r_data = REGION_MAP[region_key]
-                    r_df = self._filter_by_location(remaining_pool, r_data["cities_ar"], r_data["cities_en"])
-                    if not r_df.empty:
-                        r_df = r_df.copy()
-                        r_df['__canon'] = r_df[city_col].apply(_get_canonical_city)
-                        for city_name in r_df['__canon'].unique():
-                            city_items = r_df[r_df['__canon'] == city_name].drop(columns=['__canon'])
-                            expanded_results.append({
-                                "city": city_name,
-                                "region": region_key,
-                                "tier": 1,
-                                "count": len(city_items),
-                                "candidates": city_items
-                            })
-                        remaining_pool = remaining_pool[~remaining_pool.index.isin(r_df.index)]
+                    r_rows = self._filter_by_location(remaining_pool, r_data["cities_ar"], r_data["cities_en"])
+                    for city_name, city_rows in self._group_by_city(r_rows):
+                        expanded_results.append({
+                            "city": city_name,
+                            "region": region_key,
+                            "tier": 1,
+                            "count": len(city_rows),
+                            "candidates": self._take(city_rows)
+                        })
+                    remaining_pool = remaining_pool[~remaining_pool.isin(r_rows)]
 
                 # 2. Other Regions (by proximity)
                 if region_key and region_key in REGION_PROXIMITY:
@@ -834,23 +861,19 @@ class CandidateMatcher:
                 for idx, r_name in enumerate(ordered_others, start=2):
                     if r_name == region_key: continue
                     r_data = REGION_MAP[r_name]
-                    r_df = self._filter_by_location(remaining_pool, r_data["cities_ar"], r_data["cities_en"])
-                    if not r_df.empty:
-                        r_df = r_df.copy()
-                        r_df['__canon'] = r_df[city_col].apply(_get_canonical_city)
-                        for city_name in r_df['__canon'].unique():
-                            city_items = r_df[r_df['__canon'] == city_name].drop(columns=['__canon'])
-                            expanded_results.append({
-                                "city": city_name,
-                                "region": r_name,
-                                "tier": idx,
-                                "count": len(city_items),
-                                "candidates": city_items
-                            })
-                        remaining_pool = remaining_pool[~remaining_pool.index.isin(r_df.index)]
+                    r_rows = self._filter_by_location(remaining_pool, r_data["cities_ar"], r_data["cities_en"])
+                    for city_name, city_rows in self._group_by_city(r_rows):
+                        expanded_results.append({
+                            "city": city_name,
+                            "region": r_name,
+                            "tier": idx,
+                            "count": len(city_rows),
+                            "candidates": self._take(city_rows)
+                        })
+                    remaining_pool = remaining_pool[~remaining_pool.isin(r_rows)]
 
         # Final Status
-        if not local_df.empty:
+        if len(local_rows):
             status = "found_local"
         elif expanded_results:
             status = "found_expanded"
@@ -860,7 +883,7 @@ class CandidateMatcher:
         return {
             "criteria": criteria,
             "geo_scope": geo,
-            "local_results": local_df,
+            "local_results": self._take(local_rows),
             "local_source": local_source,
             "expanded_results": expanded_results,
             "status": status,
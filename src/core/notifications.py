@@ -2,6 +2,7 @@ import streamlit as st
 import os
 import json
 from datetime import datetime
+from src.core.schema import get_schema
 
 def check_notifications():
     """Checks for new worker entries or customer requests and synchronizes UI data."""
@@ -14,16 +15,6 @@ def check_notifications():
     if 'notif_last_cust_count' not in st.session_state: st.session_state.notif_last_cust_count = None
     if 'notif_triggered' not in st.session_state: st.session_state.notif_triggered = False
 
-    def find_col(df, keywords):
-        cols = list(df.columns)
-        import re
-        for kw in keywords:
-            kw_norm = kw.replace('ة', '[ةه]').replace('ه', '[ةه]')
-            pattern = re.compile(kw_norm, re.IGNORECASE)
-            for c in cols:
-                if pattern.search(str(c)): return c
-        return None
-
     def safe_val(row, col_name):
         if col_name is None: return '---'
         val = str(row.get(col_name, '---')).strip()
@@ -68,11 +59,12 @@ def check_notifications():
             
         if last_worker_count is not None and current_worker_count > last_worker_count:
             new_rows = df_workers.tail(current_worker_count - last_worker_count)
-            c_name = find_col(df_workers, ['Full Name', 'الاسم'])
-            c_nat = find_col(df_workers, ['Nationality', 'الجنسية'])
-            c_phone = find_col(df_workers, ['Phone Number', 'رقم الهاتف', 'هاتف'])
-            c_job = find_col(df_workers, ['Which job are you looking for', 'الوظيفة'])
-            c_gender = find_col(df_workers, ['Gender', 'الجنس'])
+            w_schema = get_schema(df_workers)
+            c_name = w_schema['full_name'] or w_schema['name']
+            c_nat = w_schema['nationality']
+            c_phone = w_schema['phone']
+            c_job = w_schema['job_wanted'] or w_schema['job']
+            c_gender = w_schema['gender']
 
             for _, row in new_rows.iterrows():
                 name = safe_val(row, c_name)
@@ -85,7 +77,7 @@ def check_notifications():
                 })
                 st.toast(f"🆕 عامل جديد: {name}", icon="🔔")
                 st.session_state.notif_triggered = True
-            st.session_state.db.fetch_data(force=True)
+            # New rows were already appended to the shared cache by the delta sync above
             
             disk_state['last_row_candidates'] = current_worker_count
             with open(STATE_FILE, "w") as f: json.dump(disk_state, f, indent=4)
@@ -102,11 +94,12 @@ def check_notifications():
         if last_cust_count is not None and current_cust_count > last_cust_count:
             new_rows = df_cust.tail(current_cust_count - last_cust_count)
             
-            c_comp = find_col(df_cust, ['اسم الشركه', 'المؤسسة', 'الشركة', 'Company'])
-            c_phone = find_col(df_cust, ['الموبيل', 'جوال', 'هاتف', 'Mobile'])
-            c_salary = find_col(df_cust, ['الراتب المتوقع', 'Expected salary', 'الراتب'])
-            c_nat = find_col(df_cust, ['الجنسية المطلوبة', 'Required nationality', 'الجنسية'])
-            c_loc = find_col(df_cust, ['موقع العمل', 'المدينة'])
+            c_schema = get_schema(df_cust)
+            c_comp = c_schema['company']
+            c_phone = c_schema['phone']
+            c_salary = c_schema['salary']
+            c_nat = c_schema['required_nationality'] or c_schema['nationality']
+            c_loc = c_schema['work_location'] or c_schema['city']
             
             for _, row in new_rows.iterrows():
                 comp = safe_val(row, c_comp)
@@ -119,7 +112,7 @@ def check_notifications():
                 })
                 st.toast(f"🔔 طلب جديد: {comp}", icon="☕")
                 st.session_state.notif_triggered = True 
-            st.session_state.db.fetch_customer_requests(force=True)
+            # New rows were already appended to the shared cache by the delta sync above
             
             disk_state['last_row_customer_requests'] = current_cust_count
             with open(STATE_FILE, "w") as f: json.dump(disk_state, f, indent=4)
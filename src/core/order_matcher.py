@@ -0,0 +1,438 @@
+"""
+Order Matching Engine
+Matches customer requests (order processing) against the worker sheet.
+
+Worker-side features (gender, nationality parts, job text and its synonym
+groups, city region, registration time) are computed once per distinct value
+and kept per data version. Each customer criterion then becomes a verdict per
+distinct worker value, broadcast to the rows as a NumPy mask, so ranking one
+request costs a few array operations instead of a Python loop over workers.
+Verdicts are memoized per (customer value, worker value) pair across data
+versions, so requests sharing a nationality, category or job reuse them and a
+new sheet version only judges the values it has not seen before.
+"""
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+import numpy as np
+import pandas as pd
+
+from .matcher import bilingual_matcher, _fuzzy_match, _find_city_region
+from .geo import proximity_tier, NO_TIER
+from .schema import get_schema
+from .categorical import factorize, map_categories
+from .dates import parse_dates
+
+MAX_CACHED_FEATURES = 3
+MAX_VERDICTS = 2000
+_FEATURES = OrderedDict()  # (data_version, index digest, schema) -> WorkerFeatures
+_VALUE_VERDICTS = OrderedDict()  # (criterion, customer value) -> {worker value: verdict}
+_lock = threading.Lock()
+
+GENERIC_JOB_WORDS = {"coordinator", "supervisor", "worker", "employee", "manager",
+                     "منسق", "عامل", "موظف", "بائع", "صانع", "مقدم", "مشرف",
+                     "sales", "driver", "and", "the", "a", "an", "or", "in", "of"}
+
+# Domain synonym groups (cross-language matching for common professions)
+JOB_SYNONYM_GROUPS = [
+    {"flower", "flowers", "florist", "floral", "زهور", "ورد", "floriculture"},
+    {"coffee", "barista", "باريستا", "قهوة", "مقهى", "كوفي", "cafe"},
+    {"cook", "cooking", "chef", "طباخ", "طبخ", "شيف", "cuisine"},
+    {"clean", "cleaner", "cleaning", "نظافة", "تنظيف", "نظافه"},
+    {"hair", "hairdresser", "stylist", "حلاق", "كوافير", "مصفف", "شعر", "coiffeur"},
+    {"nail", "manicure", "pedicure", "بدكير", "منكير", "اظافر"},
+    {"massage", "مساج", "spa"},
+    {"pastry", "dessert", "sweets", "حلا", "حلويات", "معجنات"},
+    {"nurse", "nursing", "ممرض", "ممرضة", "تمريض"},
+    {"driver", "driving", "سائق", "قيادة"},
+    {"butcher", "جزار", "لحام", "لحوم", "meat", "مجزر"},
+    {"waiter", "waitress", "نادل", "نادلة", "garson"},
+    {"secretary", "سكرتيرة", "سكرتير", "admin", "اداري", "ادارية"},
+    {"guard", "security", "حارس", "أمن", "امن", "حراسة"},
+    {"carpenter", "نجار", "نجارة", "woodwork"},
+    {"plumber", "سباك", "سباكة", "plumbing"},
+    {"electrician", "كهربائي", "كهرباء", "electrical"},
+    {"painter", "دهان", "طلاء", "painting"},
+    {"tailor", "خياط", "خياطة", "sewing"},
+    {"mechanic", "ميكانيكي", "صيانة", "maintenance"},
+    {"welder", "لحام", "welding"},
+    {"farmer", "مزارع", "فلاح", "farm", "زراعة", "agriculture"},
+    {"baker", "خباز", "مخبز", "bakery"},
+    {"cashier", "كاشير", "محاسب", "صراف"},
+    {"salesman", "مندوب", "مبيعات", "sales representative"},
+    {"teacher", "مدرس", "معلم", "تعليم", "teaching"},
+    {"accountant", "محاسب", "حسابات", "accounting"},
+    {"warehouse", "مستودع", "مخزن", "storekeeper"},
+    {"delivery", "توصيل", "مندوب توصيل"},
+    {"housemaid", "خادمة", "شغالة", "عاملة منزلية", "domestic"},
+]
+
+
+# ═══════════════════════════════════════════════════════════════
+# Scalar criteria
+# ═══════════════════════════════════════════════════════════════
+
+def normalize(text):
+    if not text: return ""
+    s = str(text).strip().lower()
+    s = re.sub(r'[^\w\s\-]', ' ', s, flags=re.UNICODE)
+    return ' '.join(s.split()).strip()
+
+
+def match_gender(customer_category, worker_gender):
+    cat = normalize(customer_category)
+    gen = normalize(worker_gender)
+    if not cat or not gen: return True
+    is_male_request = ("رجال" in cat) or (re.search(r'\bmale\b', cat) and "female" not in cat)
+    is_female_request = ("نساء" in cat) or ("female" in cat)
+    if is_male_request:
+        return re.search(r'\bmale\b', gen) is not None and "female" not in gen
+    elif is_female_request:
+        return "female" in gen
+    return True
+
+
+def _clean_parts(text):
+    """Splits a nationality cell by its separators after removing emojis (flags, etc.)."""
+    clean = re.sub(r'[^\w\s\-–|/]', ' ', text)
+    return [p.strip() for p in re.split(r'[\-–|/]', clean) if p.strip()]
+
+
+def nationality_terms(customer_nat, tm=None):
+    """Normalized search terms of a customer nationality request, with translations when tm is given."""
+    terms = set()
+    for cp in _clean_parts(str(customer_nat).strip()):
+        terms.add(normalize(cp))
+        if tm:
+            for bundle in tm.analyze_query(cp):
+                for s in bundle:
+                    terms.add(normalize(s))
+    return terms
+
+
+def _nationality_hit(terms, worker_parts):
+    for term in terms:
+        if not term: continue
+        for wp in worker_parts:
+            if not wp: continue
+            # Strict or high-confidence match
+            if term == wp or (len(term) > 3 and (term in wp or wp in term)):
+                return True
+    return False
+
+
+def match_nationality(customer_nat, worker_nat, tm=None):
+    c_raw = str(customer_nat).strip()
+    w_raw = str(worker_nat).strip()
+    if not c_raw or not w_raw: return True
+    w_parts = [normalize(wp) for wp in _clean_parts(w_raw)]
+    return _nationality_hit(nationality_terms(c_raw, tm), w_parts)
+
+
+def _synonym_bits(text_lower):
+    bits = 0
+    for i, group in enumerate(JOB_SYNONYM_GROUPS):
+        if any(syn in text_lower for syn in group):
+            bits |= 1 << i
+    return bits
+
+
+def _job_keywords(c_job):
+    """Meaningful words of a customer job request (generic title words skipped)."""
+    words = []
+    for cw in re.split(r'[\s,،/\-–]+', c_job):
+        cw = cw.strip()
+        if cw and len(cw) >= 3 and cw.lower() not in GENERIC_JOB_WORDS:
+            words.append(cw)
+    return words
+
+
+def match_job(customer_job, worker_job):
+    c_job = str(customer_job).strip()
+    w_job_raw = str(worker_job).strip()
+    if not c_job or not w_job_raw: return True
+
+    c_norm = normalize(c_job)
+    w_norm = normalize(w_job_raw)
+    if not c_norm or not w_norm: return True
+
+    # 1. Direct full phrase match (normalized)
+    if c_norm in w_norm or w_norm in c_norm:
+        return True
+    # 2. Bilingual full phrase match (uses Arabic↔English translation)
+    if _fuzzy_match(w_job_raw, c_job):
+        return True
+    # 3. Word-level bilingual matching
+    if any(_fuzzy_match(w_job_raw, cw) for cw in _job_keywords(c_job)):
+        return True
+    # 4. Domain synonym groups
+    return bool(_synonym_bits(c_job.lower()) & _synonym_bits(w_job_raw.lower()))
+
+
+# ═══════════════════════════════════════════════════════════════
+# Worker features (once per data version)
+# ═══════════════════════════════════════════════════════════════
+
+class _Column:
+    """Row codes + distinct str() values of one worker criterion column."""
+
+    def __init__(self, codes, uniques):
+        self.codes = codes
+        self.values = [str(u) for u in uniques]
+
+
+class WorkerFeatures:
+    def __init__(self, df, schema):
+        self.size = len(df)
+        self.gender = self._column(df, schema['gender'])
+        self.nationality = self._column(df, schema['nationality'])
+        self.city = self._column(df, schema['saudi_city'])
+        self.job = self._job_column(df, schema['job_wanted'], schema['other_jobs'])
+
+        # Newest registration first inside equal scores (NaT sorts last)
+        ts_col = schema['timestamp']
+        self.ts_key = self._timestamp_key(df, ts_col) if ts_col else np.zeros(len(df))
+
+        self._arrays = {}  # (criterion, customer value) -> verdict array over self's distinct values
+
+    @staticmethod
+    def _timestamp_key(df, column):
+        """-epoch seconds per row (0 when unreadable), parsing each distinct timestamp once."""
+        codes, uniques = factorize(df, column)
+        parsed = parse_dates(uniques)
+        seconds = parsed.to_numpy().astype('datetime64[us]').astype(np.int64) / 1e6
+        return np.where(parsed.notna().to_numpy(), -seconds, 0.0)[codes]
+
+    @staticmethod
+    def _column(df, column):
+        if not column:
+            return None
+        return _Column(*factorize(df, column))
+
+    @staticmethod
+    def _job_column(df, job_col, other_col):
+        if not job_col and not other_col:
+            return None
+        empty = np.full(len(df), "", dtype=object)
+        job = map_categories(df, job_col, str) if job_col else empty
+        other = map_categories(df, other_col, str) if other_col else empty
+        has_job, has_other = job != "", other != ""
+        text = np.where(has_job & has_other, job + " / " + other, np.where(has_job, job, other))
+        codes, uniques = pd.factorize(text)
+        return _Column(codes, uniques)
+
+    def verdicts(self, kind, cv, column, compute, dtype=bool):
+        """
+        Verdict per distinct value of `column` for the customer value cv.
+        compute(values) judges worker values; values already judged for cv
+        (under any data version) come from the shared memo.
+        """
+        key = (kind, cv)
+        found = self._arrays.get(key)
+        if found is not None:
+            return found
+
+        with _lock:
+            memo = _VALUE_VERDICTS.get(key)
+            if memo is None:
+                memo = _VALUE_VERDICTS[key] = {}
+                while len(_VALUE_VERDICTS) > MAX_VERDICTS:
+                    _VALUE_VERDICTS.popitem(last=False)
+            else:
+                _VALUE_VERDICTS.move_to_end(key)
+        missing = [v for v in column.values if v not in memo]
+        if missing:
+            memo.update(zip(missing, compute(missing)))
+
+        found = np.array([memo[v] for v in column.values], dtype=dtype)
+        if len(self._arrays) >= MAX_VERDICTS:
+            self._arrays.clear()
+        self._arrays[key] = found
+        return found
+
+
+def get_worker_features(df):
+    """WorkerFeatures of df, shared by every render of the same (filtered) worker frame."""
+    schema = get_schema(df)
+    version = df.attrs.get('data_version')
+    if not version:
+        return WorkerFeatures(df, schema)
+
+    digest = hashlib.md5(pd.util.hash_pandas_object(df.index, index=False).values.tobytes()).hexdigest()
+    key = (version, digest, tuple(sorted((k, str(v)) for k, v in schema.items())))
+    with _lock:
+        feats = _FEATURES.get(key)
+        if feats is not None:
+            _FEATURES.move_to_end(key)
+            return feats
+
+    feats = WorkerFeatures(df, schema)
+    with _lock:
+        _FEATURES[key] = feats
+        while len(_FEATURES) > MAX_CACHED_FEATURES:
+            _FEATURES.popitem(last=False)
+    return feats
+
+
+# ═══════════════════════════════════════════════════════════════
+# Batch matcher
+# ═══════════════════════════════════════════════════════════════
+
+class OrderMatcher:
+    """
+    Ranks workers for customer requests.
+
+    customer_cols maps 'category', 'nationality', 'work_nature' and 'location'
+    to the customer sheet columns (None when missing).
+    """
+    FIELDS = ('category', 'nationality', 'work_nature', 'location')
+
+    def __init__(self, workers_df, customer_cols, tm=None):
+        self.workers_df = workers_df
+        self.customer_cols = customer_cols
+        self.tm = tm
+        self.feats = get_worker_features(workers_df)
+
+    def _value(self, customer_row, field):
+        col = self.customer_cols.get(field)
+        return str(customer_row.get(col, "")) if col else None
+
+    def request_key(self, customer_row):
+        """The criteria a ranking depends on: requests with the same key share their matches."""
+        return tuple(self._value(customer_row, field) for field in self.FIELDS) + (self.tm is not None,)
+
+    # --- Verdicts per distinct worker value ---
+
+    def _gender_verdicts(self, cv):
+        return self.feats.verdicts('gender', cv, self.feats.gender, lambda values: [
+            bool(match_gender(cv, wv)) for wv in values])
+
+    def _nationality_verdicts(self, cv):
+        def compute(values):
+            terms = nationality_terms(cv.strip(), self.tm)
+            return [not wv.strip() or _nationality_hit(terms, [normalize(wp) for wp in _clean_parts(wv.strip())])
+                    for wv in values]
+        return self.feats.verdicts(('nationality', self.tm is not None), cv, self.feats.nationality, compute)
+
+    def _job_verdicts(self, cv):
+        def compute(values):
+            c_job = cv.strip()
+            c_norm = normalize(c_job)
+            c_bits = _synonym_bits(c_job.lower())
+            matchers = [bilingual_matcher(c_job)] + [bilingual_matcher(cw) for cw in _job_keywords(c_job)]
+            verdicts = []
+            for wv in values:
+                # An empty combined job text never matches (the worker has no job at all)
+                raw = wv.strip()
+                w_norm = normalize(raw)
+                verdicts.append(wv != "" and (
+                    not raw or not c_norm or not w_norm or c_norm in w_norm or w_norm in c_norm
+                    or any(m.matches(raw) for m in matchers)
+                    or bool(c_bits & _synonym_bits(raw.lower()))))
+            return verdicts
+        return self.feats.verdicts('job', cv, self.feats.job, compute)
+
+    def _geo_verdicts(self, cv):
+        def compute(values):
+            c_region = _find_city_region(cv)
+            matcher = bilingual_matcher(cv)
+            return [0 if matcher.matches(wv) else proximity_tier(c_region, _find_city_region(wv))
+                    for wv in values]
+        return self.feats.verdicts('geo', cv, self.feats.city, compute, dtype=np.int64)
+
+    # --- Ranking ---
+
+    def score(self, customer_row, rows=None):
+        """
+        Scores one request against the workers at positions `rows` (None =
+        all). Returns (keep, pct, geo) aligned with rows: keep = passes the
+        hard filters with a score >= 1, pct = percentage score, geo = 0 same
+        city, 1 same region, 2+ proximity rank, NO_TIER otherwise.
+        """
+        f = self.feats
+        rows = np.arange(f.size) if rows is None else np.asarray(rows, dtype=np.int64)
+        n = len(rows)
+        keep = np.ones(n, dtype=bool)
+        score = np.zeros(n, dtype=np.int64)
+        total = 0
+        geo = np.full(n, NO_TIER, dtype=np.int64)
+
+        hard_filters = (('category', f.gender, self._gender_verdicts),
+                        ('nationality', f.nationality, self._nationality_verdicts),
+                        ('work_nature', f.job, self._job_verdicts))
+        for field, column, verdicts_fn in hard_filters:
+            cv = self._value(customer_row, field)
+            if cv is None or column is None or not cv.strip():
+                continue
+            keep &= verdicts_fn(cv)[column.codes[rows]]
+            total += 1
+            score += 1
+
+        cv = self._value(customer_row, 'location')
+        if cv is not None and f.city is not None and cv.strip():
+            total += 1
+            geo = self._geo_verdicts(cv)[f.city.codes[rows]]
+            score += geo < NO_TIER
+
+        if total == 0:
+            keep[:] = False
+        keep &= score >= 1
+        pct = np.zeros(n, dtype=np.int64)
+        pct[keep] = (score[keep] / total * 100).astype(np.int64)
+        return keep, pct, geo
+
+    def order(self, positions, pct, geo):
+        """
+        Ranks matched worker positions: same-city matches, then same region,
+        then the rest; each group by score (desc), geo tier (rest only) and
+        registration time (newest first), ties in worker order.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        first = np.argsort(positions, kind='stable')
+        positions, pct, geo = positions[first], np.asarray(pct)[first], np.asarray(geo)[first]
+
+        groups = []
+        for tier, group in enumerate((geo == 0, geo == 1, geo > 1)):
+            members = np.flatnonzero(group)
+            gt = geo[members] if tier == 2 else np.zeros(len(members), dtype=np.int64)
+            groups.append(members[np.lexsort((self.feats.ts_key[positions[members]], gt, -pct[members]))])
+
+        selected = np.concatenate(groups)
+        return {
+            'positions': positions[selected],
+            'scores': pct[selected],
+            'tiers': geo[selected],
+            'city_count': len(groups[0]),
+            'region_count': len(groups[1]),
+        }
+
+    def rank(self, customer_row):
+        """
+        Ranks the workers for one request. Returns a dict with the worker
+        positions (city matches, then region, then others), their percentage
+        scores and geo tiers, plus city_count / region_count.
+        """
+        keep, pct, geo = self.score(customer_row)
+        return self.order(np.flatnonzero(keep), pct[keep], geo[keep])
+
+    def rank_all(self, customers_df, table=None):
+        """
+        {customer index label: rank()} for every row of customers_df. Rankings
+        already precomputed in `table` (a MatchTable) are read instead.
+        """
+        results = {}
+        for idx, row in customers_df.iterrows():
+            ranked = table.lookup(self.workers_df, self.request_key(row)) if table is not None else None
+            results[idx] = ranked if ranked is not None else self.rank(row)
+        return results
+
+    def materialize(self, ranked):
+        """(worker rows, scores, city_count, region_count) in the shape the order-processing UI renders."""
+        positions = ranked['positions']
+        rows = self.workers_df.iloc[positions]
+        split = ranked['city_count'] + ranked['region_count']
+        workers = [w for _, w in rows.iloc[:split].iterrows()]
+        others = rows.iloc[split:].assign(**{'__geo_tier': ranked['tiers'][split:]})
+        workers += [w for _, w in others.iterrows()]
+        return workers, [int(s) for s in ranked['scores']], ranked['city_count'], ranked['region_count']
@@ -0,0 +1,169 @@
+"""
+Phone Number Index
+Maps normalized national-significant phone digits (no 00 / 966 prefix, no
+leading zeros) to row labels, built once per data version.
+
+Every suffix of length >= MIN_SUFFIX of every distinct number is kept in a
+sorted array, so "number contains the query" (full or partial number) is a
+binary search for the query as a suffix prefix instead of a scan of every
+phone cell. Queries shorter than MIN_SUFFIX return None and callers fall back
+to their scan.
+
+Appended rows become a new segment; rows edited since the base version are
+re-checked directly, so delta syncs and sheet edits do not force a rebuild.
+"""
+from collections import OrderedDict
+import threading
+import numpy as np
+import pandas as pd
+
+from src.core.features import row_features, cached_features, phone_digits_series
+
+MIN_SUFFIX = 5
+MAX_SEGMENTS = 4
+MAX_CACHED_INDEXES = 4
+_INDEXES = OrderedDict()  # (data_version, column) -> PhoneIndex
+_lock = threading.Lock()
+
+
+def normalize_phone(text):
+    """Scalar form of features.phone_digits_series."""
+    return phone_digits_series(pd.Series([text])).iloc[0]
+
+
+class _Segment:
+    """Sorted suffix array over the distinct numbers of a block of rows."""
+
+    def __init__(self, source):
+        tokens = source.str.split('|').explode()
+        tokens = tokens[tokens.str.len() >= MIN_SUFFIX]
+        codes, numbers = pd.factorize(tokens.values)
+
+        # Row labels grouped by number code
+        order = np.argsort(codes, kind='stable')
+        self.labels = tokens.index.values[order]
+        self.starts = np.searchsorted(codes[order], np.arange(len(numbers) + 1))
+
+        suffixes, suffix_codes = [], []
+        for code, number in enumerate(numbers):
+            for i in range(len(number) - MIN_SUFFIX + 1):
+                suffixes.append(number[i:])
+                suffix_codes.append(code)
+        suffixes = np.array(suffixes, dtype=str)
+        order = np.argsort(suffixes, kind='stable')
+        self.suffixes = suffixes[order]
+        self.suffix_codes = np.array(suffix_codes, dtype=np.int64)[order]
+
+    def lookup(self, digits):
+        """Labels of rows holding a number that contains `digits`."""
+        # ':' sorts right after '9', so [digits, digits + ':') spans every suffix starting with digits
+        lo = np.searchsorted(self.suffixes, digits, side='left')
+        hi = np.searchsorted(self.suffixes, digits + ':', side='left')
+        if lo >= hi:
+            return self.labels[:0]
+        codes = np.unique(self.suffix_codes[lo:hi])
+        return np.concatenate([self.labels[self.starts[c]:self.starts[c + 1]] for c in codes])
+
+
+class PhoneIndex:
+    """Phone index over one source column (or the search phone/digits shadow columns) of one data version."""
+
+    def __init__(self, segments, covered, dirty):
+        self.segments = segments
+        self.covered = covered  # Labels of every indexed row
+        self.dirty = dirty      # Current '|'-joined numbers of rows edited after indexing
+
+    @classmethod
+    def build(cls, source):
+        return cls([_Segment(source)], source.index, source.iloc[:0])
+
+    def extend(self, source, base_rows, dirty_positions):
+        """Index of a newer version that appended rows and/or edited `dirty_positions`."""
+        tail = source.iloc[base_rows:]
+        segments = list(self.segments)
+        if len(tail):
+            segments.append(_Segment(tail))
+        if len(segments) > MAX_SEGMENTS:
+            return PhoneIndex.build(source)
+        dirty = self.dirty
+        if dirty_positions:
+            edited = source.iloc[dirty_positions]
+            dirty = pd.concat([dirty[~dirty.index.isin(edited.index)], edited])
+        return PhoneIndex(segments, source.index, dirty)
+
+    def lookup(self, digits):
+        """Labels of rows with a number containing the normalized `digits`, or None if too short."""
+        if len(digits) < MIN_SUFFIX:
+            return None
+        found = np.concatenate([seg.lookup(digits) for seg in self.segments]) if self.segments else np.empty(0)
+        if len(self.dirty):
+            found = found[~np.isin(found, self.dirty.index.values)]
+            hits = self.dirty[self.dirty.str.contains(digits, regex=False)]
+            found = np.concatenate([found, hits.index.values])
+        return np.unique(found)
+
+
+def _source(df, column):
+    """'|'-joined normalized numbers per row: `column` only, or the search phone + digits shadow columns."""
+    if column is None:
+        feats = row_features(df)
+        return feats['phone'] + "|" + feats['digits']
+    return phone_digits_series(df[column])
+
+
+def get_phone_index(df, column=None):
+    """
+    Returns the PhoneIndex for df's data version and `column` (None = every
+    phone column plus any searchable column holding 5+ digits, as used by
+    SmartSearchEngine), or None for unversioned frames.
+    """
+    version = df.attrs.get('data_version')
+    if not version:
+        return None
+    key = (version, column)
+    with _lock:
+        index = _INDEXES.get(key)
+        if index is not None:
+            _INDEXES.move_to_end(key)
+            return index
+
+    if column is None and cached_features(version) is not None:
+        feats = cached_features(version)
+        source = feats['phone'] + "|" + feats['digits']
+    else:
+        source = _source(df, column)
+
+    base = _INDEXES.get((df.attrs.get('base_version'), column))
+    base_rows = df.attrs.get('base_rows')
+    if (base is not None and base_rows is not None and len(base.covered) == base_rows
+            and base_rows <= len(source) and source.index[:base_rows].equals(base.covered)):
+        index = base.extend(source, base_rows, df.attrs.get('dirty_rows'))
+    else:
+        index = PhoneIndex.build(source)
+
+    with _lock:
+        _INDEXES[key] = index
+        while len(_INDEXES) > MAX_CACHED_INDEXES:
+            _INDEXES.popitem(last=False)
+    return index
+
+
+def phone_matches(df, digits, column=None):
+    """
+    Boolean mask over df: rows whose phone numbers contain the normalized
+    `digits`. Returns None when the index cannot answer (unversioned frame or
+    a query shorter than MIN_SUFFIX) so the caller keeps its scan.
+    """
+    index = get_phone_index(df, column)
+    if index is None:
+        return None
+    labels = index.lookup(digits)
+    if labels is None:
+        return None
+    mask = df.index.isin(labels)
+    uncovered = ~df.index.isin(index.covered)
+    if uncovered.any():
+        # Rows of df the cached index was not built from (e.g. built from a subset)
+        rest = _source(df[uncovered], column)
+        mask[uncovered] = rest.str.contains(digits, regex=False).values
+    return pd.Series(mask, index=df.index)
@@ -0,0 +1,161 @@
+"""
+Canonical Column Schema
+Maps canonical field names (name, phone, nationality, city, contract_end, ...)
+to the actual sheet headers. DBClient resolves the schema once per fetch and
+stores it on the DataFrame (df.attrs['schema']) so the matcher, search filters,
+dashboards and exports stop re-scanning headers with their own keyword loops.
+"""
+import re
+import pandas as pd
+
+from src.core.matcher import (
+    _find_col, NATIONALITY_KEYWORDS, GENDER_KEYWORDS, CITY_KEYWORDS,
+    JOB_KEYWORDS, SKILLS_KEYWORDS, NAME_KEYWORDS, PHONE_KEYWORDS,
+)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Field definitions
+# Each field lists (rule, keywords) pairs tried in order:
+#   exact    - normalized header equals a keyword
+#   contains - keyword is a substring of the normalized header
+#              (a tuple keyword means "all of these parts")
+#   compact  - like contains, but ignoring spaces and punctuation
+#   fuzzy    - Arabic-aware matcher rules (matcher._find_col)
+# ═══════════════════════════════════════════════════════════════
+
+CONTRACT_END_KEYWORDS = ["contract end", "انتهاء العقد", "contract expiry"]
+TIMESTAMP_KEYWORDS = ["timestamp", "طابع", "وقت التسجيل", "تاريخ التسجيل"]
+
+SCHEMA_FIELDS = {
+    # --- Workers sheet ---
+    "name": [("fuzzy", NAME_KEYWORDS)],
+    "full_name": [("contains", ["full name", "الاسم الكامل", "worker name", "candidate name", "اسم العامل"])],
+    "phone": [("contains", ["phone", "whatsapp", "mobile", "رقم الهاتف", "رقم الجوال", "الجوال", "جوال",
+                            "الهاتف", "هاتف", "الموبيل", "رقم الموبايل"]),
+              ("fuzzy", PHONE_KEYWORDS)],
+    "nationality": [("exact", ["nationality", "الجنسية"]), ("fuzzy", NATIONALITY_KEYWORDS)],
+    "gender": [("exact", ["gender", "الجنس"]), ("fuzzy", GENDER_KEYWORDS)],
+    "city": [("fuzzy", CITY_KEYWORDS)],
+    "saudi_city": [("contains", [("city", "saudi")])],
+    "job": [("fuzzy", JOB_KEYWORDS)],
+    "job_wanted": [("contains", [("job", "looking"), "requested job", "الوظيفة المطلوبة", "الوظيفه المطلوبه"])],
+    "other_jobs": [("contains", ["other jobs", "other job", "وظائف أخرى", "وظائف اخرى", "الوظائف الأخرى",
+                                 "الوظائف الاخرى", "ما هي الوظائف", "ماهي الوظائف", "وظايف اخرى"])],
+    "skills": [("fuzzy", SKILLS_KEYWORDS)],
+    "age": [("compact", ["your Age:", "العمر", "Age", "السن", "age", "عمر"])],
+    "contract_end": [("contains", CONTRACT_END_KEYWORDS),
+                     ("compact", ["When is your contract end date?", "تاريخ انتهاء العقد", "contract end date"])],
+    "timestamp": [("contains", TIMESTAMP_KEYWORDS), ("compact", ["طابع زمني"])],
+    "iqama": [("contains", ["iqama id", "رقم الاقامة", "رقم الإقامة", "residency"])],
+    "iqama_profession": [("compact", ["What is the occupation listed on your Iqama", "المهنة في الإقامة",
+                                      "Iqama Profession", "Occupation"])],
+    "working": [("compact", ["Are you working now?", "Are you currently working?", "Are you working",
+                             "هل انت تعمل حالياً؟", "هل تعمل حالياً؟", "هل انت تعمل حاليا", "العمل الحالي", "working now"])],
+    "huroob": [("compact", ["Do you have to report Huroob", "هل لديك بلاغ هروب؟", "بلاغ هروب"])],
+    "sponsor_transfer": [("compact", ["هل يقبل الكفيل النقل", "يقبل الكفيل النقل", "sponsor accept transfer", "هل يمانع الكفيل"])],
+    "work_outside": [("compact", ["Can you work outside your city", "هل يمكنك العمل خارج مدينتك؟", "خارج المدينة"]),
+                     ("contains", ["work outside city", "العمل خارج المدينة"])],
+    "transfer_count": [("compact", ["How many times did you transfer your sponsorship", "عدد مرات نقل الكفالة", "Transfer Count"])],
+    "field_experience": [("contains", ["الخبرة في هذا المجال", "field experience"])],
+    "ready": [("contains", ["جاهز للعمل", "ready for work", "ready immediately", "immediately"])],
+    "family": [("contains", ["مع عائلته", "with family", "الحالة الاجتماعية"])],
+    "cv": [("contains", ["سيرة الذاتية", "resume", "cv", "سيرة", "download"])],
+    # --- Customer requests sheet ---
+    "company": [("contains", ["اسم الشركه", "المؤسسه", "الشركه", "company"])],
+    "salary": [("contains", ["الراتب المتوقع", "expected salary", "الراتب"])],
+    "required_nationality": [("contains", ["الجنسيه المطلوبه", "required nationality"])],
+    "work_location": [("contains", ["موقع العمل"])],
+}
+
+
+# ═══════════════════════════════════════════════════════════════
+# Header matching rules
+# ═══════════════════════════════════════════════════════════════
+
+def _clean_header(text):
+    """Lower-case, collapse whitespace and treat ة/ه alike."""
+    return " ".join(str(text).lower().split()).replace("ة", "ه")
+
+
+def _compact(text):
+    return re.sub(r'[^\w\u0600-\u06FF]', '', str(text)).lower()
+
+
+def _match_rule(columns, rule, keywords):
+    if rule == "fuzzy":
+        return _find_col(pd.DataFrame(columns=columns), keywords)
+
+    if rule == "exact":
+        wanted = {_clean_header(k) for k in keywords}
+        return next((c for c in columns if _clean_header(c) in wanted), None)
+
+    if rule == "contains":
+        parts = [tuple(_clean_header(p) for p in (k if isinstance(k, tuple) else (k,))) for k in keywords]
+        for c in columns:
+            c_clean = _clean_header(c)
+            if any(all(p in c_clean for p in kw) for kw in parts):
+                return c
+        return None
+
+    if rule == "compact":
+        kws = [_compact(k) for k in keywords]
+        for c in columns:
+            c_norm = _compact(c)
+            for kn in kws:
+                if kn == c_norm or (len(kn) > 3 and kn in c_norm) or (len(c_norm) > 3 and c_norm in kn):
+                    return c
+        return None
+
+    raise ValueError(f"Unknown schema rule: {rule}")
+
+
+# ═══════════════════════════════════════════════════════════════
+# Public API
+# ═══════════════════════════════════════════════════════════════
+
+_SCHEMA_MEMO = {}  # tuple(columns) -> {field: column or None}
+
+
+def resolve_schema(columns):
+    """Resolves every canonical field against a list of headers (memoized per header set)."""
+    key = tuple(str(c) for c in columns)
+    schema = _SCHEMA_MEMO.get(key)
+    if schema is None:
+        visible = [c for c in columns if not str(c).startswith("__")]
+        schema = {}
+        for field, rules in SCHEMA_FIELDS.items():
+            col = None
+            for rule, keywords in rules:
+                col = _match_rule(visible, rule, keywords)
+                if col is not None:
+                    break
+            schema[field] = col
+        _SCHEMA_MEMO[key] = schema
+    return schema
+
+
+def attach_schema(df):
+    """Resolves the schema of a freshly fetched DataFrame and stores it in df.attrs."""
+    if df is not None and len(df.columns):
+        df.attrs['schema'] = resolve_schema(list(df.columns))
+    return df
+
+
+def get_schema(df):
+    """
+    Returns {field: column or None} for df. Uses the schema attached at fetch time
+    when it still fits the frame's columns (filtered copies keep it), otherwise
+    resolves it from the headers.
+    """
+    if df is None:
+        return dict.fromkeys(SCHEMA_FIELDS)
+    schema = df.attrs.get('schema')
+    if schema is not None and all(c is None or c in df.columns for c in schema.values()):
+        return schema
+    return resolve_schema(list(df.columns))
+
+
+def schema_col(df, field):
+    """Returns the actual column for a canonical field, or None."""
+    return get_schema(df).get(field)
@@ -1,12 +1,30 @@
 from .translation import TranslationManager
-from .matcher import _find_city_region, _fuzzy_match, REGION_PROXIMITY, REGION_MAP, CITY_KEYWORDS
+from .matcher import _find_city_region, bilingual_matcher, REGION_MAP, CITY_KEYWORDS
+from .geo import proximity_tier
+from .schema import schema_col
+from .features import row_features, map_distinct
+from .text_index import get_text_index
+from .phone_index import phone_matches
+from .filter_engine import (
+    compiled_column, date_range_mask, answer_mask, age_mask, contains_mask,
+    NO_WORKING, NO_ANSWERS, YES_ANSWERS,
+)
 import re
+import numpy as np
 import pandas as pd
 from datetime import date
-from dateutil import parser as dateutil_parser
+from collections import OrderedDict
+import threading
 import hashlib
+import json
 
 class SmartSearchEngine:
+    # Result cache: data_version -> OrderedDict(key -> cached result), LRU on both levels
+    _result_cache = OrderedDict()
+    _result_lock = threading.Lock()
+    MAX_CACHED_VERSIONS = 4
+    MAX_RESULTS_PER_VERSION = 32
+
     def __init__(self, data_frame=None):
         self.df = data_frame
         self.translator = TranslationManager()
@@ -43,16 +61,95 @@ class SmartSearchEngine:
         clean = re.sub(r'[\s\+\-\(\)]', '', str(query)).translate(arabic_to_western)
         return clean.isdigit() and len(clean) >= 5
 
+    def _geo_tiers(self, feats, geo_target):
+        """
+        Geo tier per row for a geo query term (99 = no geo match):
+        0 = same city, 1 = same region, 2+ = neighbouring regions by proximity.
+        """
+        gt_val, rk = geo_target
+        region = feats['region']
+        tiers = pd.Series(99, index=feats.index)
+        if gt_val == 'region':
+            # Query was for a region name
+            tiers[region == rk] = 1
+            return tiers
+
+        # Query was for a specific city
+        tiers = map_distinct(region, lambda r: proximity_tier(rk, r)).astype(int)
+        same_city = bilingual_matcher(gt_val).match_series(feats['geo_city'])
+        tiers[same_city] = 0
+        return tiers
+
+    # ═══════════════════════════════════════════════════════════════
+    # Result cache (row ids per data version, query and filters)
+    # ═══════════════════════════════════════════════════════════════
+    def _result_key(self, query, filters):
+        """Cache key for a search on self.df, or None when the frame is not cacheable."""
+        version = self.df.attrs.get('data_version')
+        if not version or not self.df.index.is_unique:
+            return None
+        # Filtered copies of the same version (e.g. dashboard tabs) hold different rows
+        rows = hashlib.md5(np.ascontiguousarray(self.df.index.values).tobytes()).hexdigest() \
+            if self.df.index.dtype.kind in 'iu' else hashlib.md5(str(list(self.df.index)).encode()).hexdigest()
+        payload = json.dumps([rows, list(self.df.columns.astype(str)), str(query).strip() if query else "",
+                              filters or {}, date.today().isoformat()], sort_keys=True, default=str)
+        return version, hashlib.md5(payload.encode()).hexdigest()
+
+    def _cache_get(self, version, key):
+        with self._result_lock:
+            entries = self._result_cache.get(version)
+            if entries is None or key not in entries:
+                return None
+            self._result_cache.move_to_end(version)
+            entries.move_to_end(key)
+            return entries[key]
+
+    def _cache_put(self, version, key, positions, extras, debug):
+        with self._result_lock:
+            entries = self._result_cache.setdefault(version, OrderedDict())
+            self._result_cache.move_to_end(version)
+            entries[key] = (positions, extras, dict(debug))
+            while len(entries) > self.MAX_RESULTS_PER_VERSION:
+                entries.popitem(last=False)
+            # A new data version retires the oldest versions' results
+            while len(self._result_cache) > self.MAX_CACHED_VERSIONS:
+                self._result_cache.popitem(last=False)
+
     def search(self, query, filters=None):
         """
         Performs a smart search on the dataframe.
         query: str - The search text.
         filters: dict - Optional filters {'age_min': 20, 'age_max': 30, ...}
+        Results of versioned frames are cached as row positions per (data version, query, filters).
         """
         if self.df is None or self.df.empty:
             return pd.DataFrame()
 
-        results = self.df.copy()
+        cache_key = self._result_key(query, filters)
+        hit = self._cache_get(*cache_key) if cache_key else None
+        if hit is not None:
+            positions, extras, debug = hit
+            self.last_debug = dict(debug, cache='hit')
+        else:
+            positions, extras = self._run_search(query, filters)
+            if cache_key:
+                self._cache_put(*cache_key, positions, extras, self.last_debug)
+
+        # The only copy of the data: the result rows, taken once
+        results = self.df.take(positions)
+        for col, values in extras.items():
+            results[col] = values
+        return results
+
+    def _run_search(self, query, filters=None):
+        """
+        Runs the search on self.df without copying it: every stage narrows a
+        mask / array of row positions. Returns (positions, extra columns) where
+        extra columns map a column name to a scalar or a per-result array.
+        """
+        frame = self.df
+        keep = np.ones(len(frame), dtype=bool)
+        extras = {}
         
         # Store debug info for UI display
         self.last_debug = {
@@ -60,7 +157,7 @@ class SmartSearchEngine:
             'query_repr': repr(query),
             'query_bool': bool(query),
             'query_stripped': str(query).strip() if query else '',
-            'total_before_search': len(results),
+            'total_before_search': len(frame),
         }
         
         # Clean query
@@ -99,8 +196,7 @@ class SmartSearchEngine:
             self.last_debug['iqama_target'] = target_val
             
             # Find the correct column using multiple possible names
-            iqama_keywords = ["المهنة في الإقامة", "المهنة في الاقامه", "iqama profession", "listed on your iqama"]
-            iqama_col = next((c for c in results.columns if any(kw in str(c).lower() for kw in iqama_keywords)), None)
+            iqama_col = schema_col(frame, 'iqama_profession')
             
             if iqama_col:
                 if target_val:
@@ -118,12 +214,12 @@ class SmartSearchEngine:
                         v_norm = normalize_ar(val)
                         return target_norm in v_norm
                     
-                    results = results[results[iqama_col].apply(iqama_match_calc)]
-                    self.last_debug['matched_count'] = len(results)
+                    keep &= map_distinct(frame[iqama_col], iqama_match_calc).values.astype(bool)
+                    self.last_debug['matched_count'] = int(keep.sum())
                     query_clean = "" # Skip global search
                 else:
-                    results = results[results[iqama_col].astype(str).str.strip().str.len() > 0]
-                    self.last_debug['matched_count'] = len(results)
+                    keep &= (frame[iqama_col].astype(str).str.strip().str.len() > 0).values
+                    self.last_debug['matched_count'] = int(keep.sum())
                     query_clean = ""
 
         # 1. Text Search
@@ -134,37 +230,17 @@ class SmartSearchEngine:
                 self.last_debug['search_type'] = 'phone'
                 self.last_debug['target_phone'] = target_phone
                 
-                # Find phone columns first for targeted search
-                phone_cols = [c for c in results.columns if any(kw in str(c).lower() for kw in ['phone', 'جوال', 'هاتف', 'رقم', 'mobile', 'تليفون'])]
-                
-                def phone_match(row):
-                    # If we found phone columns, search only those
-                    if phone_cols:
-                        for col in phone_cols:
-                            cell_digits = self.normalize_phone(str(row.get(col, '')))
-                            if target_phone and target_phone in cell_digits:
-                                return True
-                    
-                    # Fallback: search all columns
-                    for col in row.index:
-                        if str(col).startswith('__'):
-                            continue
-                        
-                        # Use the same exclusion list for consistency
-                        EXCLUDED_COLS = ["المهنة في الإقامة", "المهنة في الاقامه", "iqama profession", "listed on your iqama"]
-                        col_lower = str(col).lower()
-                        if any(exc.lower() in col_lower for exc in EXCLUDED_COLS):
-                            continue
-                            
-                        cell_val = str(row[col])
-                        cell_digits = self.normalize_phone(cell_val)
-                        if target_phone and len(cell_digits) >= 5 and target_phone in cell_digits:
-                            return True
-                    return False
-                
-                mask = results.apply(phone_match, axis=1)
-                results = results[mask]
-                self.last_debug['matched_count'] = len(results)
+                # Phone columns first, then any searchable column holding 5+ digits
+                if target_phone:
+                    mask = phone_matches(frame, target_phone)
+                    if mask is None:
+                        feats = row_features(frame)
+                        mask = (feats['phone'].str.contains(target_phone, regex=False)
+                                | feats['digits'].str.contains(target_phone, regex=False))
+                    keep &= mask.values
+                else:
+                    keep[:] = False
+                self.last_debug['matched_count'] = int(keep.sum())
                 
             else:
                 # Smart Text Search (Compound Search with AND logic)
@@ -197,252 +273,144 @@ class SmartSearchEngine:
                     
                     self.last_debug['geo_targets'] = geo_targets
                     
-                    def text_match_with_geo(row):
-                        # Join row to single string and normalize
-                        parts = []
-                        row_city_val = ""
-                        
-                        # Find city column to evaluate geo tier separately
-                        found_city_col = None
-                        
-                        # Use a shared list for exclusion to ensure consistency
-                        EXCLUDED_COLS = ["المهنة في الإقامة", "المهنة في الاقامه", "iqama profession", "listed on your iqama"]
-                        
-                        for col in row.index:
-                            if not str(col).startswith('__'):
-                                col_lower = str(col).lower()
-                                
-                                # EXCLUDE "Iqama Profession" definitively from standard search content
-                                if any(exc.lower() in col_lower for exc in EXCLUDED_COLS):
-                                    continue
-                                    
-                                val = str(row[col])
-                                parts.append(val)
-                                if any(kw.lower() in col_lower for kw in CITY_KEYWORDS):
-                                    found_city_col = col
-                                    row_city_val = val
-
-                        row_text = " ".join(parts).lower()
-                        row_text_norm = (
-                            row_text
-                            .replace("أ", "ا").replace("إ", "ا").replace("آ", "ا")
-                            .replace("ة", "ه").replace("ى", "ي")
-                        )
-                        
-                        geo_tier = 99
-                        match_count = 0
-                        
-                        for bundle in bundles:
-                            found_bundle = False
-                            bundle_geo_target = None
-                            
-                            # Check if this bundle is one of our geo targets
-                            for term in bundle:
-                                for gt_val, rk in geo_targets:
-                                    if term == gt_val or (gt_val == 'region' and any(term.lower() == a.lower() for a in REGION_MAP[rk]["aliases_ar"] + REGION_MAP[rk]["aliases_en"])):
-                                        bundle_geo_target = (gt_val, rk)
-                                        break
-                                if bundle_geo_target: break
-
-                            if bundle_geo_target:
-                                # Special Geo Matching
-                                gt_val, rk = bundle_geo_target
-                                if gt_val == 'region':
-                                    # Query was for a region name
-                                    worker_rk = _find_city_region(row_city_val)
-                                    if worker_rk == rk:
-                                        geo_tier = min(geo_tier, 1)
-                                        found_bundle = True
+                    # Row text, city and region come from the precomputed shadow columns
+                    feats = row_features(frame)
+                    index = get_text_index(frame)
+                    unindexed = frame.index.difference(index.covered) if index is not None else None
+                    is_match = pd.Series(keep, index=frame.index)
+                    geo_tier = pd.Series(99, index=frame.index)
+
+                    # Check which bundles are geo targets
+                    geo_bundles = []
+                    for bundle in bundles:
+                        bundle_geo_target = None
+                        for term in bundle:
+                            for gt_val, rk in geo_targets:
+                                if term == gt_val or (gt_val == 'region' and any(term.lower() == a.lower() for a in REGION_MAP[rk]["aliases_ar"] + REGION_MAP[rk]["aliases_en"])):
+                                    bundle_geo_target = (gt_val, rk)
+                                    break
+                            if bundle_geo_target: break
+                        geo_bundles.append((bundle, bundle_geo_target))
+
+                    # Bundles are ANDed: narrow with the indexed keyword bundles first,
+                    # so geo tiering only runs on the survivors
+                    geo_bundles.sort(key=lambda bg: bg[1] is not None)
+
+                    for bundle, bundle_geo_target in geo_bundles:
+                        alive = is_match[is_match].index
+                        if alive.empty:
+                            break
+
+                        found = pd.Series(False, index=alive)
+                        if bundle_geo_target:
+                            # Special Geo Matching
+                            tiers = self._geo_tiers(feats.loc[alive], bundle_geo_target)
+                            geo_tier.loc[alive] = np.minimum(geo_tier.loc[alive], tiers)
+                            found = tiers < 99
+
+                        # Standard keyword match for rows the geo match did not cover
+                        rest = found[~found].index
+                        syn_norms = [self.translator._normalize_query_word(syn) for syn in bundle]
+                        if len(rest) and index is not None:
+                            # Only rows holding every trigram of some synonym can match
+                            cands = [index.candidates(re.sub(r'[\s\-]', '', sn)) for sn in syn_norms]
+                            if all(c is not None for c in cands):
+                                candidate_mask = rest.isin(np.concatenate(cands)) | rest.isin(unindexed)
+                                rest = rest[candidate_mask]
+                        if len(rest):
+                            text = feats['text'].loc[rest]
+                            flex = feats['flex'].loc[rest]
+                            kw_found = pd.Series(False, index=rest)
+                            for syn_norm in syn_norms:
+                                if len(syn_norm) <= 4:
+                                    pattern = r'(?:^|[\s,:;.\-/])' + re.escape(syn_norm) + r'(?:[\s,:;.\-/]|$)'
+                                    kw_found |= text.str.contains(pattern, regex=True)
                                 else:
-                                    # Query was for a specific city
-                                    if _fuzzy_match(row_city_val, gt_val):
-                                        geo_tier = min(geo_tier, 0)
-                                        found_bundle = True
-                                    else:
-                                        worker_rk = _find_city_region(row_city_val)
-                                        if worker_rk == rk:
-                                            geo_tier = min(geo_tier, 1)
-                                            found_bundle = True
-                                        elif rk in REGION_PROXIMITY:
-                                            ordered = REGION_PROXIMITY[rk]
-                                            if worker_rk in ordered:
-                                                curr_t = 2 + ordered.index(worker_rk)
-                                                geo_tier = min(geo_tier, curr_t)
-                                                found_bundle = True
-                            
-                            if not found_bundle:
-                                # Standard keyword match
-                                for syn in bundle:
-                                    syn_norm = self.translator._normalize_query_word(syn)
                                     syn_flex = re.sub(r'[\s\-]', '', syn_norm)
-                                    row_text_flex = re.sub(r'[\s\-]', '', row_text_norm)
-                                    
-                                    if len(syn_norm) <= 4:
-                                        pattern = r'(?:^|[\s,:;.\-/])' + re.escape(syn_norm) + r'(?:[\s,:;.\-/]|$)'
-                                        if re.search(pattern, row_text_norm):
-                                            found_bundle = True
-                                            break
-                                    else:
-                                        if syn_flex in row_text_flex:
-                                            found_bundle = True
-                                            break
-                            
-                            if not found_bundle:
-                                return False, 99
-                                
-                        return True, geo_tier
-
-                    # Apply and store tier
-                    match_results = results.apply(text_match_with_geo, axis=1)
-                    results['__is_match'] = [m[0] for m in match_results]
-                    results['__geo_tier'] = [m[1] for m in match_results]
-                    
-                    results = results[results['__is_match']]
-                    results = results.drop(columns=['__is_match'])
+                                    kw_found |= flex.str.contains(syn_flex, regex=False)
+                            found.loc[rest] = kw_found
+
+                        is_match.loc[alive] = found
+
+                    keep = is_match.values
                     
                     # Sort primarily by geo_tier
-                    results = results.sort_values(by='__geo_tier', ascending=True)
-                    self.last_debug['matched_count'] = len(results)
+                    rows = np.flatnonzero(keep)
+                    tiers = geo_tier.values[rows]
+                    order = tiers.argsort(kind='quicksort')
+                    rows, extras['__geo_tier'] = rows[order], tiers[order]
+                    self.last_debug['matched_count'] = len(rows)
+
+        if '__geo_tier' not in extras:
+            rows = np.flatnonzero(keep)
 
         # 2. Apply Filters
         if filters:
-            # Helper to parse dates
-            def parse_dt(val):
-                try:
-                    if val is None or str(val).strip() == '':
-                        return pd.NaT
-                    
-                    val_str = str(val).strip()
-                    
-                    # Convert Eastern Arabic numerals to Western
-                    arabic_to_western = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
-                    val_str = val_str.translate(arabic_to_western)
-                    
-                    # Handle Arabic AM/PM markers
-                    if 'ص' in val_str or 'م' in val_str:
-                        marker = 'AM' if 'ص' in val_str else 'PM'
-                        val_str = re.sub(r'[صم]', '', val_str).strip()
-                        val_str = val_str + " " + marker
-                    
-                    try:
-                        return pd.Timestamp(dateutil_parser.parse(val_str, dayfirst=False))
-                    except:
-                        return pd.to_datetime(val_str, errors='coerce')
-                except Exception:
-                    return pd.NaT
-
-            def normalize_str(s):
-                if not s: return ""
-                clean = re.sub(r'[^\w\u0600-\u06FF]', '', str(s)).lower()
-                return clean
-
-            def find_col(keywords):
-                for col in results.columns:
-                    c_norm = normalize_str(col)
-                    for k in keywords:
-                        kn = normalize_str(k)
-                        if kn == c_norm or (len(kn) > 3 and kn in c_norm) or (len(c_norm) > 3 and c_norm in kn):
-                            return col
-                return None
+            # Each filter contributes a mask over the compiled columns; all are ANDed once at the end
+            mask = np.ones(len(frame), dtype=bool)
+            matched_cols = {}
+            expiry_sort_col = None
 
             # Filter by Age (only if explicitly enabled)
             if filters.get('age_enabled') and 'age_min' in filters and 'age_max' in filters:
-                age_col = find_col(["your Age:", "العمر", "Age", "السن", "age", "عمر"])
+                age_col = schema_col(frame, 'age')
                 if age_col:
-                    results['__matched_age_col'] = age_col
-                    results['__temp_age'] = pd.to_numeric(results[age_col].astype(str).str.extract(r'(\d+)')[0], errors='coerce')
-                    results = results[
-                        (results['__temp_age'].notna()) &
-                        (results['__temp_age'] >= filters['age_min']) & 
-                        (results['__temp_age'] <= filters['age_max'])
-                    ]
-                    results = results.drop(columns=['__temp_age'])
+                    matched_cols['__matched_age_col'] = age_col
+                    mask &= age_mask(frame, age_col, filters['age_min'], filters['age_max'])
 
             # Filter by Contract End Date
             if filters.get('contract_enabled') and 'contract_end_start' in filters and 'contract_end_end' in filters:
-                end_col = find_col(["When is your contract end date?", "تاريخ انتهاء العقد", "انتهاء العقد", "contract end date"])
+                end_col = schema_col(frame, 'contract_end')
                 if end_col:
-                    results['__matched_contract_col'] = end_col
-                    results['__temp_end_date'] = results[end_col].apply(parse_dt)
-                    s_date = pd.to_datetime(filters['contract_end_start']).normalize()
-                    e_date = pd.to_datetime(filters['contract_end_end']).normalize() + pd.Timedelta(hours=23, minutes=59, seconds=59)
-                    
-                    valid_dates = results['__temp_end_date'].notna()
-                    results = results[
-                        valid_dates &
-                        (results['__temp_end_date'] >= s_date) & 
-                        (results['__temp_end_date'] <= e_date)
-                    ]
-                    results = results.drop(columns=['__temp_end_date'])
+                    matched_cols['__matched_contract_col'] = end_col
+                    mask &= date_range_mask(frame, end_col, filters['contract_end_start'], filters['contract_end_end'])
 
             # New: Filter by Expired Only
             if filters.get('expired_only'):
-                end_col = find_col(["When is your contract end date?", "تاريخ انتهاء العقد", "انتهاء العقد", "contract end date"])
+                end_col = schema_col(frame, 'contract_end')
                 if end_col:
-                    results['__matched_contract_col'] = end_col
-                    results['__temp_end_date'] = results[end_col].apply(parse_dt)
+                    matched_cols['__matched_contract_col'] = end_col
+                    end_dates = compiled_column(frame, end_col, 'date')
                     today = pd.Timestamp(date.today()).normalize()
-                    
-                    results = results[
-                        results['__temp_end_date'].notna() &
-                        (results['__temp_end_date'] < today)
-                    ]
-                    # Sorting will be handled in app.py or here? 
+                    mask &= (end_dates.notna() & (end_dates < today)).values
                     # User asked for sorting from oldest to newest.
-                    results = results.sort_values(by='__temp_end_date', ascending=True)
-                    results = results.drop(columns=['__temp_end_date'])
+                    expiry_sort_col = end_col
 
             # New: Filter by Working Status (No)
             if filters.get('not_working_only'):
-                work_col = find_col(["Are you working now?", "Are you currently working?", "Are you working", "هل انت تعمل حالياً؟", "هل تعمل حالياً؟", "هل انت تعمل حاليا", "العمل الحالي", "working now"])
+                work_col = schema_col(frame, 'working')
                 if work_col:
-                    results['__matched_work_col'] = work_col
-                    # Normalize and check for "no" or "لا"
-                    def is_no(val):
-                        v = str(val).strip().lower()
-                        # Inclusion for variations and potential typos like "No tr"
-                        return v in ['no', 'لا', 'none', 'false', '0', 'no ', ' لا', 'n', 'no tr', 'no-tr']
-                    results = results[results[work_col].apply(is_no)]
+                    matched_cols['__matched_work_col'] = work_col
+                    # Inclusion for variations and potential typos like "No tr"
+                    mask &= answer_mask(frame, work_col, NO_WORKING)
 
             # New: Filter by Huroob Status (No)
             if filters.get('no_huroob'):
-                huroob_col = find_col(["Do you have to report Huroob", "هل لديك بلاغ هروب؟", "بلاغ هروب"])
+                huroob_col = schema_col(frame, 'huroob')
                 if huroob_col:
-                    def is_no_huroob(val):
-                        v = str(val).strip().lower()
-                        return v in ['no', 'لا', 'none', 'false', '0', 'n']
-                    results = results[results[huroob_col].apply(is_no_huroob)]
+                    mask &= answer_mask(frame, huroob_col, NO_ANSWERS)
 
             # New: Filter by Huroob Status (Yes)
             if filters.get('yes_huroob'):
-                huroob_col = find_col(["Do you have to report Huroob", "هل لديك بلاغ هروب؟", "بلاغ هروب"])
+                huroob_col = schema_col(frame, 'huroob')
                 if huroob_col:
-                    def is_yes_huroob(val):
-                        v = str(val).strip().lower()
-                        return v in ['yes', 'نعم', 'true', '1', 'y', 'ok', 'yes ']
-                    results = results[results[huroob_col].apply(is_yes_huroob)]
+                    mask &= answer_mask(frame, huroob_col, YES_ANSWERS)
 
             # New: Filter by Sponsor Transfer (Yes)
             if filters.get('sponsor_transfer'):
-                sponsor_col = find_col(["هل يقبل الكفيل النقل", "يقبل الكفيل النقل", "sponsor accept transfer", "هل يمانع الكفيل"])
+                sponsor_col = schema_col(frame, 'sponsor_transfer')
                 if sponsor_col:
-                    def is_yes_sponsor(val):
-                        v = str(val).strip().lower()
-                        return v in ['yes', 'نعم', 'true', '1', 'y', 'ok', 'yes ']
-                    results = results[results[sponsor_col].apply(is_yes_sponsor)]
+                    mask &= answer_mask(frame, sponsor_col, YES_ANSWERS)
 
             # New: Filter by Work Outside City (Yes)
             if filters.get('work_outside_city'):
-                outside_col = find_col(["Can you work outside your city", "هل يمكنك العمل خارج مدينتك؟", "خارج المدينة"])
+                outside_col = schema_col(frame, 'work_outside')
                 if outside_col:
-                    def is_yes(val):
-                        v = str(val).strip().lower()
-                        return v in ['yes', 'نعم', 'true', '1', 'y', 'ok']
-                    results = results[results[outside_col].apply(is_yes)]
+                    mask &= answer_mask(frame, outside_col, YES_ANSWERS)
 
             # New: Filter by Transfer Count (dropdown)
             if filters.get('transfer_count'):
-                trans_col = find_col(["How many times did you transfer your sponsorship", "عدد مرات نقل الكفالة", "Transfer Count"])
+                trans_col = schema_col(frame, 'transfer_count')
                 if trans_col:
                     target_val = filters['transfer_count']
                     # Mapping numeric choices (from UI) to descriptive labels (in data)
@@ -455,11 +423,11 @@ class SmartSearchEngine:
                     }
                     search_term = mapping.get(target_val, target_val)
                     # Use substring match to be robust against varying data formats
-                    results = results[results[trans_col].astype(str).str.contains(search_term, case=False, na=False)]
+                    mask &= contains_mask(frame, trans_col, search_term)
 
             # New: Filter by Domestic Worker (Iqama Profession)
             if filters.get('domestic_worker'):
-                prof_col = find_col(["What is the occupation listed on your Iqama", "المهنة في الإقامة", "Iqama Profession", "Occupation"])
+                prof_col = schema_col(frame, 'iqama_profession')
                 if prof_col:
                     # Keywords provided by user for Domestic Workers
                     keywords = [
@@ -470,24 +438,26 @@ class SmartSearchEngine:
                         "personal maid", "dw", "hm"
                     ]
                     pattern = "|".join([re.escape(k) for k in keywords])
-                    results = results[results[prof_col].astype(str).str.contains(pattern, case=False, na=False, regex=True)]
+                    mask &= contains_mask(frame, prof_col, pattern, regex=True)
 
             # Filter by Timestamp (Registration Date)
             if filters.get('date_enabled') and 'date_start' in filters and 'date_end' in filters:
-                ts_col = find_col(["طابع زمني", "وقت التسجيل", "تاريخ التسجيل", "Timestamp"])
+                ts_col = schema_col(frame, 'timestamp')
                 if ts_col:
-                    results['__matched_ts_col'] = ts_col
-                    results['__temp_ts'] = results[ts_col].apply(parse_dt)
-                    s_date = pd.to_datetime(filters['date_start']).normalize()
-                    e_date = pd.to_datetime(filters['date_end']).normalize() + pd.Timedelta(hours=23, minutes=59, seconds=59)
-                    
-                    valid_dates = results['__temp_ts'].notna()
-                    results = results[
-                        valid_dates &
-                        (results['__temp_ts'] >= s_date) & 
-                        (results['__temp_ts'] <= e_date)
-                    ]
-                    results = results.drop(columns=['__temp_ts'])
+                    matched_cols['__matched_ts_col'] = ts_col
+                    mask &= date_range_mask(frame, ts_col, filters['date_start'], filters['date_end'])
 
-        self.last_debug['final_count'] = len(results)
-        return results
+            # Masks cover the whole frame; keep the (already ordered) result rows that pass
+            passed = mask[rows]
+            rows = rows[passed]
+            if '__geo_tier' in extras:
+                extras['__geo_tier'] = extras['__geo_tier'][passed]
+            extras.update(matched_cols)
+            if expiry_sort_col:
+                order = compiled_column(frame, expiry_sort_col, 'date').values[rows].argsort(kind='stable')
+                rows = rows[order]
+                if '__geo_tier' in extras:
+                    extras['__geo_tier'] = extras['__geo_tier'][order]
+
+        self.last_debug['final_count'] = len(rows)
+        return rows, extras
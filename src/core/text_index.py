@@ -0,0 +1,158 @@
+"""
+Trigram Search Index
+Inverted index from character trigrams of the normalized "flex" row text
+(src/core/features.py) to row labels, built once per data version.
+
+SmartSearchEngine matches a synonym either as a whole token (short terms) or
+as a substring of the flex text (long terms). Both imply that every trigram of
+the synonym's flex form occurs in the row's flex text, so intersecting the
+trigram posting lists yields a candidate superset; the exact match is then
+verified on those candidates only.
+
+Appended rows become a new index segment and edited rows are kept as
+always-verified candidates, so delta syncs and sheet edits do not force a
+rebuild.
+"""
+from collections import OrderedDict
+import threading
+import numpy as np
+
+from src.core.features import cached_features
+
+MIN_GRAM = 3
+MAX_SEGMENTS = 4
+MAX_CACHED_VERSIONS = 5  # Same as features: main sheet, three dashboard tabs, one refresh
+_INDEXES = OrderedDict()  # data_version -> TextIndex
+_lock = threading.Lock()
+
+
+def _trigram_codes(text):
+    """Integer codes of the distinct trigrams of one string."""
+    cps = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    if len(cps) < MIN_GRAM:
+        return np.empty(0, dtype=np.int64)
+    return np.unique((cps[:-2] << 42) | (cps[1:-1] << 21) | cps[2:])
+
+
+class _Segment:
+    """Sorted trigram postings for a block of rows."""
+
+    def __init__(self, labels, texts):
+        n = len(texts)
+        self.labels = np.asarray(labels)
+        joined = "\x00".join(texts) + "\x00"
+        cps = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=n)
+        rows = np.repeat(np.arange(n, dtype=np.int32), lengths + 1)
+
+        if len(cps) >= MIN_GRAM:
+            grams = (cps[:-2] << 42) | (cps[1:-1] << 21) | cps[2:]
+            # Trigrams must not cross the row separator
+            valid = (cps[:-2] != 0) & (cps[1:-1] != 0) & (cps[2:] != 0)
+            grams, rows = grams[valid], rows[:-2][valid]
+        else:
+            grams, rows = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+
+        order = np.lexsort((rows, grams))
+        grams, rows = grams[order], rows[order]
+        if len(grams):
+            keep = np.ones(len(grams), dtype=bool)
+            keep[1:] = (grams[1:] != grams[:-1]) | (rows[1:] != rows[:-1])
+            grams, rows = grams[keep], rows[keep]
+
+        self.grams, self.starts = np.unique(grams, return_index=True)
+        self.ends = np.append(self.starts[1:], len(grams))
+        self.rows = rows
+
+    def lookup(self, codes):
+        """Row positions containing all trigram codes."""
+        result = None
+        idx = np.searchsorted(self.grams, codes)
+        for code, i in sorted(zip(codes, idx), key=lambda ci: self._size(ci[1], ci[0])):
+            if i >= len(self.grams) or self.grams[i] != code:
+                return np.empty(0, dtype=np.int64)
+            postings = self.rows[self.starts[i]:self.ends[i]]
+            result = postings if result is None else np.intersect1d(result, postings, assume_unique=True)
+            if not len(result):
+                break
+        return result
+
+    def _size(self, i, code):
+        if i >= len(self.grams) or self.grams[i] != code:
+            return 0
+        return self.ends[i] - self.starts[i]
+
+
+class TextIndex:
+    """Trigram index over the flex text of one data version."""
+
+    def __init__(self, segments, covered, dirty):
+        self.segments = segments
+        self.covered = covered  # Labels of every indexed row
+        self.dirty = dirty      # Labels whose indexed text is stale (always verified)
+
+    @classmethod
+    def build(cls, feats):
+        flex = feats['flex']
+        segment = _Segment(flex.index.values, flex.tolist())
+        return cls([segment], flex.index, flex.index[:0])
+
+    def extend(self, feats, base_rows, dirty_positions):
+        """Index of a newer version that appended rows and/or edited `dirty_positions`."""
+        tail = feats['flex'].iloc[base_rows:]
+        segments = list(self.segments)
+        if len(tail):
+            segments.append(_Segment(tail.index.values, tail.tolist()))
+        if len(segments) > MAX_SEGMENTS:
+            return TextIndex.build(feats)
+        dirty = self.dirty
+        if dirty_positions:
+            dirty = dirty.union(feats.index[dirty_positions])
+        return TextIndex(segments, feats.index, dirty)
+
+    def candidates(self, needle):
+        """
+        Labels of rows whose flex text may contain `needle`, or None when the
+        needle is too short to use the index (the caller scans instead).
+        """
+        codes = _trigram_codes(needle)
+        if not len(codes):
+            return None
+        labels = [seg.labels[seg.lookup(codes)] for seg in self.segments]
+        found = np.concatenate(labels) if labels else np.empty(0, dtype=np.int64)
+        if len(self.dirty):
+            found = np.union1d(found, self.dirty.values)
+        return found
+
+
+def get_text_index(df):
+    """
+    Returns the TextIndex for df's data version (building or extending it from
+    the cached shadow columns), or None for unversioned frames.
+    """
+    version = df.attrs.get('data_version')
+    if not version:
+        return None
+    with _lock:
+        index = _INDEXES.get(version)
+        if index is not None:
+            _INDEXES.move_to_end(version)
+            return index
+
+    feats = cached_features(version)
+    if feats is None:
+        return None
+
+    base = _INDEXES.get(df.attrs.get('base_version'))
+    base_rows = df.attrs.get('base_rows')
+    if (base is not None and base_rows is not None and len(base.covered) == base_rows
+            and base_rows <= len(feats) and feats.index[:base_rows].equals(base.covered)):
+        index = base.extend(feats, base_rows, df.attrs.get('dirty_rows'))
+    else:
+        index = TextIndex.build(feats)
+
+    with _lock:
+        _INDEXES[version] = index
+        while len(_INDEXES) > MAX_CACHED_VERSIONS:
+            _INDEXES.popitem(last=False)
+    return index
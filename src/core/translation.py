@@ -1,8 +1,9 @@
 # src/core/translation.py
 import re
 import io
-import streamlit as st
-import hashlib
+import threading
+from collections import OrderedDict
+from src.core.translation_store import get_translation_store
 
 try:
     import pdfplumber
@@ -11,9 +12,55 @@ try:
 except ImportError:
     HAS_DEPS = False
 
+class _PhraseMatcher:
+    """Aho-Corasick automaton: one pass over a text finds every phrase it contains."""
+
+    def __init__(self, phrases):
+        self.goto = [{}]
+        self.out = [set()]
+        for i, phrase in enumerate(phrases):
+            node = 0
+            for ch in phrase:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.out.append(set())
+                node = nxt
+            self.out[node].add(i)
+
+        fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, child in self.goto[node].items():
+                f = fail[node]
+                while f and ch not in self.goto[f]:
+                    f = fail[f]
+                fail[child] = self.goto[f].get(ch, 0) if node else 0
+                self.out[child] |= self.out[fail[child]]
+                queue.append(child)
+        self.fail = fail
+
+    def find(self, text):
+        """Indices of every phrase occurring in text."""
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            found |= self.out[node]
+        return found
+
+
 class TranslationManager:
-    # Use class-level cache to persist across re-initializations
-    _google_cache = {}
+    # Dictionary lookups compiled once (the dictionary is the same for every instance)
+    _compiled = None
+    # analyze_query results, LRU
+    _query_cache = OrderedDict()
+    _query_lock = threading.Lock()
+    MAX_CACHED_QUERIES = 2048
 
     def __init__(self):
 
@@ -324,12 +371,29 @@ class TranslationManager:
     # ---------------------------------
     # Translation
     # ---------------------------------
+    def _compile(self):
+        """
+        Hash maps of the dictionary by normalized key (translate_word) and by
+        stripped lower-case key (translate_ui_value), first key winning as in a
+        scan, plus the compound keys longest first with their automaton.
+        """
+        compiled = TranslationManager._compiled
+        if compiled is None:
+            by_norm, by_lower = {}, {}
+            for k, v in self.dictionary.items():
+                by_norm.setdefault(self.normalize_text(k), v)
+                by_lower.setdefault(k.strip().lower(), v)
+            compound_keys = sorted([k for k in self.dictionary.keys() if len(k.split()) > 1], key=len, reverse=True)
+            compiled = TranslationManager._compiled = {
+                'by_norm': by_norm,
+                'by_lower': by_lower,
+                'compound_keys': compound_keys,
+                'compound_matcher': _PhraseMatcher(compound_keys),
+            }
+        return compiled
+
     def translate_word(self, word):
-        norm_word = self.normalize_text(word)
-        for k, v in self.dictionary.items():
-            if self.normalize_text(k) == norm_word:
-                return v
-        return word
+        return self._compile()['by_norm'].get(self.normalize_text(word), word)
 
     def _is_arabic(self, text):
         """Check if text contains Arabic characters."""
@@ -342,16 +406,18 @@ class TranslationManager:
         if not self._is_arabic(word):
             return None
         
-        # Check cache first
+        # Check the shared translation store first
         cache_key = word.strip().lower()
-        if cache_key in TranslationManager._google_cache:
-            return TranslationManager._google_cache[cache_key]
+        store = get_translation_store()
+        cached = store.get(cache_key, 'ar', 'en')
+        if cached is not None:
+            return cached
         
         try:
             translator = GoogleTranslator(source='ar', target='en')
             result = translator.translate(word)
             if result and result.lower() != word.lower():
-                TranslationManager._google_cache[cache_key] = result
+                store.put(cache_key, 'ar', 'en', result)
                 return result
         except Exception:
             pass
@@ -365,28 +431,59 @@ class TranslationManager:
         return self.normalize_text(word)
 
     def analyze_query(self, query):
+        """
+        Splits a search query into synonym bundles (compound phrases first,
+        then words), each with its local / Google translations. Results are
+        cached per query; analyses that depended on a failed Google lookup are
+        not, so they are retried.
+        """
         clean_query = query.lower().strip()
+        with TranslationManager._query_lock:
+            cached = TranslationManager._query_cache.get(clean_query)
+            if cached is not None:
+                TranslationManager._query_cache.move_to_end(clean_query)
+        if cached is not None:
+            return [list(b) for b in cached]
+
+        bundle_list, complete = self._analyze(clean_query)
+        if complete:
+            with TranslationManager._query_lock:
+                TranslationManager._query_cache[clean_query] = [list(b) for b in bundle_list]
+                while len(TranslationManager._query_cache) > self.MAX_CACHED_QUERIES:
+                    TranslationManager._query_cache.popitem(last=False)
+        return bundle_list
+
+    def _analyze(self, clean_query):
         ignore_words = ["جميع", "كل", "دول", "دولة", "قارة", "قاره"]
         bundle_list = []
+        complete = True
+        compiled = self._compile()
 
         # --- Step 0: Extract Compound Phrases FIRST ---
-        # Sort keys by length (longest first) to catch "مصفف شعر" before "مصفف"
-        compound_keys = sorted([k for k in self.dictionary.keys() if len(k.split()) > 1], key=len, reverse=True)
-        
+        # Keys are tried longest first to catch "مصفف شعر" before "مصفف"; the
+        # automaton finds the next key (in that order) present in the query
+        compound_keys = compiled['compound_keys']
         remaining_query = clean_query
-        for ck in compound_keys:
-            if ck in remaining_query:
-                # Found a compound phrase!
-                trans = self.dictionary[ck]
-                synonyms = {ck}
-                if isinstance(trans, list):
-                    for t in trans: synonyms.add(t)
-                else:
-                    synonyms.add(trans)
-                
-                bundle_list.append(list(synonyms))
-                # Remove from remaining query to avoid double matching
-                remaining_query = remaining_query.replace(ck, "").strip()
+        next_key = 0
+        while True:
+            present = [i for i in compiled['compound_matcher'].find(remaining_query) if i >= next_key]
+            if not present:
+                break
+            next_key = min(present)
+            ck = compound_keys[next_key]
+            next_key += 1
+
+            # Found a compound phrase!
+            trans = self.dictionary[ck]
+            synonyms = {ck}
+            if isinstance(trans, list):
+                for t in trans: synonyms.add(t)
+            else:
+                synonyms.add(trans)
+
+            bundle_list.append(list(synonyms))
+            # Remove from remaining query to avoid double matching
+            remaining_query = remaining_query.replace(ck, "").strip()
 
         # --- Step 1: Split and translate remaining words ---
         words = re.split(r'[\s,،/\\|]+', remaining_query)
@@ -414,6 +511,8 @@ class TranslationManager:
                 google_result = self._google_translate_fallback(word)
                 if google_result:
                     synonyms.add(google_result)
+                elif HAS_DEPS:
+                    complete = False
 
             bundle_list.append(list(synonyms))
 
@@ -422,8 +521,10 @@ class TranslationManager:
             full_google = self._google_translate_fallback(clean_query)
             if full_google:
                 bundle_list.append([clean_query, full_google])
+            elif HAS_DEPS:
+                complete = False
 
-        return bundle_list
+        return bundle_list, complete
 
     # ---------------------------------
     # PDF FEATURES
@@ -450,36 +551,65 @@ class TranslationManager:
         if not text:
             return ""
 
-        # Global Cache check
-        cache_key = f"{target_lang}_{hashlib.md5(str(text).strip().encode()).hexdigest()}"
-        if 'translation_cache' not in st.session_state:
-            st.session_state.translation_cache = {}
-        
-        if cache_key in st.session_state.translation_cache:
-            return st.session_state.translation_cache[cache_key]
-
         # Explicit Exceptions (Do not translate to Arabic, keep strictly in English)
         if target_lang == 'ar':
             lower_val = str(text).strip().lower()
             if any(kw in lower_val for kw in ["aamal", "lebar", "labor"]):
-                st.session_state.translation_cache[cache_key] = text
                 return text
 
+        # Shared translation store (memory LRU + SQLite)
+        store = get_translation_store()
+        cached = store.get(text, 'auto', target_lang)
+        if cached is not None:
+            return cached
+
         try:
             chunks = [text[i:i+4000] for i in range(0, len(text), 4000)]
-            translated_text = ""
             translator = GoogleTranslator(source='auto', target=target_lang)
 
-            for chunk in chunks:
-                translated_text += translator.translate(chunk) + "\n"
+            # Stored stripped, the same form translate_batch_fast stores under this key
+            translated_text = "\n".join(translator.translate(chunk) for chunk in chunks).strip()
 
-            # Save to session cache
-            st.session_state.translation_cache[cache_key] = translated_text
+            store.put(text, 'auto', target_lang, translated_text)
             return translated_text
 
         except Exception as e:
             return f"Translation Error: {str(e)}"
 
+    def translate_many(self, texts, target_lang='ar'):
+        """
+        Bulk version of translate_full_text for short values (table cells).
+        Returns {text: translation} for the distinct texts: store hits are
+        served directly and the rest go out as separator-joined mega-chunks
+        over a bounded thread pool (TranslationService.translate_batch_fast).
+        Values that fail to translate map to themselves.
+        """
+        unique = list(dict.fromkeys(t for t in texts if t and str(t).strip()))
+        if not HAS_DEPS or not unique:
+            return {t: t for t in unique}
+
+        translations = {}
+        pending = []
+        for text in unique:
+            # Explicit Exceptions (Do not translate to Arabic, keep strictly in English)
+            if target_lang == 'ar' and any(kw in str(text).strip().lower() for kw in ["aamal", "lebar", "labor"]):
+                translations[text] = text
+            else:
+                pending.append(text)
+
+        if pending:
+            from src.core.file_translator import TranslationService
+            try:
+                service = TranslationService(source_lang='auto', target_lang=target_lang)
+                results = service.translate_batch_fast([str(t) for t in pending])
+            except Exception as e:
+                print(f"[WARN] Bulk translation failed: {e}")
+                results = pending
+            for text, result in zip(pending, results):
+                translations[text] = result or text
+            get_translation_store().log_stats()
+        return translations
+
     def translate_ui_value(self, val, target_lang='ar'):
         """Bidirectional UI value translation using dictionaries and heuristics."""
         if not val: return val
@@ -534,9 +664,9 @@ class TranslationManager:
             # Arabic to English
             # SPECIAL: If we want EN but it was originally AR, only translate if it's not a location or if needed.
             # But here we don't know the field. the caller (app.py) will handle the location exception.
-            for k, v in self.dictionary.items():
-                if k.strip().lower() == s:
-                    return v[0] if isinstance(v, list) else v
+            v = self._compile()['by_lower'].get(s)
+            if v is not None:
+                return v[0] if isinstance(v, list) else v
             return val
 
 AR_TO_EN = {
@@ -0,0 +1,141 @@
+"""
+Persistent Translation Store
+Machine translations (Google via deep_translator) keyed by (source text hash,
+source lang, target lang) in a SQLite file under the app's .cache directory,
+with an in-memory LRU in front. Shared by every session and process, so a job
+title or city name is fetched over the network once and survives restarts.
+Used by TranslationManager, TranslationService, auto_translate and the table
+translators; hits / misses are counted per tier and logged after bulk
+translations and at shutdown (log_stats).
+"""
+from collections import OrderedDict
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from src.config import TRANSLATION_CACHE_FILE
+
+MAX_MEMORY_ENTRIES = 20000
+
+
+class TranslationStore:
+    def __init__(self, path=TRANSLATION_CACHE_FILE):
+        self.path = path
+        self._memory = OrderedDict()  # (hash, source, target) -> translation, LRU
+        self._lock = threading.Lock()
+        self._conn = None
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0}
+
+    @staticmethod
+    def key(text, source, target):
+        return (hashlib.md5(str(text).strip().encode()).hexdigest(), source, target)
+
+    def _db(self):
+        """Shared connection (opened lazily); None when the file cannot be used."""
+        if self._conn is None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""CREATE TABLE IF NOT EXISTS translations (
+                    text_hash TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL,
+                    result TEXT NOT NULL, created_at REAL NOT NULL,
+                    PRIMARY KEY (text_hash, source, target))""")
+                conn.commit()
+                self._conn = conn
+            except Exception as e:
+                print(f"[WARN] Translation store unavailable, using memory only: {e}")
+                self._conn = False
+        return self._conn or None
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > MAX_MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def get(self, text, source, target):
+        """Cached translation of text, or None."""
+        return self.get_many([text], source, target).get(str(text).strip())
+
+    def get_many(self, texts, source, target):
+        """{stripped text: translation} for the texts already translated (memory first, then disk)."""
+        found, pending = {}, {}
+        with self._lock:
+            for text in texts:
+                stripped = str(text).strip()
+                key = self.key(stripped, source, target)
+                result = self._memory.get(key)
+                if result is not None:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    found[stripped] = result
+                else:
+                    pending[key[0]] = stripped
+
+            db = self._db() if pending else None
+            if db is not None:
+                hashes = list(pending)
+                try:
+                    for i in range(0, len(hashes), 500):
+                        batch = hashes[i:i + 500]
+                        rows = db.execute(
+                            f"SELECT text_hash, result FROM translations WHERE source = ? AND target = ? "
+                            f"AND text_hash IN ({','.join('?' * len(batch))})", [source, target] + batch).fetchall()
+                        for text_hash, result in rows:
+                            self._remember((text_hash, source, target), result)
+                            found[pending.pop(text_hash)] = result
+                            self.stats['disk_hits'] += 1
+                except Exception as e:
+                    print(f"[WARN] Translation store read failed: {e}")
+            self.stats['misses'] += len(pending)
+        return found
+
+    def put(self, text, source, target, result):
+        self.put_many({text: result}, source, target)
+
+    def put_many(self, translations, source, target):
+        """Stores {text: translation}; empty results are skipped."""
+        rows = []
+        with self._lock:
+            for text, result in translations.items():
+                if not result:
+                    continue
+                key = self.key(text, source, target)
+                self._remember(key, result)
+                rows.append((key[0], source, target, result, time.time()))
+            db = self._db() if rows else None
+            if db is not None:
+                try:
+                    db.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)", rows)
+                    db.commit()
+                    self.stats['writes'] += len(rows)
+                except Exception as e:
+                    print(f"[WARN] Translation store write failed: {e}")
+
+    def hit_rate(self):
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def log_stats(self):
+        s = self.stats
+        print(f"[DEBUG] Translation store: {s['memory_hits']} memory hits, {s['disk_hits']} disk hits, "
+              f"{s['misses']} misses, {s['writes']} writes (hit rate {self.hit_rate():.0%})")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_translation_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TranslationStore()
+                atexit.register(_store.log_stats)
+    return _store
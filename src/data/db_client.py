@@ -1,10 +1,24 @@
 import gspread
+import atexit
 import os
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from datetime import datetime
 import time
+import uuid
 import streamlit as st
 import hashlib
+from src.config import SHEET_CACHE_DIR
+from src.core.schema import attach_schema
+
+try:
+    import pyarrow  # Parquet engine for the on-disk sheet snapshots
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
 
 WORKERS_SHEET_URL = "https://docs.google.com/spreadsheets/d/1u87sScIve_-xT_jDG56EKFMXegzAxOqwVJCh3Irerrw/edit"
 CUSTOMER_SHEET_URL = "https://docs.google.com/spreadsheets/d/1ZlLGXqbFSnKrr2J-PRnxRhxykwrNOgOE6Mb34Zei_FU/edit"
@@ -13,19 +27,36 @@ class DBClient:
     _instance = None
     _data_caches = {}
     _last_fetches = {}
+    _sync_states = {}  # Incremental sync bookkeeping per sheet (row count + header fingerprint)
+    _snapshot_checked = set()  # Sheets whose on-disk snapshot was already considered this process
+    _inflight = {}  # url -> (Future, is_full_reload) of the running refresh
+    _refresher = None
+    _lock = threading.RLock()
+    _write_queues = {}  # url -> queued writes ('update'|'append'|'delete', ...) in call order
+    _write_errors = {}  # url -> message of the last failed flush (its writes stay queued)
+    _flush_timer = None
+    _flush_lock = threading.Lock()  # Held by flushes and pulls, so a pull never races a flush
+    _snapshot_writer = None  # Single thread: snapshot writes land on disk in call order
+    _handles = {}  # url -> {'sheet': Worksheet, 'header_hash', 'columns': {normalized header: 1-based index}}
     CACHE_DURATION = 300  # Increased to 5 Minutes for better performance
     NOTIF_CACHE_DURATION = 30  # Increased to 30s for background checks
+    FULL_SYNC_INTERVAL = 1800  # Full reload every 30 min to pick up in-place edits
+    SYNC_LAST_COL = "ZZ"  # Right edge of the tail range fetched by delta syncs
+    WRITE_FLUSH_DELAY = 2  # Seconds queued edits wait to be batched together
+    WRITE_RETRY_DELAY = 60  # Seconds before failed writes are retried
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DBClient, cls).__new__(cls)
             cls._instance.client = None
             cls._instance.connect()
+            atexit.register(cls._instance.flush_writes)
         return cls._instance
 
     def connect(self):
         """Initializes the connection to Google Sheets using modern gspread auth."""
         self.client = None
+        self._handles.clear()  # Worksheet handles are bound to the old client
         
         # 1. Try connecting via Streamlit Secrets (Recommended for Cloud)
         # Try multiple possible key names
@@ -61,7 +92,13 @@ class DBClient:
             print(f"[ERROR] {self._error_msg}")
 
     def fetch_data(self, url=None, force=False, retries=3, is_notif_check=False):
-        """Fetches data from Google Sheets with caching and automatic retries."""
+        """
+        Fetches data from Google Sheets with caching and automatic retries.
+        Once a sheet is cached, readers always get the cached DataFrame right away
+        and expired entries are refreshed by a background thread, which only
+        downloads the appended rows (delta sync). `force=True` blocks until a
+        full reload has finished.
+        """
         if url is None:
             url = "https://docs.google.com/spreadsheets/d/1u87sScIve_-xT_jDG56EKFMXegzAxOqwVJCh3Irerrw/edit"
 
@@ -72,56 +109,127 @@ class DBClient:
         # Initialize storage
         if not hasattr(self, '_data_caches'): self._data_caches = {}
         if not hasattr(self, '_last_fetches'): self._last_fetches = {}
+        if not hasattr(self, '_sync_states'): self._sync_states = {}
 
         # Cache check
         effective_duration = self.NOTIF_CACHE_DURATION if is_notif_check else self.CACHE_DURATION
-        
+
+        # Warm start: the on-disk snapshot seeds the memory cache
+        if not force and cache_key not in self._data_caches:
+            self._load_snapshot(url)
+
         if not force and cache_key in self._data_caches:
             if (current_time - self._last_fetches.get(last_fetch_key, 0) < effective_duration):
                 print(f"[DEBUG] Cache Hit ({'Notif' if is_notif_check else 'Main'}) for {url[:30]}...")
-                return self._data_caches[cache_key]
+            else:
+                # Stale-while-revalidate: serve the cached copy, refresh off-thread
+                print(f"[DEBUG] Serving stale cache, refreshing in background for {url[:30]}...")
+                self._schedule_refresh(url, retries=retries)
+            return self._data_caches[cache_key]
+
+        # Nothing cached (or forced): wait for the shared in-flight refresh
+        return self._schedule_refresh(url, force=force, retries=retries).result()
+
+    def _schedule_refresh(self, url, force=False, retries=3):
+        """
+        Starts a background refresh of `url` unless one is already running, and
+        returns its Future. Concurrent callers (e.g. several Streamlit sessions)
+        share the same in-flight fetch.
+        """
+        with self._lock:
+            running = self._inflight.get(url)
+            if running and not running[0].done() and (running[1] or not force):
+                return running[0]
+
+            if DBClient._refresher is None:
+                DBClient._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sheet-refresh")
+
+            previous = running[0] if running and not running[0].done() else None
+
+            def _run():
+                if previous is not None:
+                    # A forced reload queues behind the running delta sync
+                    try: previous.result()
+                    except Exception: pass
+                try:
+                    return self._pull(url, force=force, retries=retries)
+                except Exception as e:
+                    print(f"[ERROR] Background refresh failed for {url[:30]}: {e}")
+                    raise
+
+            future = DBClient._refresher.submit(_run)
+            self._inflight[url] = (future, force)
+            future.add_done_callback(lambda f: self._clear_inflight(url, f))
+            return future
+
+    def _clear_inflight(self, url, future):
+        with self._lock:
+            if self._inflight.get(url, (None,))[0] is future:
+                del self._inflight[url]
+
+    def _pull(self, url, force=False, retries=3):
+        """Downloads the sheet (delta or full sync), updates the caches and the snapshot."""
+        current_time = time.time()
+        cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
+        last_fetch_key = f"last_fetch_{hashlib.md5(url.encode()).hexdigest()}"
 
         if not self.client:
             self.connect()
             if not self.client:
                 raise Exception(f"Connection Failed: {getattr(self, '_error_msg', 'Unknown Reason')}")
 
+        # Queued edits go out first so the pull sees them. Edits queued while the
+        # pull is in flight stay queued (no flush can run) and are replayed onto
+        # the pulled frame before it replaces the cache.
+        with self._flush_lock:
+            self._flush_queued([url])
+            return self._pull_locked(url, cache_key, last_fetch_key, current_time, force, retries)
+
+    def _pull_locked(self, url, cache_key, last_fetch_key, current_time, force, retries):
         for attempt in range(retries):
             try:
-                sheet = self.client.open_by_url(url).sheet1
-                data = sheet.get_all_values()
-                
-                if not data:
-                    return pd.DataFrame()
-
-                headers = [str(h).strip() for h in data[0]]
-                # Handle duplicate headers
-                seen = {}
-                clean_headers = []
-                for h in headers:
-                    if not h: h = "Column"
-                    if h in seen:
-                        seen[h] += 1
-                        clean_headers.append(f"{h}_{seen[h]}")
-                    else:
-                        seen[h] = 0
-                        clean_headers.append(h)
+                sheet = self._worksheet(url)
 
-                df = pd.DataFrame(data[1:], columns=clean_headers)
-                
-                # Injection of internal tracking columns
-                row_ids = list(range(2, len(df) + 2))
-                if '__sheet_row' not in df.columns:
-                    df.insert(0, '__sheet_row', row_ids)
-                df['__sheet_row_backup'] = row_ids
-                
-                self._data_caches[cache_key] = df
-                self._last_fetches[last_fetch_key] = current_time
+                # Incremental mode: only pull rows appended since the last sync
+                df = None
+                with self._lock:
+                    cached = self._data_caches.get(cache_key)
+                    sync = self._sync_states.get(cache_key)
+                    seen = len(self._write_queues.get(url, []))  # Already patched into `cached`
+                if not force and sync and cached is not None:
+                    if current_time - sync['full_at'] < self.FULL_SYNC_INTERVAL:
+                        df = self._delta_sync(sheet, cached, sync)
+                base = cached if df is not None else None
+
+                if df is None:
+                    df = self._full_sync(sheet, cache_key)
+                    if df is None:
+                        return pd.DataFrame()
+                    seen = 0  # The sheet has none of the queued writes
+
+                with self._lock:
+                    replay = self._write_queues.get(url, [])[seen:]
+                    if replay:
+                        sync = self._sync_states.get(cache_key)
+                        for op in replay:
+                            df, _ = self._patch_frame(df, sync, op)
+                        base = None
+                        print(f"[SYNC] Replayed {len(replay)} queued write(s) onto the pulled sheet")
+
+                    changed = df is not cached
+                    attach_schema(df)  # Canonical field -> column map, resolved once per fetch
+                    if changed:
+                        self._stamp_version(df, base)
+                    self._data_caches[cache_key] = df
+                    self._last_fetches[last_fetch_key] = current_time
+                self._save_snapshot(url, df, current_time, write_data=changed)
                 return df
 
             except Exception as e:
                 error_msg = str(e)
-                if attempt < retries - 1 and any(x in error_msg.lower() for x in ["503", "unavailable", "quota"]):
+                if self._is_auth_error(e):
+                    self.connect()
+                if attempt < retries - 1 and any(x in error_msg.lower() for x in ["503", "unavailable", "quota", "401", "unauthenticated"]):
                     wait_time = (attempt + 1) * 2
                     print(f"[RETRY] Attempt {attempt+1} failed ({error_msg}). Retrying in {wait_time}s...")
                     time.sleep(wait_time)
@@ -130,6 +238,208 @@ class DBClient:
                 print(f"[ERROR] Spreadsheets API Error for {url[:30]}: {e}")
                 raise e
 
+    @staticmethod
+    def _stamp_version(df, base=None, dirty=None):
+        """
+        Tags a cached DataFrame with a fresh data version. When `df` only appends
+        rows to `base` (or edited the positions in `dirty`), the base version and
+        length are recorded too so derived data (shadow columns, search index)
+        can be patched instead of rebuilt.
+        """
+        base_version = base.attrs.get('data_version') if base is not None else None
+        base_rows = len(base) if base is not None else None
+        for key in ('base_version', 'base_rows', 'dirty_rows'):
+            df.attrs.pop(key, None)
+        if base_version:
+            df.attrs['base_version'] = base_version
+            df.attrs['base_rows'] = base_rows
+            if dirty:
+                df.attrs['dirty_rows'] = list(dirty)
+        df.attrs['data_version'] = uuid.uuid4().hex[:16]
+        return df
+
+    @staticmethod
+    def _clean_headers(headers):
+        """Replaces empty headers and de-duplicates repeated ones (Name, Name_1, ...)."""
+        seen = {}
+        clean_headers = []
+        for h in headers:
+            if not h: h = "Column"
+            if h in seen:
+                seen[h] += 1
+                clean_headers.append(f"{h}_{seen[h]}")
+            else:
+                seen[h] = 0
+                clean_headers.append(h)
+        return clean_headers
+
+    @staticmethod
+    def _header_fingerprint(headers):
+        """Hash of the header row, ignoring trailing empty cells (the API trims them)."""
+        values = [str(h).strip() for h in headers]
+        while values and not values[-1]:
+            values.pop()
+        return hashlib.md5("\x1f".join(values).encode()).hexdigest()
+
+    @staticmethod
+    def _build_frame(rows, clean_headers, first_row):
+        """Builds the cached DataFrame for sheet rows starting at sheet row `first_row`."""
+        width = len(clean_headers)
+        rows = [(list(r) + [""] * (width - len(r)))[:width] for r in rows]
+        df = pd.DataFrame(rows, columns=clean_headers)
+
+        # Injection of internal tracking columns
+        row_ids = list(range(first_row, first_row + len(df)))
+        if '__sheet_row' not in df.columns:
+            df.insert(0, '__sheet_row', row_ids)
+        df['__sheet_row_backup'] = row_ids
+        return df
+
+    def _full_sync(self, sheet, cache_key):
+        """Downloads the whole sheet and resets the sync state. Returns None for an empty sheet."""
+        data = sheet.get_all_values()
+        if not data:
+            self._sync_states.pop(cache_key, None)
+            return None
+
+        headers = [str(h).strip() for h in data[0]]
+        clean_headers = self._clean_headers(headers)
+        df = self._build_frame(data[1:], clean_headers, first_row=2)
+
+        self._sync_states[cache_key] = {
+            'rows': len(df),
+            'headers': clean_headers,
+            'header_hash': self._header_fingerprint(headers),
+            'full_at': time.time(),
+        }
+        print(f"[SYNC] Full reload: {len(df)} rows")
+        return df
+
+    def _delta_sync(self, sheet, cached, sync):
+        """
+        Fetches only the rows appended after the last synced row and appends them
+        to the cached DataFrame. Returns None when a full reload is required
+        (header change, rows deleted/shrunk or the anchor row moved).
+        """
+        clean_headers = sync['headers']
+        width = len(clean_headers)
+        synced_rows = sync['rows']
+
+        # Re-read the last synced row as an anchor to detect deletions/shifts
+        start_row = synced_rows + 1 if synced_rows > 0 else 2
+        header_range, tail = sheet.batch_get([f"A1:{self.SYNC_LAST_COL}1", f"A{start_row}:{self.SYNC_LAST_COL}"])
+
+        headers = header_range[0] if header_range else []
+        if self._header_fingerprint(headers) != sync['header_hash']:
+            print("[SYNC] Header change detected, falling back to full reload")
+            return None
+
+        tail = [list(r) for r in tail]
+        if synced_rows > 0:
+            if not tail:
+                print("[SYNC] Rows shrank, falling back to full reload")
+                return None
+            anchor = [str(v) for v in (tail[0] + [""] * (width - len(tail[0])))[:width]]
+            cached_last = [str(v) for v in cached[clean_headers].iloc[-1].tolist()]
+            if anchor != cached_last:
+                print("[SYNC] Anchor row changed, falling back to full reload")
+                return None
+            tail = tail[1:]
+
+        # Drop trailing blank rows and bail out if a new row is wider than the header
+        while tail and not any(str(c).strip() for c in tail[-1]):
+            tail.pop()
+        if any(any(str(c).strip() for c in r[width:]) for r in tail):
+            return None
+
+        if not tail:
+            print(f"[SYNC] No new rows ({synced_rows} rows)")
+            return cached
+
+        new_df = self._build_frame(tail, clean_headers, first_row=synced_rows + 2)
+        df = pd.concat([cached, new_df], ignore_index=True)
+        sync['rows'] = synced_rows + len(new_df)
+        print(f"[SYNC] Delta sync: +{len(new_df)} rows ({sync['rows']} total)")
+        return df
+
+    # ---------------------------------
+    # On-disk snapshots (warm startup)
+    # ---------------------------------
+    def _snapshot_paths(self, url):
+        """Returns (parquet_path, meta_path) for a sheet URL."""
+        url_hash = hashlib.md5(url.encode()).hexdigest()
+        base = os.path.join(SHEET_CACHE_DIR, url_hash)
+        return base + ".parquet", base + ".json"
+
+    def _load_snapshot(self, url):
+        """Loads the on-disk snapshot of a sheet into the memory cache (once per process)."""
+        cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
+        last_fetch_key = f"last_fetch_{hashlib.md5(url.encode()).hexdigest()}"
+        if not HAS_PARQUET or cache_key in self._snapshot_checked:
+            return False
+        self._snapshot_checked.add(cache_key)
+
+        data_path, meta_path = self._snapshot_paths(url)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return False
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            df = pd.read_parquet(data_path)
+            if meta.get('sync', {}).get('rows') != len(df):
+                return False
+        except Exception as e:
+            print(f"[WARN] Could not read sheet snapshot: {e}")
+            return False
+
+        self._data_caches[cache_key] = self._stamp_version(attach_schema(df))
+        self._last_fetches[last_fetch_key] = meta.get('fetched_at', 0)
+        self._sync_states[cache_key] = meta['sync']
+        print(f"[SNAPSHOT] Warm start from disk: {len(df)} rows for {url[:30]}...")
+        return True
+
+    def _save_snapshot(self, url, df, fetched_at, write_data=True):
+        """
+        Persists a sheet DataFrame and its sync state off the calling thread.
+        Writes go through one writer thread in call order, each into its own
+        temp file, so a data file and its meta file always come from the same
+        call.
+        """
+        cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
+        sync = self._sync_states.get(cache_key)
+        if not HAS_PARQUET or df is None or df.empty or not sync:
+            return
+        data_path, meta_path = self._snapshot_paths(url)
+        meta = {'url_hash': hashlib.md5(url.encode()).hexdigest(), 'fetched_at': fetched_at, 'sync': dict(sync)}
+
+        def _replace(path, write):
+            fd, tmp_path = tempfile.mkstemp(dir=SHEET_CACHE_DIR, suffix=".tmp")
+            os.close(fd)
+            try:
+                write(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        def _write_json(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+        def _write():
+            try:
+                os.makedirs(SHEET_CACHE_DIR, exist_ok=True)
+                if write_data:
+                    _replace(data_path, lambda path: df.to_parquet(path, index=False))
+                _replace(meta_path, _write_json)
+            except Exception as e:
+                print(f"[WARN] Could not write sheet snapshot: {e}")
+
+        with self._lock:
+            if DBClient._snapshot_writer is None:
+                DBClient._snapshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheet-snapshot")
+            DBClient._snapshot_writer.submit(_write)
+
     def fetch_customer_requests(self, force=False, is_notif_check=False):
         """Specifically fetches the Customer Requests sheet."""
         url = "https://docs.google.com/spreadsheets/d/1ZlLGXqbFSnKrr2J-PRnxRhxykwrNOgOE6Mb34Zei_FU/edit"
@@ -151,99 +461,300 @@ class DBClient:
         if len(matches) > 1 and phone:
             phone_col = next((c for c in df.columns if "phone" in str(c).lower() or "جوال" in str(c)), None)
             if phone_col:
-                final_matches = matches[matches[phone_col].astype(str).str.contains(str(phone))]
+                from src.core.phone_index import normalize_phone, phone_matches
+                hits = phone_matches(df, normalize_phone(phone), column=phone_col)
+                if hits is not None:
+                    final_matches = matches[hits.loc[matches.index].values]
+                else:
+                    final_matches = matches[matches[phone_col].astype(str).str.contains(str(phone))]
                 if not final_matches.empty:
                     return final_matches.iloc[0]['__sheet_row']
         
         return None
 
+    # ---------------------------------
+    # Cached worksheet handles
+    # ---------------------------------
+    def _worksheet(self, url):
+        """Returns the cached Worksheet for `url`, opening the spreadsheet only once."""
+        with self._lock:
+            handle = self._handles.get(url)
+            if handle is None or handle['sheet'] is None:
+                handle = dict(handle or {'header_hash': None, 'columns': {}}, sheet=self.client.open_by_url(url).sheet1)
+                self._handles[url] = handle
+            return handle['sheet']
+
+    @staticmethod
+    def _norm_header(name):
+        return " ".join(str(name).split()).lower()
+
+    def _column_index(self, url, column_name):
+        """
+        Resolves a column name to its 1-based sheet index using the cached headers.
+        Exact (normalized) matches win; otherwise falls back to a partial match.
+        """
+        cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
+        sync = self._sync_states.get(cache_key)
+        if not sync:
+            return None
+
+        with self._lock:
+            handle = self._handles.setdefault(url, {'sheet': None, 'header_hash': None, 'columns': {}})
+            if handle['header_hash'] != sync['header_hash']:
+                # Headers changed (or first use): rebuild the map
+                columns = {}
+                for i, header in enumerate(sync['headers']):
+                    columns.setdefault(self._norm_header(header), i + 1)
+                handle['columns'] = columns
+                handle['header_hash'] = sync['header_hash']
+            columns = handle['columns']
+
+        wanted = self._norm_header(column_name)
+        if wanted in columns:
+            return columns[wanted]
+        for header, idx in columns.items():
+            if wanted in header or header in wanted:
+                return idx
+        return None
+
+    @staticmethod
+    def _is_auth_error(e):
+        msg = str(e).lower()
+        return any(x in msg for x in ["401", "unauthenticated", "invalid_grant", "invalid credentials", "access token"])
+
+    # ---------------------------------
+    # Write-behind queue
+    # ---------------------------------
+    def _ensure_sync_state(self, url):
+        """Returns the sync state (cached headers) of a sheet, loading the sheet once if needed."""
+        cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
+        if cache_key not in self._data_caches or cache_key not in self._sync_states:
+            self.fetch_data(url=url)
+        return self._sync_states.get(cache_key)
+
+    def _enqueue_write(self, url, op):
+        """Queues a write for `url` and arms the flush timer."""
+        with self._lock:
+            self._write_queues.setdefault(url, []).append(op)
+            self._arm_flush_timer(self.WRITE_FLUSH_DELAY)
+
+    def _arm_flush_timer(self, delay):
+        with self._lock:
+            if DBClient._flush_timer is None:
+                DBClient._flush_timer = threading.Timer(delay, self.flush_writes)
+                DBClient._flush_timer.daemon = True
+                DBClient._flush_timer.start()
+
+    def flush_writes(self, url=None):
+        """Sends queued writes (all sheets, or only `url`) to Google Sheets."""
+        with self._lock:
+            if url is None:
+                DBClient._flush_timer = None
+                urls = list(self._write_queues.keys())
+            else:
+                urls = [url]
+
+        with self._flush_lock:
+            self._flush_queued(urls)
+
+    def _flush_queued(self, urls):
+        """flush_writes body; the caller holds _flush_lock."""
+        for u in urls:
+            with self._lock:
+                ops = self._write_queues.pop(u, [])
+            if ops:
+                self._flush_ops(u, ops)
+
+    def write_error(self, url=None):
+        """
+        Message of the last failed flush of `url` (any sheet when None), or
+        None. Its writes are still queued and retried; the error clears once
+        they reach the sheet.
+        """
+        with self._lock:
+            if url is not None:
+                return self._write_errors.get(url)
+            return next(iter(self._write_errors.values()), None)
+
+    @staticmethod
+    def _group_writes(ops):
+        """Splits queued ops into consecutive runs of the same kind (keeps row numbering valid)."""
+        runs = []
+        for op in ops:
+            if runs and runs[-1][0] == op[0]:
+                runs[-1][1].append(op)
+            else:
+                runs.append((op[0], [op]))
+        return runs
+
+    def _flush_ops(self, url, ops):
+        """Applies queued ops in order: one API call per run of updates, appends or deletes."""
+        cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
+        last_fetch_key = f"last_fetch_{hashlib.md5(url.encode()).hexdigest()}"
+        runs = self._group_writes(ops)
+
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                if not self.client:
+                    self.connect()
+                sheet = self._worksheet(url)
+                while runs:
+                    kind, batch = runs[0]
+                    if kind == 'update':
+                        # Last write wins for repeated edits of the same cell
+                        cells = {}
+                        for _, row, col, value in batch:
+                            cells[(row, col)] = value
+                        sheet.batch_update(
+                            [{'range': gspread.utils.rowcol_to_a1(r, c), 'values': [[v]]} for (r, c), v in cells.items()],
+                            value_input_option='USER_ENTERED',
+                        )
+                    elif kind == 'append':
+                        sheet.append_rows([op[1] for op in batch])
+                    elif kind == 'delete':
+                        # Requests are applied sequentially, matching the enqueue-time row numbers
+                        sheet.spreadsheet.batch_update({'requests': [
+                            {'deleteDimension': {'range': {
+                                'sheetId': sheet.id, 'dimension': 'ROWS',
+                                'startIndex': int(op[1]) - 1, 'endIndex': int(op[1]),
+                            }}} for op in batch
+                        ]})
+                    runs.pop(0)
+                    print(f"[SYNC] Flushed {len(batch)} queued {kind}(s) for {url[:30]}...")
+
+                # The shared cache already holds the patched rows; persist it
+                with self._lock:
+                    self._write_errors.pop(url, None)
+                    df = self._data_caches.get(cache_key)
+                if cache_key in self._sync_states:
+                    self._save_snapshot(url, df, self._last_fetches.get(last_fetch_key, 0))
+                else:
+                    self._data_caches.pop(cache_key, None)
+                return True
+            except Exception as e:
+                last_error = str(e)
+                print(f"[ERROR] Failed to flush writes (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:
+                    time.sleep(2)
+                    if self._is_auth_error(e) or not self.client:
+                        self.connect()
+                    else:
+                        self._handles.pop(url, None)
+
+        # Give up for now: the unsent writes go back to the front of the queue
+        # (the cache keeps showing them) and are retried later
+        failed = [op for _, batch in runs for op in batch]
+        print(f"[ERROR] {len(failed)} queued write(s) for {url[:30]}... not sent, retrying in {self.WRITE_RETRY_DELAY}s")
+        with self._lock:
+            self._write_queues[url] = failed + self._write_queues.get(url, [])
+            self._write_errors[url] = f"{len(failed)} change(s) not saved to Google Sheets yet: {last_error}"
+            self._arm_flush_timer(self.WRITE_RETRY_DELAY)
+        return False
+
+    def _patch_frame(self, df, sync, op):
+        """
+        Applies a queued write to a cached frame without touching it: returns
+        (patched copy, edited row positions) or (df, None) when the row is not
+        in the frame. Appends and deletes keep sync['rows'] in step.
+        """
+        if df is None or not sync or '__sheet_row' not in df.columns:
+            return df, None
+        kind = op[0]
+        if kind == 'update':
+            _, row_number, col_index, value = op
+            col = sync['headers'][col_index - 1]
+            hit = (df['__sheet_row'] == row_number).values
+            if col not in df.columns or not hit.any():
+                return df, None
+            df = df.copy()
+            # Sheet cells are text; the cache keeps them as str
+            df.loc[hit, col] = "" if value is None else str(value)
+            return df, hit.nonzero()[0].tolist()
+        if kind == 'append':
+            new_df = self._build_frame([op[1]], sync['headers'], first_row=sync['rows'] + 2)
+            sync['rows'] += 1
+            return pd.concat([df, new_df], ignore_index=True), None
+        if kind == 'delete':
+            row_number = op[1]
+            hit = df['__sheet_row'] == row_number
+            if not hit.any():
+                return df, None
+            df = df[~hit].reset_index(drop=True)
+            below = df['__sheet_row'] > row_number
+            df.loc[below, '__sheet_row'] -= 1
+            df.loc[below, '__sheet_row_backup'] -= 1
+            sync['rows'] -= int(hit.sum())
+            return df, None
+        return df, None
+
     def delete_row(self, row_number, url=None):
-        """Permanently deletes a row from Google Sheets."""
+        """Permanently deletes a row from Google Sheets (queued, cached copy patched)."""
         if url is None:
             url = "https://docs.google.com/spreadsheets/d/1u87sScIve_-xT_jDG56EKFMXegzAxOqwVJCh3Irerrw/edit"
 
-        if not self.client:
-            self.connect()
-        
         try:
-            sheet = self.client.open_by_url(url).sheet1
-            sheet.delete_rows(int(row_number))
-            
-            # Clear cache
+            self._ensure_sync_state(url)
+            op = ('delete', int(row_number))
             cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
-            if cache_key in self._data_caches:
-                del self._data_caches[cache_key]
-            
+            with self._lock:
+                df = self._data_caches.get(cache_key)
+                patched, _ = self._patch_frame(df, self._sync_states.get(cache_key), op)
+                if patched is not df:
+                    self._data_caches[cache_key] = self._stamp_version(attach_schema(patched))
+                self._enqueue_write(url, op)
             return True
         except Exception as e:
             print(f"[ERROR] Failed to delete row: {e}")
             return False, str(e)
 
     def append_row(self, row_data, url):
-        """Appends a new row to the specified Google Sheet."""
-        if not self.client:
-            self.connect()
-        
+        """Appends a new row to the specified Google Sheet (queued, cached copy patched)."""
         try:
-            sheet = self.client.open_by_url(url).sheet1
-            sheet.append_row(row_data)
-            
-            # Clear cache
+            self._ensure_sync_state(url)
             cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
-            if cache_key in self._data_caches:
-                del self._data_caches[cache_key]
-            
+            op = ('append', list(row_data))
+            with self._lock:
+                df = self._data_caches.get(cache_key)
+                patched, _ = self._patch_frame(df, self._sync_states.get(cache_key), op)
+                if patched is not df:
+                    self._data_caches[cache_key] = self._stamp_version(attach_schema(patched), base=df)
+                self._enqueue_write(url, op)
             return True
         except Exception as e:
             print(f"[ERROR] Failed to append row: {e}")
             return False, str(e)
 
     def update_row(self, row_number, column_name, new_value, url=None):
-        """Updates a specific cell in a row in Google Sheets with retry logic."""
+        """Updates a specific cell in a row in Google Sheets (queued, cached copy patched)."""
         if url is None:
             url = "https://docs.google.com/spreadsheets/d/1u87sScIve_-xT_jDG56EKFMXegzAxOqwVJCh3Irerrw/edit"
 
-        if not self.client:
-            self.connect()
-        
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                sheet = self.client.open_by_url(url).sheet1
-                
-                # Get headers to find column index
-                headers = sheet.row_values(1)
-                print(f"[DEBUG] Available headers: {headers}")
-                print(f"[DEBUG] Looking for column: '{column_name}'")
-                
-                # Try to find the column by partial match
-                col_index = None
-                for i, header in enumerate(headers):
-                    if str(column_name).lower() in str(header).lower() or str(header).lower() in str(column_name).lower():
-                        col_index = i + 1  # 1-based index
-                        print(f"[DEBUG] Found column at index {col_index}: '{header}'")
-                        break
-                
-                if col_index is None:
-                    return False, f"Column '{column_name}' not found. Available: {headers}"
-                
-                # Update the cell
-                sheet.update_cell(row_number, col_index, new_value)
-                
-                # Clear cache
-                cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
-                if cache_key in self._data_caches:
-                    del self._data_caches[cache_key]
-                
-                return True, "Updated successfully"
-            except Exception as e:
-                print(f"[ERROR] Failed to update row (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    # Reconnect and retry
-                    time.sleep(2)
-                    self.connect()
-                else:
-                    return False, f"Failed after {max_retries} attempts: {str(e)}"
+        try:
+            sync = self._ensure_sync_state(url)
+        except Exception as e:
+            return False, f"Failed to load sheet: {str(e)}"
+        headers = sync['headers'] if sync else []
+
+        col_index = self._column_index(url, column_name)
+        if col_index is None:
+            return False, f"Column '{column_name}' not found. Available: {headers}"
+
+        cache_key = f"cache_{hashlib.md5(url.encode()).hexdigest()}"
+        try:
+            op = ('update', int(row_number), col_index, new_value)
+            with self._lock:
+                # Copy on write: readers and the snapshot writer keep the old frame
+                df = self._data_caches.get(cache_key)
+                patched, dirty = self._patch_frame(df, sync, op)
+                if patched is not df:
+                    # Only the edited rows of derived data are stale
+                    self._data_caches[cache_key] = self._stamp_version(patched, base=df, dirty=dirty)
+                self._enqueue_write(url, op)
+        except Exception as e:
+            print(f"[ERROR] Failed to update row: {e}")
+            return False, str(e)
+        return True, "Updated successfully"
 
     def get_headers(self, url=None):
         """Returns the list of headers for the current data."""
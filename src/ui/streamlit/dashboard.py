@@ -3,16 +3,22 @@ import pandas as pd
 import time
 from datetime import datetime
 from src.core.contracts import ContractManager
+from src.core.schema import get_schema
 from src.core.i18n import t, t_col
 from src.utils.phone_utils import create_pasha_whatsapp_excel, render_pasha_export_button
-from src.ui.streamlit_components import show_loading_hourglass, render_cv_detail_panel, render_table_translator
+from src.ui.streamlit_components import show_loading_hourglass, render_cv_detail_panel, render_table_translator, paginate_table
 from src.utils.data_utils import style_df, clean_date_display
+from src.utils.table_style import column_formats
 
 def __apply_pinned_columns(df_or_style, cfg=None):
     if cfg is None: cfg = {}
     pin_keywords = ["حالة العقد", "contract status", "status", "وقت", "طابع", "الاسم", "name", "جنسية", "nationality", "🚩", "جنس", "gender"]
     if hasattr(df_or_style, 'data'): cols = df_or_style.data.columns
-    elif hasattr(df_or_style, 'columns'): cols = df_or_style.columns
+    elif hasattr(df_or_style, 'columns'):
+        cols = df_or_style.columns
+        # Plain frames (large tables skip the Styler): number formatting via column_config
+        for col, fmt in column_formats(df_or_style).items():
+            if col not in cfg: cfg[col] = st.column_config.NumberColumn(format=fmt)
     else: return cfg
     for col in cols:
         if any(kw in str(col).lower() for kw in pin_keywords):
@@ -43,32 +49,23 @@ def render_dashboard_content():
         return
 
     cols = df.columns.tolist()
-    date_col = next((c for c in cols if any(kw in str(c).lower() for kw in ["contract end", "انتهاء العقد", "contract expiry"])), None)
+    schema = get_schema(df)
+    date_col = schema['contract_end']
     
     if not date_col:
         loading_placeholder.empty()
         st.error("Error: Could not find the 'Contract End' column.")
         return
 
-    stats = {'urgent': [], 'expired': [], 'active': []}
-    for _, row in df.iterrows():
-        try:
-            status = ContractManager.calculate_status(row[date_col])
-            r = row.to_dict()
-            global_status = status['status']
-            days = status.get('days', 0) or 9999
-            r['__days_sort'] = days
-            if lang == 'ar':
-                if global_status == 'expired': r['حالة العقد'] = f"❌ منتهي (منذ {abs(days)} يوم)"
-                elif global_status in ['urgent', 'warning']: r['حالة العقد'] = f"⚠️ عاجل (متبقى {days} يوم)"
-                else: r['حالة العقد'] = f"✅ ساري (متبقى {days} يوم)"
-            else:
-                r['Contract Status'] = f"{status['label_en']} ({abs(days)} Days)"
-
-            if global_status in ['urgent', 'warning']: stats['urgent'].append(r)
-            elif global_status == 'expired': stats['expired'].append(r)
-            elif global_status == 'active': stats['active'].append(r)
-        except: continue
+    status = ContractManager.classify_column(df[date_col], df.attrs.get('data_version'))
+    days_sort, status_labels = ContractManager.status_display(status, lang)
+    status_key = 'حالة العقد' if lang == 'ar' else 'Contract Status'
+    tagged = df.assign(**{'__days_sort': days_sort, status_key: status_labels})
+    stats = {
+        'urgent': tagged[status['status'].isin(['urgent', 'warning']).to_numpy()],
+        'expired': tagged[(status['status'] == 'expired').to_numpy()],
+        'active': tagged[(status['status'] == 'active').to_numpy()],
+    }
 
     loading_placeholder.empty()
 
@@ -83,13 +80,16 @@ def render_dashboard_content():
     t1, t2, t3 = st.tabs([t("tabs_urgent", lang), t("tabs_expired", lang), t("tabs_active", lang)])
     
     def show(data, tab_id):
-        if not data: st.info(t("no_data", lang)); return
-        d = pd.DataFrame(data)
+        if data.empty: st.info(t("no_data", lang)); return
+        d = data
         if tab_id == 'expired':
             d['__abs_days'] = d['__days_sort'].abs()
             d = d.sort_values(by='__abs_days', ascending=True).drop(columns=['__abs_days'])
         else:
             d = d.sort_values(by='__days_sort', ascending=True)
+
+        # Only the current page goes through translation, styling and the browser
+        d = paginate_table(d, f"dash_{tab_id}", lang)
         
         status_key = 'حالة العقد' if lang == 'ar' else 'Contract Status'
         show_cols = [status_key] + [c for c in cols if c in d.columns and not str(c).startswith('__')]
@@ -100,12 +100,12 @@ def render_dashboard_content():
         d_final = clean_date_display(d_final)
         
         final_cfg = {}
-        cv_col_found = next((c for c in cols if any(kw in str(c).lower() for kw in ["cv", "سيرة", "download"])), None)
+        cv_col_found = schema['cv']
         if cv_col_found and cv_col_found in new_names:
             final_cfg[new_names[cv_col_found]] = st.column_config.LinkColumn(t("cv_download", lang), display_text=t("download_pdf", lang))
         
         d_final = render_table_translator(d_final, key_prefix=f"dash_{tab_id}")
-        styled_final = style_df(d_final)
+        styled_final = style_df(d_final, view=f"dash_{tab_id}")
         
         event = st.dataframe(styled_final, width='stretch', column_config=__apply_pinned_columns(styled_final, final_cfg), on_select="rerun", selection_mode="single-row", hide_index=True, key=f"dash_table_{lang}_{tab_id}")
         
@@ -1,4 +1,6 @@
 import streamlit as st
+import pandas as pd
+import hashlib
 import os
 import time
 import base64
@@ -140,11 +142,10 @@ def render_table_translator(df, key_prefix="table"):
         st.markdown('<div class="table-translator-btn">', unsafe_allow_html=True)
         if st.button("🇸🇦 الترجمة للعربية", key=f"btn_ar_{key_prefix}", use_container_width=True):
             with st.spinner("جارِ الترجمة للعربية..."):
+                unique_vals = [v for col in cols_to_translate for v in df[col].unique() if v and isinstance(v, str)]
+                translations = tm.translate_many(unique_vals, target_lang='ar')
                 for col in cols_to_translate:
-                    unique_vals = [v for v in df[col].unique() if v and isinstance(v, str)]
-                    if unique_vals:
-                        translations = {val: tm.translate_full_text(val, target_lang='ar') for val in unique_vals}
-                        df[col] = df[col].map(translations).fillna(df[col])
+                    df[col] = df[col].map(translations).fillna(df[col])
                 st.success("✅ تم")
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -152,17 +153,59 @@ def render_table_translator(df, key_prefix="table"):
         st.markdown('<div class="table-translator-btn">', unsafe_allow_html=True)
         if st.button("🇵🇭 Isalin sa Tagalog", key=f"btn_tl_{key_prefix}", use_container_width=True):
             with st.spinner("Isinasalin sa Tagalog..."):
+                unique_vals = [v for col in cols_to_translate for v in df[col].unique() if v and isinstance(v, str)]
+                translations = tm.translate_many(unique_vals, target_lang='tl')
                 for col in cols_to_translate:
-                    unique_vals = [v for v in df[col].unique() if v and isinstance(v, str)]
-                    if unique_vals:
-                        translations = {val: tm.translate_full_text(val, target_lang='tl') for val in unique_vals}
-                        df[col] = df[col].map(translations).fillna(df[col])
+                    df[col] = df[col].map(translations).fillna(df[col])
                 st.success("✅ Tapos na")
         st.markdown('</div>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
     
     return df
 
+TABLE_PAGE_SIZE = 100
+
+def paginate_table(df, key, lang, page_size=TABLE_PAGE_SIZE, version=None):
+    """
+    Server-side pagination for result tables: returns only the current page,
+    so translation, styling and st.dataframe work on page_size rows whatever
+    the sheet size. Filters that must cover every row (nationality badges,
+    exports) run on the full frame before this call. The page resets when the
+    rows, the data version or `version` (e.g. the query and filters) change.
+    """
+    total = len(df)
+    if total <= page_size:
+        return df
+
+    total_pages = (total + page_size - 1) // page_size
+    page_key = f"{key}_page"
+    h = hashlib.md5(repr((df.attrs.get('data_version'), version)).encode())
+    h.update(pd.util.hash_pandas_object(df.index, index=False).values.tobytes())
+    signature = h.hexdigest()
+    if st.session_state.get(f"{key}_sig") != signature:
+        st.session_state[f"{key}_sig"] = signature
+        st.session_state[page_key] = 1
+    page = min(max(st.session_state.get(page_key, 1), 1), total_pages)
+    st.session_state[page_key] = page
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+
+    _, pc1, pc2, pc3, _ = st.columns([1, 1, 2, 1, 1])
+    with pc1:
+        if st.button("السابق ⬅️" if lang == 'ar' else "⬅️ Previous", disabled=(page == 1), key=f"{key}_prev", width='stretch'):
+            st.session_state[page_key] = page - 1
+            st.rerun()
+    with pc2:
+        page_text = (f"صفحة {page} من {total_pages} ({start + 1}-{end} من {total})" if lang == 'ar'
+                     else f"Page {page} of {total_pages} ({start + 1}-{end} of {total})")
+        st.markdown(f"<div style='text-align:center; padding-top:10px; color:#ddd;'>{page_text}</div>", unsafe_allow_html=True)
+    with pc3:
+        if st.button("➡️ التالي" if lang == 'ar' else "Next ➡️", disabled=(page == total_pages), key=f"{key}_next", width='stretch'):
+            st.session_state[page_key] = page + 1
+            st.rerun()
+
+    return df.iloc[start:end]
+
 def render_top_banner(user, lang, auth_manager):
     import streamlit as st
     from datetime import datetime
@@ -87,98 +87,47 @@ def auto_translate(val, target_lang='en'):
     except:
         return val
 
-def style_df(df):
-    if not isinstance(df, pd.DataFrame):
-        return df
+def _flag_url(val):
+    if not val: return None
+    s_val = str(val).strip().lower()
+    for key in FLAG_KEYS_SORTED:
+        code = FLAG_MAP[key]
+        if len(key) <= 3:
+            pattern = r'(?:^|[\s,:;.\-/])' + re.escape(key) + r'(?:[\s,:;.\-/]|$)'
+            if re.search(pattern, s_val):
+                return f"https://cdn.jsdelivr.net/gh/lipis/flag-icons@7.2.0/flags/4x3/{code.lower()}.svg"
+        else:
+            if key in s_val:
+                return f"https://cdn.jsdelivr.net/gh/lipis/flag-icons@7.2.0/flags/4x3/{code.lower()}.svg"
+    return None
 
-    styled_df = df.copy()
-    lang = st.session_state.get('lang', 'ar')
-    
-    if lang == 'en':
-        for col in styled_df.columns:
-            if not str(col).startswith("🚩_") and styled_df[col].dtype == 'object':
-                styled_df[col] = styled_df[col].apply(lambda x: auto_translate(x, target_lang='en'))
+FLAG_KEYS_SORTED = sorted(FLAG_MAP.keys(), key=len, reverse=True)
 
-    nat_cols = [c for c in styled_df.columns if any(kw in str(c).lower() for kw in ["nationality", "الجنسية"])]
-    for col in nat_cols:
-        flag_col = f"🚩_{col}"
-        if flag_col not in styled_df.columns:
-            def get_flag_url(val):
-                if not val: return None
-                s_val = str(val).strip().lower()
-                sorted_keys = sorted(FLAG_MAP.keys(), key=len, reverse=True)
-                for key in sorted_keys:
-                    code = FLAG_MAP[key]
-                    if len(key) <= 3:
-                        pattern = r'(?:^|[\s,:;.\-/])' + re.escape(key) + r'(?:[\s,:;.\-/]|$)'
-                        if re.search(pattern, s_val):
-                            return f"https://cdn.jsdelivr.net/gh/lipis/flag-icons@7.2.0/flags/4x3/{code.lower()}.svg"
-                    else:
-                        if key in s_val:
-                            return f"https://cdn.jsdelivr.net/gh/lipis/flag-icons@7.2.0/flags/4x3/{code.lower()}.svg"
-                return None
-            
-            idx = list(styled_df.columns).index(col)
-            styled_df.insert(idx, flag_col, styled_df[col].apply(get_flag_url))
-        
-        def clean_val(v):
-            if not v: return v
-            return re.sub(r'[\U0001F1E6-\U0001F1FF]{2}\s*', '', str(v))
-        styled_df[col] = styled_df[col].apply(clean_val)
-
-    gen_cols = [c for c in styled_df.columns if any(kw in str(c).lower() for kw in ["gender", "الجنس"]) and str(c).lower() != "الجنسية"]
-    for col in gen_cols:
-        def add_gender_icon(val):
-            if not val: return val
-            s_val = str(val).strip().lower()
-            for key, icon in GENDER_MAP.items():
-                if key == s_val:
-                    return f"{icon} {val}"
-            return val
-        styled_df[col] = styled_df[col].apply(add_gender_icon)
+def style_df(df, view=None):
+    if not isinstance(df, pd.DataFrame):
+        return df
 
-    def apply_colors(val):
-        s_val = str(val).lower()
-        if any(k in s_val for k in ["🚺", "أنثى", "female"]):
-            return "color: #e91e63; font-weight: bold;"
-        if any(k in s_val for k in ["🚹", "ذكر", "male"]):
-            return "color: #3498db; font-weight: bold;" 
-        return "color: #4CAF50;"
+    from src.utils.table_style import styled_table
 
-    return styled_df.style.format(
-        precision=2, 
-        thousands="", 
-        na_rep="",
-        subset=[c for c in styled_df.columns if styled_df[c].dtype in ['float64', 'int64']]
-    ).map(apply_colors, subset=[c for c in styled_df.columns if not str(c).startswith("🚩_")])
+    lang = st.session_state.get('lang', 'ar')
+    # Column-level pipeline, cached per (view, lang, data version)
+    return styled_table(
+        df, view=("data_utils", view), lang=lang,
+        translate=(lambda x: auto_translate(x, target_lang='en')) if lang == 'en' else None,
+        flag_url=_flag_url,
+        gender_map=GENDER_MAP,
+    )
 
 def clean_date_display(df):
     if not isinstance(df, pd.DataFrame) or df.empty:
         return df
         
-    from dateutil import parser as dateutil_parser
-    
-    def _parse_to_date_str(val):
-        if val is None or str(val).strip() == '': return ""
-        try:
-            val_str = str(val).strip()
-            a_to_w = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
-            val_str = val_str.translate(a_to_w)
-            clean_s = re.sub(r'[صم]', '', val_str).strip()
-            dt = dateutil_parser.parse(clean_s, dayfirst=False)
-            return dt.strftime('%Y-%m-%d')
-        except:
-            try:
-                dt = pd.to_datetime(val, errors='coerce')
-                if pd.isna(dt): return str(val)
-                return dt.strftime('%Y-%m-%d')
-            except:
-                return str(val)
+    from src.core.dates import format_dates
 
     date_keywords = ["date", "time", "تاريخ", "طابع", "التسجيل", "expiry", "end", "متى"]
     for col in df.columns:
         col_lower = str(col).lower()
         if any(kw in col_lower for kw in date_keywords):
-            df[col] = df[col].apply(_parse_to_date_str)
+            df[col] = format_dates(df[col])
             
     return df
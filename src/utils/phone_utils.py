@@ -4,6 +4,7 @@ import io
 import os
 import streamlit as st
 from datetime import datetime
+from src.core.schema import get_schema
 
 def format_phone_number(phone):
     """
@@ -163,6 +164,37 @@ def render_pasha_export_button(df, label, filename, base_save_name, key=None):
         )
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Export keywords per schema field: fallback for sheets whose headers the
+# schema rules don't recognize (e.g. plain "Name", "Sex", "Job", "Iqama")
+EXPORT_KEYWORDS = {
+    "full_name": ["الاسم الكامل", "full name", "worker name", "الاسم", "name", "candidate name", "اسم العامل"],
+    "phone": ["رقم الهاتف", "whatsapp", "phone", "mobile", "جوال", "mobile number", "رقم الجوال", "رقم الموبايل", "الجوال", "الهاتف"],
+    "cv": ["سيرة الذاتية", "cv", "resume", "link", "سيرة", "resume link", "تحميل السيرة الذاتية"],
+    "nationality": ["الجنسيه", "nationality", "country", "الجنسية"],
+    "gender": ["الجنس", "gender", "sex"],
+    "age": ["العمر", "age"],
+    "city": ["المدينة", "city", "location"],
+    "job_wanted": ["الوظيفه المطلوبه", "job", "position", "role", "المهنة", "requested job", "الوظيفة المطلوبة"],
+    "field_experience": ["الخبرة في هذا المجال", "field experience"],
+    "skills": ["مهارات اخرى", "other skills", "skills", "مهارات أخرى"],
+    "work_outside": ["العمل خارج المدينة", "work outside city", "travel", "هل يمكنك العمل خارج مدينتك؟"],
+    "ready": ["جاهز للعمل", "ready for work", "immediately", "ready immediately", "هل أنت جاهز للعمل فوراً؟"],
+    "family": ["مع عائلته", "with family", "الحالة الاجتماعية"],
+    "iqama": ["رقم الاقامة", "رقم الإقامة", "iqama", "residency", "iqama id number", "iqama id"],
+    "transfer_count": ["نقل الكفالة", "transfer count", "عدد مرات نقل الكفالة"],
+    "other_jobs": [
+        "وظائف أخرى", "وظائف اخرى", "الوظائف الأخرى", "الوظائف الاخرى", "other jobs", "other job",
+        "ما هي الوظائف الأخرى التي يمكنك القيام بها", "ما هي الوظائف", "ماهي الوظائف", "وظايف اخرى",
+        "what other jobs can you do"
+    ],
+}
+
+def _find_export_col(df, keywords):
+    for c in df.columns:
+        if any(k in str(c).lower() for k in keywords):
+            return c
+    return None
+
 def create_pasha_whatsapp_excel(df, lang='ar'):
     """
     Creates a specialized Excel for Pasha's WhatsApp Broadcast.
@@ -191,39 +223,30 @@ def create_pasha_whatsapp_excel(df, lang='ar'):
     transfer_header = "عدد مرات نقل الكفالة" if is_ar else "Transfer Count"
     other_jobs_header = "ما هي الوظائف الأخرى التي يمكنك القيام بها" if is_ar else "What other jobs can you do"
     
-    # Mapping for all requested fields
+    # Export header -> canonical schema field
     mapping = {
-        name_header: ["الاسم الكامل", "full name", "worker name", "الاسم", "name", "candidate name", "اسم العامل"],
-        phone_header: ["رقم الهاتف", "whatsapp", "phone", "mobile", "جوال", "mobile number", "رقم الجوال", "رقم الموبايل", "الجوال", "الهاتف"],
-        cv_header: ["سيرة الذاتية", "cv", "resume", "link", "سيرة", "resume link", "تحميل السيرة الذاتية"],
-        nat_header: ["الجنسيه", "nationality", "country", "الجنسية"],
-        gender_header: ["الجنس", "gender", "sex"],
-        age_header: ["العمر", "age"],
-        city_header: ["المدينة", "city", "location"],
-        job_header: ["الوظيفه المطلوبه", "job", "position", "role", "المهنة", "requested job", "الوظيفة المطلوبة"],
-        field_exp_header: ["الخبرة في هذا المجال", "field experience"],
-        skills_header: ["مهارات اخرى", "other skills", "skills", "مهارات أخرى"],
-        outside_header: ["العمل خارج المدينة", "work outside city", "travel", "work outside city", "هل يمكنك العمل خارج مدينتك؟"],
-        ready_header: ["جاهز للعمل", "ready for work", "immediately", "ready immediately", "هل أنت جاهز للعمل فوراً؟"],
-        family_header: ["مع عائلته", "with family", "الحالة الاجتماعية"],
-        iqama_header: ["رقم الاقامة", "رقم الإقامة", "iqama", "residency", "iqama id number", "iqama id"],
-        transfer_header: ["نقل الكفالة", "transfer count", "عدد مرات نقل الكفالة"],
-        other_jobs_header: [
-            "وظائف أخرى", "وظائف اخرى", "الوظائف الأخرى", "الوظائف الاخرى", "other jobs", "other job",
-            "ما هي الوظائف الأخرى التي يمكنك القيام بها", "ما هي الوظائف", "ماهي الوظائف", "وظايف اخرى",
-            "what other jobs can you do"
-        ]
+        name_header: "full_name",
+        phone_header: "phone",
+        cv_header: "cv",
+        nat_header: "nationality",
+        gender_header: "gender",
+        age_header: "age",
+        city_header: "city",
+        job_header: "job_wanted",
+        field_exp_header: "field_experience",
+        skills_header: "skills",
+        outside_header: "work_outside",
+        ready_header: "ready",
+        family_header: "family",
+        iqama_header: "iqama",
+        transfer_header: "transfer_count",
+        other_jobs_header: "other_jobs",
     }
 
-    def find_actual_col(keywords):
-        for c in df.columns:
-            if any(k in str(c).lower() for k in keywords):
-                return c
-        return None
-
+    schema = get_schema(df)
     actual_cols_map = {}
-    for standard_name, keywords in mapping.items():
-        found = find_actual_col(keywords)
+    for standard_name, field in mapping.items():
+        found = schema.get(field) or _find_export_col(df, EXPORT_KEYWORDS[field])
         if found:
             actual_cols_map[standard_name] = found
 
@@ -0,0 +1,182 @@
+"""
+Table Styling Pipeline
+Builds the display frame shown by st.dataframe for the worker / search /
+order-processing tables, one column at a time. Every per-value step
+(translation, flag URL, gender icon, text color) runs once per distinct value
+of a column and is broadcast back through the factorized codes; emoji cleanup
+is a vectorized string replace.
+
+The result is cached per (view, lang, data version, content digest), so a
+rerun that shows the same table reuses it. Tables over STYLER_MAX_CELLS are
+returned as plain frames: a pandas Styler serializes CSS for every cell, while
+column_formats() gives st.dataframe the same number formatting through
+column_config.
+"""
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+import pandas as pd
+
+MAX_CACHED_TABLES = 16
+STYLER_MAX_CELLS = 20000
+_STYLED = OrderedDict()  # (view, lang, data_version, digest) -> (display frame, css frame or None)
+_lock = threading.Lock()
+
+FLAG_EMOJI = re.compile(r'[\U0001F1E6-\U0001F1FF]{2}\s*')
+NATIONALITY_KEYWORDS = ["nationality", "الجنسية"]
+GENDER_KEYWORDS = ["gender", "الجنس"]
+
+FEMALE_CSS = "color: #e91e63; font-weight: bold;"
+MALE_CSS = "color: #3498db; font-weight: bold;"
+DEFAULT_CSS = "color: #4CAF50;"
+
+
+# ═══════════════════════════════════════════════════════════════
+# Per-column steps (one call per distinct value)
+# ═══════════════════════════════════════════════════════════════
+
+def map_distinct(s, func):
+    """func(value) per row of s, evaluated once per distinct value."""
+    codes, uniques = pd.factorize(s, use_na_sentinel=False)
+    results = [func(v) for v in uniques]
+    return pd.Series([results[c] for c in codes], index=s.index, dtype=object)
+
+
+def is_text_column(s):
+    return s.dtype == object or pd.api.types.is_string_dtype(s.dtype)
+
+
+def strip_flag_emoji(s):
+    """Removes emoji flags from the text cells of s; missing cells stay missing."""
+    return s.where(s.isna(), s.astype(str).str.replace(FLAG_EMOJI, '', regex=True))
+
+
+def add_gender_icons(s, gender_map):
+    """Prefixes cells whose stripped lower-case text is a gender_map key with its icon."""
+    icons = s.astype(str).str.strip().str.lower().map(gender_map)
+    marked = icons.notna() & s.notna()
+    if not marked.any():
+        return s
+    s = s.astype(object)
+    s[marked] = icons[marked] + " " + s[marked].astype(str)
+    return s
+
+
+def text_color(val):
+    s_val = str(val).lower()
+    if '🚺' in s_val or 'أنثى' in s_val or 'female' in s_val:
+        return FEMALE_CSS
+    if '🚹' in s_val or 'ذكر' in s_val or 'male' in s_val:
+        return MALE_CSS
+    return DEFAULT_CSS
+
+
+def _is_nationality(col):
+    return any(kw in str(col).lower() for kw in NATIONALITY_KEYWORDS)
+
+
+def _is_gender(col):
+    return any(kw in str(col).lower() for kw in GENDER_KEYWORDS) and str(col).lower() != "الجنسية"
+
+
+def _numeric_columns(df):
+    return [c for c in df.columns if df[c].dtype in ['float64', 'int64']]
+
+
+# ═══════════════════════════════════════════════════════════════
+# Display frame
+# ═══════════════════════════════════════════════════════════════
+
+def build_display(df, translate=None, translate_col=None, flag_url=None, gender_map=None):
+    """
+    Display frame of df: translated text columns (translate(value) for the
+    columns accepted by translate_col), a 🚩 flag-URL column before each
+    nationality column, nationality text without emoji flags and gender
+    icons.
+    """
+    display = df.copy()
+
+    if translate is not None:
+        for col in display.columns:
+            if (not str(col).startswith("🚩_") and is_text_column(display[col])
+                    and (translate_col is None or translate_col(col))):
+                display[col] = map_distinct(display[col], translate)
+
+    for col in [c for c in display.columns if _is_nationality(c)]:
+        flag_col = f"🚩_{col}"
+        if flag_col not in display.columns:
+            if flag_url is not None:
+                display.insert(list(display.columns).index(col), flag_col, map_distinct(display[col], flag_url))
+        else:
+            # Keep an existing flag column right before its nationality column
+            cols = list(display.columns)
+            if cols.index(flag_col) != cols.index(col) - 1:
+                cols.remove(flag_col)
+                cols.insert(cols.index(col), flag_col)
+                display = display[cols]
+        display[col] = strip_flag_emoji(display[col])
+
+    if gender_map:
+        for col in [c for c in display.columns if _is_gender(c)]:
+            display[col] = add_gender_icons(display[col], gender_map)
+    return display
+
+
+def build_css(display):
+    """Per-cell CSS frame (text color), computed once per distinct value of each column."""
+    css = pd.DataFrame('', index=display.index, columns=display.columns)
+    for i, col in enumerate(display.columns):
+        if not str(col).startswith("🚩_"):
+            css.iloc[:, i] = map_distinct(display.iloc[:, i], text_color).to_numpy()
+    return css
+
+
+def column_formats(df):
+    """st.column_config NumberColumn formats matching the Styler's number formatting."""
+    return {c: ("%d" if df[c].dtype == 'int64' else "%.2f") for c in _numeric_columns(df)}
+
+
+def frame_digest(df):
+    """md5 of a frame's columns, index and values (stringified)."""
+    h = hashlib.md5(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df.astype(str), index=True).values.tobytes())
+    return h.hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════
+# Cached entry point
+# ═══════════════════════════════════════════════════════════════
+
+def styled_table(df, view=None, lang=None, **steps):
+    """
+    Styled display of df for st.dataframe: a Styler for tables up to
+    STYLER_MAX_CELLS cells, a plain display frame above that (pair it with
+    column_formats). `steps` are build_display's keyword arguments. Results
+    are cached per (view, lang, data version, content digest).
+    """
+    key = (view, lang, df.attrs.get('data_version'), frame_digest(df))
+    with _lock:
+        cached = _STYLED.get(key)
+        if cached is not None:
+            _STYLED.move_to_end(key)
+
+    if cached is None:
+        display = build_display(df, **steps)
+        small = display.size <= STYLER_MAX_CELLS and display.index.is_unique and display.columns.is_unique
+        cached = (display, build_css(display) if small else None)
+        with _lock:
+            _STYLED[key] = cached
+            while len(_STYLED) > MAX_CACHED_TABLES:
+                _STYLED.popitem(last=False)
+
+    display, css = cached
+    if css is None:
+        return display.copy(deep=False)
+    # This ensures large numbers (IDs/Phones) don't use scientific notation (1.2E+10)
+    return display.style.format(
+        precision=2,
+        thousands="",
+        na_rep="",
+        subset=_numeric_columns(display)
+    ).apply(lambda _: css, axis=None)